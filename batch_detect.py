@@ -0,0 +1,206 @@
+"""
+Offline board detection over saved screenshots or a screen recording.
+
+Runs the detection pipeline (candidate search, grid fit, stone reading) on every
+frame in a process pool, writes one JSON record per frame and reports per-stage
+latency percentiles, so a folder of misdetections doubles as a regression corpus
+and a throughput benchmark.
+
+Usage:
+    python batch_detect.py screenshots/ --output results.json
+    python batch_detect.py recording.mp4 --step 30 --profile color.cfg --workers 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import cv2
+import numpy as np
+from collections        import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools          import lru_cache
+from typing             import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils                import FrameBackend, ColorProfile, find_board_candidates, fit_grid
+from utils.calibrate      import sample_patches
+from utils.watcher        import BLACK, WHITE, MARKER, default_classifier
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+STAGES           = ('load', 'detect', 'grid', 'stones', 'total')
+STATE_NAMES      = {BLACK: 'black', WHITE: 'white', MARKER: 'marker'}
+
+
+@lru_cache(maxsize=4)
+def load_profile(path: str) -> ColorProfile:
+    """Colour profile for a worker process, parsed once per process."""
+    return ColorProfile.load(path)
+
+
+def iter_frames(source: str, step: int = 1) -> Iterator[Tuple[str, Optional[np.ndarray]]]:
+    """
+    Frames to process, as (name, image) pairs.
+
+    Images in a directory are yielded as (path, None) and loaded by the worker;
+    video frames are decoded here, keeping every `step`-th one.
+    """
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(source, name), None
+        return
+
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open '{source}' as a directory or video")
+    try:
+        index = 0
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if index % step == 0:
+                yield f'{source}#{index}', frame
+            index += 1
+    finally:
+        capture.release()
+
+
+def process_frame(job: Tuple[str, Optional[np.ndarray], Optional[str], Tuple[int, ...]]) -> Dict:
+    """
+    Run the pipeline on one frame; never raises, errors are recorded.
+
+    Args:
+        job: (name, image or None to load from name, colour profile path or None, accepted board sizes).
+
+    Returns:
+        JSON-serialisable record with board, grid, stones and per-stage timings in ms.
+    """
+    name, image, profile_path, sizes = job
+    record  = {'source': name, 'board': None, 'grid': None, 'stones': [], 'timings': {}, 'error': None}
+    timings = record['timings']
+    start   = stage = time.perf_counter()
+
+    def lap(key: str) -> None:
+        nonlocal stage
+        now          = time.perf_counter()
+        timings[key] = (now - stage) * 1000
+        stage        = now
+
+    try:
+        if image is None:
+            image = cv2.imread(name, cv2.IMREAD_COLOR)
+            if image is None:
+                raise ValueError("Unreadable image")
+        lap('load')
+
+        candidates = find_board_candidates(image)
+        candidates = [candidate for candidate in candidates if candidate.grid > 0]
+        lap('detect')
+        if not candidates:
+            return record
+        best            = candidates[0]
+        record['board'] = {'x': best.x, 'y': best.y, 'w': best.w, 'h': best.h, 'score': round(best.score, 4),
+                           'candidates': len(candidates)}
+
+        pad_x, pad_y    = best.w // 20 + 1, best.h // 20 + 1
+        x1, y1          = max(best.x - pad_x, 0), max(best.y - pad_y, 0)
+        grid            = fit_grid(image[y1:best.y + best.h + pad_y, x1:best.x + best.w + pad_x], y1, x1, sizes or None)
+        record['grid']  = {key: round(value, 3) if isinstance(value, float) else value for key, value in grid._asdict().items()}
+        lap('grid')
+
+        board           = grid.to_board(FrameBackend(image))
+        medians, _      = sample_patches(board)
+        pixels          = np.rint(medians).astype(np.uint8)
+        if profile_path:
+            profile     = load_profile(profile_path)
+            states      = profile.classify(pixels, profile.tolerance)
+        else:
+            states      = default_classifier(pixels)
+        size_x          = grid.size_x
+        for index in np.flatnonzero(states).tolist():
+            x, y        = index % size_x, index // size_x      # y counted from the bottom row
+            record['stones'].append({'x': x, 'y': y, 'move': f'{chr(97 + x)}{y + 1}',
+                                     'color': STATE_NAMES.get(int(states[index]), 'unknown')})
+        lap('stones')
+    except Exception as e:
+        record['error'] = f'{type(e).__name__}: {e}'
+    finally:
+        timings['total'] = (time.perf_counter() - start) * 1000
+    return record
+
+
+def bounded_map(executor: Executor, fn: Callable, jobs: Iterable, window: int) -> Iterator:
+    """
+    Like executor.map, but pull a job from `jobs` only when fewer than `window` are in flight.
+
+    executor.map submits the whole iterable up front, so a long video would be decoded
+    and queued for the workers in full before the first result came back.
+
+    Yields:
+        Results in job order.
+    """
+    pending = deque()
+    for job in jobs:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, job))
+    while pending:
+        yield pending.popleft().result()
+
+
+def percentiles(records: List[Dict], points: Tuple[int, ...] = (50, 90, 99)) -> Dict[str, Dict[str, float]]:
+    """Latency percentiles in ms for every stage that ran at least once."""
+    summary = {}
+    for key in STAGES:
+        values = [record['timings'][key] for record in records if key in record['timings']]
+        if values:
+            summary[key] = {f'p{point}': round(float(np.percentile(values, point)), 3) for point in points}
+            summary[key]['count'] = len(values)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Swap4 board detection")
+    parser.add_argument('source', help='Directory of screenshots or a video file')
+    parser.add_argument('--output', '-o', default=None, help='JSON file to write (default: stdout)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument('--step', type=int, default=1, help='Process every n-th video frame')
+    parser.add_argument('--profile', default=None,
+                        help='Colour profile file for nearest-colour stone reading (default: brightness)')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[15, 19, 20], help='Accepted board sizes; empty for any')
+    parser.add_argument('--in-flight', type=int, default=None,
+                        help='Frames decoded and queued ahead of the workers (default: 2 per worker)')
+    args   = parser.parse_args()
+    window = max(args.in_flight or 2 * (args.workers or os.cpu_count() or 1), 1)
+
+    jobs   = ((name, image, args.profile, tuple(args.sizes)) for name, image in iter_frames(args.source, args.step))
+    start  = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        records = list(bounded_map(executor, process_frame, jobs, window))
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        'frames'     : len(records),
+        'boards'     : sum(record['board'] is not None for record in records),
+        'errors'     : sum(record['error'] is not None for record in records),
+        'elapsed_s'  : round(elapsed, 3),
+        'throughput' : round(len(records) / elapsed, 2) if elapsed > 0 else None,
+        'latency_ms' : percentiles(records),
+    }
+    result = json.dumps({'summary': summary, 'frames': records}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(result)
+    else:
+        print(result)
+
+    print(f"{summary['frames']} frames, {summary['boards']} boards, {summary['errors']} errors, "
+          f"{summary['throughput']} frames/s with {args.workers} workers", file=sys.stderr)
+    print(f'{"stage":<8} {"p50 ms":>9} {"p90 ms":>9} {"p99 ms":>9}', file=sys.stderr)
+    for key, values in summary['latency_ms'].items():
+        print(f'{key:<8} {values["p50"]:>9.2f} {values["p90"]:>9.2f} {values["p99"]:>9.2f}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: grabs/sec of the legacy per-call screenshot versus a persistent
+CaptureSession, for full-screen and board-sized region grabs.
+
+Needs a real display.
+
+Usage:
+    python benchmarks/bench_capture.py [--grabs 200] [--size 480]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import mss
+import numpy as np
+
+from utils import CaptureSession
+
+
+def legacy_region(x1: int, y1: int, h: int, w: int) -> np.ndarray:
+    """The screenshot_region implementation before CaptureSession."""
+    sct   = mss.mss()
+    image = cv2.cvtColor(np.array(sct.grab(sct.monitors[0])), cv2.COLOR_BGR2RGB)
+    return image[y1:y1 + h, x1:x1 + w]
+
+
+def measure(name: str, grab, grabs: int) -> None:
+    grab()                                                 # Warm-up
+    start   = time.perf_counter()
+    for _ in range(grabs):
+        grab()
+    elapsed = time.perf_counter() - start
+    print(f'{name:<32} {grabs / elapsed:>10,.1f} grabs/s  ({elapsed / grabs * 1000:.2f} ms/grab)')
+
+
+def main():
+    parser  = argparse.ArgumentParser(description="Screen capture benchmark")
+    parser.add_argument('--grabs', type=int, default=200, help='Grabs per measurement')
+    parser.add_argument('--size', type=int, default=480, help='Side of the square region, in pixels')
+    args    = parser.parse_args()
+
+    session = CaptureSession()
+    monitor = session.monitor(1)
+    left    = monitor['left'] + (monitor['width'] - args.size) // 2
+    top     = monitor['top'] + (monitor['height'] - args.size) // 2
+
+    measure('legacy screenshot_region', lambda: legacy_region(left, top, args.size, args.size), args.grabs)
+    measure('session full screen (BGRA)', lambda: session.grab_monitor(1), args.grabs)
+    measure('session full screen (RGB)', lambda: session.grab_monitor(1, rgb=True), args.grabs)
+    measure('session region (BGRA)', lambda: session.grab(left, top, args.size, args.size), args.grabs)
+    measure('session region (RGB)', lambda: session.grab(left, top, args.size, args.size, rgb=True), args.grabs)
+
+
+if __name__ == '__main__':
+    main()
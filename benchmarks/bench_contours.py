@@ -0,0 +1,126 @@
+"""
+Benchmark: legacy per-contour KDTree queries and recursive UnionFind versus the
+vectorised group_overlapping_contours, on thousands of synthetic contours, plus
+the peak memory of the useMasks mode against the legacy one-full-image-mask-per-
+contour allocation.
+
+Usage:
+    python benchmarks/bench_contours.py [--repeat 3] [--counts 1000 5000 20000]
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from scipy.spatial import KDTree
+
+from utils.contours import group_overlapping_contours
+
+
+class LegacyUnionFind:
+    """UnionFind before vectorisation: Python lists and recursive find."""
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.rank   = [0] * n
+
+    def find(self, x: int) -> int:
+        if self.parent[x] != x:
+            self.parent[x] = self.find(self.parent[x])
+        return self.parent[x]
+
+    def union(self, x: int, y: int) -> None:
+        px = self.find(x)
+        py = self.find(y)
+        if px == py:
+            return
+        if self.rank[px] < self.rank[py]:
+            px, py = py, px
+        self.parent[py] = px
+        if self.rank[px] == self.rank[py]:
+            self.rank[px] += 1
+
+
+def legacy_group(contours, distanceThreshold: float = 10.0, areaSize: float = 300.0) -> list:
+    """group_overlapping_contours before vectorisation, without the mask mode."""
+    contours = [cnt for cnt in contours if cv2.contourArea(cnt) >= areaSize]
+    rects    = [cv2.boundingRect(cnt) for cnt in contours]
+    n        = len(contours)
+    centers  = np.array([(rect[0] + rect[2] / 2, rect[1] + rect[3] / 2) for rect in rects])
+    uf       = LegacyUnionFind(n)
+    tree     = KDTree(centers)
+    for i in range(n):
+        rect1   = rects[i]
+        center1 = centers[i]
+        indices = tree.query_ball_point(center1, distanceThreshold + max(rect1[2], rect1[3]))
+        for j in indices:
+            if i >= j or uf.find(i) == uf.find(j):
+                continue
+            rect2         = rects[j]
+            x_overlap     = max(0, min(rect1[0] + rect1[2], rect2[0] + rect2[2]) - max(rect1[0], rect2[0]))
+            y_overlap     = max(0, min(rect1[1] + rect1[3], rect2[1] + rect2[3]) - max(rect1[1], rect2[1]))
+            rects_overlap = x_overlap > 0 and y_overlap > 0
+            distance      = np.linalg.norm(center1 - centers[j]) if not rects_overlap else 0
+            if rects_overlap or (distance > 0 and distance <= distanceThreshold):
+                uf.union(i, j)
+    groups = {}
+    for idx in range(n):
+        groups.setdefault(uf.find(idx), []).append(contours[idx])
+    return [np.vstack(group) for group in groups.values()]
+
+
+def synthetic_contours(count: int, width: int = 3840, height: int = 2160, seed: int = 0):
+    """Axis-aligned square contours (area >= 400), loosely clustered so that groups form."""
+    rng     = np.random.default_rng(seed)
+    centers = rng.uniform((0, 0), (width, height), size=(count // 8 + 1, 2))
+    points  = centers[rng.integers(len(centers), size=count)] + rng.normal(0, 40, size=(count, 2))
+    sides   = rng.integers(20, 40, size=count)
+    return [np.array([[[x, y]], [[x, y + side]], [[x + side, y + side]], [[x + side, y]]], dtype=np.int32)
+            for (x, y), side in zip(points.astype(np.int32), sides)]
+
+
+def measure(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best  = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="group_overlapping_contours benchmark")
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    parser.add_argument('--counts', type=int, nargs='+', default=[1000, 5000, 20000], help='Contour counts')
+    args   = parser.parse_args()
+
+    print(f'{"contours":>9} {"groups":>7} {"legacy ms":>10} {"vector ms":>10} {"speed-up":>9}')
+    for count in args.counts:
+        contours = synthetic_contours(count)
+        legacy   = legacy_group(contours)
+        vector   = group_overlapping_contours(contours)
+        assert len(legacy) == len(vector) and all(np.array_equal(a, b) for a, b in zip(legacy, vector)), \
+            'vectorised grouping differs from legacy'
+
+        t_old = measure(lambda: legacy_group(contours), args.repeat)
+        t_new = measure(lambda: group_overlapping_contours(contours), args.repeat)
+        print(f'{count:>9} {len(vector):>7} {t_old:>10.1f} {t_new:>10.1f} {t_old / t_new:>8.1f}x')
+
+    print()
+    print(f'{"contours":>9} {"legacy masks MB":>16} {"useMasks peak MB":>17}')
+    for count in args.counts:
+        contours = synthetic_contours(count)
+        tracemalloc.start()
+        group_overlapping_contours(contours, useMasks=True)
+        peak     = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        legacy   = count * 3840 * 2160                     # One uint8 4K mask per contour
+        print(f'{count:>9} {legacy / 2 ** 20:>16,.0f} {peak / 2 ** 20:>17.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: legacy PIL getpixel opening scan versus the vectorised
+classify_opening, on synthetic boards of several sizes.
+
+Usage:
+    python benchmarks/bench_detect_opening.py [--repeat 200]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+from utils        import ArrangedArr
+from utils.detect import classify_opening, opening_sample_points
+
+BOARD  = (90, 140, 180)
+BLACK  = (20, 20, 20)
+WHITE  = (235, 235, 235)
+COLORS = np.array([BLACK, WHITE], dtype=np.uint8)
+
+
+def legacy_opening(image: np.ndarray, distance: int, colors) -> list:
+    """The detect_opening scan loop before vectorisation."""
+    image      = Image.fromarray(image)
+    deviation  = 0.2
+    list_coord = ArrangedArr()
+    for y in range(15):
+        for x in range(15):
+            coord        = (x, 14 - y)
+            deviation_x  = deviation if x == 14 else -deviation
+            deviation_y  = deviation if y == 14 else -deviation
+            actual_coord = (int(round((x - deviation_x) * distance)),
+                            int(round((y - deviation_y) * distance)))
+            r, g, b      = image.getpixel((actual_coord[0], actual_coord[1]))
+            if (r, g, b) == colors[0]:
+                list_coord.add(coord, 'b')
+            elif (r, g, b) == colors[1]:
+                list_coord.add(coord, 'w')
+    return list_coord.get()
+
+
+def synthetic_board(distance: int, stones: int, seed: int = 0) -> np.ndarray:
+    """Board image with `stones` random stones painted as filled squares."""
+    rng      = np.random.default_rng(seed)
+    side     = 14 * distance + distance // 2
+    image    = np.empty((side, side, 3), dtype=np.uint8)
+    image[:] = BOARD
+    xs, ys, _ = opening_sample_points(float(distance))
+    radius   = max(1, distance // 3)
+    for n, index in enumerate(rng.choice(len(xs), size=stones, replace=False)):
+        x, y = xs[index], ys[index]
+        image[max(0, y - radius):y + radius + 1, max(0, x - radius):x + radius + 1] = BLACK if n % 2 == 0 else WHITE
+    return image
+
+
+def measure(func, repeat: int) -> float:
+    func()                                                 # Warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="detect_opening benchmark")
+    parser.add_argument('--repeat', type=int, default=200, help='Runs per measurement')
+    args   = parser.parse_args()
+
+    print(f'{"spacing":>8} {"image":>10} {"legacy us":>10} {"vector us":>10} {"speed-up":>9}')
+    for distance in (20, 30, 45, 70):
+        image  = synthetic_board(distance, stones=40)
+        legacy = legacy_opening(image, distance, [BLACK, WHITE])
+        vector = classify_opening(image, distance, COLORS)
+        assert list(legacy) == list(vector), 'vectorised result differs from legacy'
+
+        t_old  = measure(lambda: legacy_opening(image, distance, [BLACK, WHITE]), args.repeat)
+        t_new  = measure(lambda: classify_opening(image, distance, COLORS), args.repeat)
+        print(f'{distance:>8} {f"{image.shape[1]}x{image.shape[0]}":>10} {t_old:>10.1f} {t_new:>10.1f} {t_old / t_new:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
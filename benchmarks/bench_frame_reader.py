@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: frames/sec of the legacy two-recv-per-frame receive path
+versus protocol.FrameReader.
+
+Usage:
+    python benchmarks/bench_frame_reader.py [--frames 200000]
+"""
+import os
+import sys
+import time
+import socket
+import struct
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from protocol import HEADER_FORMAT, HEADER_SIZE, ADD_CONTENT_FORMAT, DataType, FrameReader, encode_message
+
+
+def legacy_recv_all(sock: socket.socket, n: int):
+    """The receive helper both server.py and main.py used before FrameReader."""
+    data = b''
+    while len(data) < n:
+        packet = sock.recv(n - len(data))
+        if not packet:
+            return None
+        data += packet
+    return data
+
+
+def read_legacy(sock: socket.socket, frames: int) -> None:
+    for _ in range(frames):
+        _, content_length = struct.unpack(HEADER_FORMAT, legacy_recv_all(sock, HEADER_SIZE))
+        if content_length:
+            legacy_recv_all(sock, content_length)
+
+
+def read_buffered(sock: socket.socket, frames: int) -> None:
+    reader   = FrameReader(sock)
+    received = 0
+    while received < frames:
+        received += len(reader.read_frames())
+
+
+def run(reader, frames: int) -> float:
+    left, right = socket.socketpair()
+    payload     = encode_message(DataType.ADD, struct.pack(ADD_CONTENT_FORMAT, 7, 7)) * 1000
+
+    def writer():
+        for _ in range(frames // 1000):
+            left.sendall(payload)
+
+    thread = threading.Thread(target=writer, daemon=True)
+    start  = time.perf_counter()
+    thread.start()
+    reader(right, frames // 1000 * 1000)
+    elapsed = time.perf_counter() - start
+    thread.join()
+    left.close()
+    right.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame receive micro-benchmark")
+    parser.add_argument('--frames', type=int, default=200_000, help='Number of ADD frames to stream')
+    args   = parser.parse_args()
+
+    for name, reader in (('legacy _recv_all', read_legacy), ('FrameReader', read_buffered)):
+        elapsed = run(reader, args.frames)
+        print(f'{name:<18} {args.frames / elapsed:>12,.0f} frames/s  ({elapsed:.3f}s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: the per-move bookkeeping of Game.sync on the legacy move list
+(`move in moves`, `moves.index(move)`) versus the bitboard GameState, which also
+checks bounds and occupancy and detects five in a row on every move.
+
+Each game fills a board in random order; every move is preceded by the duplicate
+check and a ply lookup of an earlier move, as a received ADD is.
+
+Usage:
+    python benchmarks/bench_game_state.py [--games 200] [--sizes 15 19 20]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import GameState
+
+
+def random_games(size: int, count: int, seed: int = 0):
+    rng   = random.Random(seed)
+    games = []
+    for _ in range(count):
+        cells = [(x, y) for x in range(size) for y in range(size)]
+        rng.shuffle(cells)
+        games.append(cells)
+    return games
+
+
+def legacy_replay(games) -> int:
+    """Move list bookkeeping without any rule checks."""
+    lookups = 0
+    for cells in games:
+        moves = []
+        for ply, move in enumerate(cells):
+            if move in moves:
+                continue
+            if ply:
+                lookups += moves.index(cells[ply // 2])
+            moves.append(move)
+    return lookups
+
+
+def bitboard_replay(games) -> int:
+    """Bitboard bookkeeping; a won game is taken back one move so play continues to a full board."""
+    lookups = 0
+    for cells in games:
+        state = GameState(int(len(cells) ** 0.5))
+        for ply, move in enumerate(cells):
+            if move in state:
+                continue
+            if ply:
+                lookups += state.index_of(cells[ply // 2])
+            if state.add_move(*move):
+                state.winner = None
+    return lookups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GameState bookkeeping benchmark")
+    parser.add_argument('--games', type=int, default=200, help='Games per board size')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[15, 19, 20], help='Board sizes')
+    args   = parser.parse_args()
+
+    print(f'{"size":>5} {"moves":>8} {"legacy us/move":>15} {"bitboard us/move":>17} {"speed-up":>9}')
+    for size in args.sizes:
+        games = random_games(size, args.games)
+        moves = sum(len(cells) for cells in games)
+        start = time.perf_counter()
+        old   = legacy_replay(games)
+        t_old = time.perf_counter() - start
+        start = time.perf_counter()
+        new   = bitboard_replay(games)
+        t_new = time.perf_counter() - start
+        assert old == new, 'ply lookups differ'
+        print(f'{size:>5} {moves:>8} {t_old / moves * 1e6:>15.2f} {t_new / moves * 1e6:>17.2f} {t_old / t_new:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
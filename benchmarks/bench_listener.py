@@ -0,0 +1,187 @@
+"""
+Benchmark: per-event hotkey matching before and after the scan-code cache and
+integer bitmask, replaying a synthetic key event stream.
+
+The legacy path resolved the scan code of every event and rebuilt a hex() string
+hash over the pressed set; the current path is a dict lookup and a few integer
+operations. Events are fed through a ManualEventSource and scan codes come from
+a fixed table instead of the OS keymap, so the benchmark runs anywhere; that
+flatters the legacy path, since the real keyboard.key_to_scan_codes is
+considerably slower than a dict lookup.
+
+A second table shows the queueing delay of a short hotkey pressed while a long
+one (the game loop on Alt+P) runs: behind it on the legacy single shared worker,
+and in separate lanes.
+
+Usage:
+    python benchmarks/bench_listener.py [--events 200000] [--repeat 3]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.listener import Listener, ManualEventSource, CONCURRENT, DROP_IF_RUNNING
+
+SCAN_CODES = {name: code for code, name in enumerate(
+    ['alt', 'ctrl', 'shift', 'left windows', 'space', 'enter', 'esc', 'tab']
+    + [chr(c) for c in range(ord('a'), ord('z') + 1)] + [str(d) for d in range(10)], start=1)}
+HOTKEYS    = ['alt+p', 'alt+s', 'alt+q', 'alt+k', 'alt+1', 'alt+2', 'ctrl+shift+a', 'ctrl+alt+z']
+
+
+class Collector:
+    """Executor stand-in that only counts submissions, so matches can be compared."""
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, func, *args):
+        self.submitted += 1
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class LegacyMatcher:
+    """Listener._listen_loop event handling before the scan-code cache and int bitmask."""
+    def __init__(self, key_to_bit_index, hotkey_map):
+        self._pressed_keys       = set()
+        self._key_to_bit_index   = key_to_bit_index
+        self._hotkey_map         = {hex(mask): callback for mask, callback in hotkey_map.items()}
+        self._lock               = threading.Lock()
+        self._last_callback_time = 0
+        self._debounce_ms        = 0
+        self._callback_executor  = Collector()
+
+    def _get_scan_code(self, key_name):
+        return SCAN_CODES[key_name]                    # keyboard.key_to_scan_codes stand-in
+
+    def _calculate_hash(self, scan_codes):
+        current_hash = 0
+        for code in scan_codes:
+            if code in self._key_to_bit_index:
+                current_hash |= (1 << self._key_to_bit_index[code])
+        return hex(current_hash)
+
+    def handle(self, name, event_type):
+        try:
+            scan_code = self._get_scan_code(name.lower())
+        except KeyError:
+            return
+        with self._lock:
+            is_relevant_key = scan_code in self._key_to_bit_index
+            if event_type == 'down' and is_relevant_key and scan_code not in self._pressed_keys:
+                self._pressed_keys.add(scan_code)
+                current_hash = self._calculate_hash(self._pressed_keys)
+                current_time = time.time() * 1000
+                if current_hash in self._hotkey_map and (current_time - self._last_callback_time) >= self._debounce_ms:
+                    self._callback_executor.submit(self._hotkey_map[current_hash])
+                    self._last_callback_time = current_time
+            elif event_type == 'up' and scan_code in self._pressed_keys:
+                self._pressed_keys.discard(scan_code)
+
+
+def synthetic_events(count: int, seed: int = 0):
+    """Typing with occasional hotkey chords, auto-repeat and unmapped keys."""
+    rng    = random.Random(seed)
+    typing = [name for name in SCAN_CODES if len(name) == 1] + ['space', 'enter', 'F13']
+    events = []
+    while len(events) < count:
+        if rng.random() < 0.2:
+            keys = rng.choice(HOTKEYS).split('+')
+            events += [(key, 'down') for key in keys] + [(keys[-1], 'down')] * rng.randint(0, 2)
+            events += [(key, 'up') for key in reversed(keys)]
+        else:
+            key     = rng.choice(typing)
+            events += [(key.upper() if rng.random() < 0.1 else key, 'down'), (key, 'up')]
+    return events[:count]
+
+
+def replay(handle, events) -> float:
+    start = time.perf_counter()
+    for name, event_type in events:
+        handle(name, event_type)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listener per-event matching benchmark")
+    parser.add_argument('--events', type=int, default=200000, help='Synthetic key events per run')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    parser.add_argument('--busy-ms', type=float, default=500, help='Duration of the long alt+p callback')
+    args   = parser.parse_args()
+
+    source   = ManualEventSource(SCAN_CODES)
+    listener = Listener(debounce_ms=0, event_source=source)
+    listener._callback_executor = Collector()
+    for hotkey in HOTKEYS:
+        listener.add_hotkey(hotkey, lambda: None, lane=CONCURRENT)
+    legacy   = LegacyMatcher(dict(listener._key_to_bit_index), {mask: (lambda: None) for mask in listener._hotkey_map})
+
+    events   = synthetic_events(args.events)
+    replay(legacy.handle, events)
+    replay(source.emit, events)
+    matches  = listener._callback_executor.submitted
+    assert legacy._callback_executor.submitted == matches > 0, 'hotkey matches differ'
+
+    t_old = min(replay(legacy.handle, events) for _ in range(args.repeat))
+    t_new = min(replay(source.emit, events) for _ in range(args.repeat))
+    listener.stop()
+    print(f'{len(events)} events, {matches} hotkey matches per replay')
+    print(f'{"path":<8} {"total ms":>9} {"ns/event":>9}')
+    print(f'{"legacy":<8} {t_old * 1000:>9.1f} {t_old / len(events) * 1e9:>9.0f}')
+    print(f'{"current":<8} {t_new * 1000:>9.1f} {t_new / len(events) * 1e9:>9.0f}')
+    print(f'speed-up {t_old / t_new:.1f}x')
+
+    print()
+    print(f'{"alt+w delay behind a {:.0f} ms alt+p".format(args.busy_ms):<36} {"mean ms":>8} {"max ms":>8}')
+    for label, mean, worst in (('legacy single worker', *legacy_delays(args.busy_ms)),
+                               ('per-hotkey lanes', *lane_delays(args.busy_ms))):
+        print(f'{label:<36} {mean:>8.1f} {worst:>8.1f}')
+
+
+def press_sequence(tap):
+    """Alt+P (long), then Alt+W five times while it runs."""
+    tap('alt', 'p')
+    for _ in range(5):
+        time.sleep(0.02)
+        tap('alt', 'w')
+
+
+def legacy_delays(busy_ms: float):
+    """Queueing delay of alt+w on the legacy single shared callback worker."""
+    executor = ThreadPoolExecutor(max_workers=1)
+    delays   = []
+    def submit(callback):
+        queued = time.perf_counter()
+        return executor.submit(lambda: (delays.append((time.perf_counter() - queued) * 1000), callback()))
+    futures  = []
+    press_sequence(lambda *keys: futures.append(submit(lambda: time.sleep(busy_ms / 1000) if keys[-1] == 'p' else None)))
+    for future in futures:
+        future.result()
+    executor.shutdown()
+    waits    = delays[1:]
+    return sum(waits) / len(waits), max(waits)
+
+
+def lane_delays(busy_ms: float):
+    """Queueing delay of alt+w with the game loop in its own lane."""
+    source   = ManualEventSource(SCAN_CODES)
+    listener = Listener(debounce_ms=0, event_source=source)
+    listener.add_hotkey('alt+p', lambda: time.sleep(busy_ms / 1000), lane=DROP_IF_RUNNING)
+    listener.add_hotkey('alt+w', lambda: None)
+    press_sequence(source.tap)
+    time.sleep(busy_ms / 1000 + 0.05)
+    stats    = listener.stats()['alt+w']
+    listener.stop()
+    assert stats.completed == 5, stats
+    return stats.mean_delay_ms, stats.max_delay_ms
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark: cost of server-side validation per move. Random Renju games are
+replayed through a bare GameState (bounds and occupancy only, as the server did
+before the rule engine) and through RuleEngine, which also checks turn order and
+black's forbidden moves. The forbidden-move check is also timed against a
+classifier that scans each line instead of looking it up in LINE_TABLE, and the
+two must agree on every black move.
+
+Usage:
+    python benchmarks/bench_rules.py [--games 200] [--size 15]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import BLACK, GameState, IllegalMove
+from rules    import NO_OPENING, RENJU, DIRECTIONS, SIDE, RuleEngine, _classify, forbidden_reason, side_code
+
+
+def random_games(size: int, count: int, seed: int = 0):
+    """Random move orders clustered around the centre, where lines actually form."""
+    rng   = random.Random(seed)
+    games = []
+    for _ in range(count):
+        cells = [(x, y) for x in range(size) for y in range(size)]
+        cells.sort(key=lambda cell: abs(cell[0] - size // 2) + abs(cell[1] - size // 2) + rng.random() * 6)
+        games.append(cells[:size * size // 2])
+    return games
+
+
+def scanned_reason(state: GameState, x: int, y: int):
+    """forbidden_reason() with every line classified from scratch instead of looked up."""
+    shapes = []
+    for dx, dy in DIRECTIONS:
+        codes  = []
+        for sign in (-1, 1):
+            length = stones = 0
+            while length < SIDE:
+                color = state.color_at(x + sign * dx * (length + 1), y + sign * dy * (length + 1))
+                if not state.in_bounds(x + sign * dx * (length + 1), y + sign * dy * (length + 1)) or color not in (None, BLACK):
+                    break
+                if color == BLACK:
+                    stones |= 1 << length
+                length += 1
+            codes.append(side_code(length, stones))
+        shapes.append(_classify(*codes))
+    if any(shape.five for shape in shapes):
+        return None
+    if any(shape.overline for shape in shapes):
+        return 'overline'
+    if sum(shape.fours for shape in shapes) >= 2:
+        return 'double four'
+    if sum(shape.three for shape in shapes if not shape.fours) >= 2:
+        return 'double three'
+    return None
+
+
+def replay_plain(games, size: int) -> int:
+    played = 0
+    for cells in games:
+        state = GameState(size)
+        for move in cells:
+            if state.is_over:
+                break
+            state.add_move(*move)
+            played += 1
+    return played
+
+
+def replay_rules(games, size: int) -> int:
+    """Forbidden black moves are skipped, so games diverge from replay_plain; only the pace compares."""
+    played = 0
+    for cells in games:
+        engine = RuleEngine(size, RENJU, NO_OPENING)
+        for move in cells:
+            if engine.state.is_over:
+                break
+            try:
+                engine.play(engine.seat_to_move(), *move)
+            except IllegalMove:
+                continue
+            played += 1
+    return played
+
+
+def black_positions(games, size: int):
+    """(state, x, y) for every black move of the rule-checked games, frozen as move lists."""
+    checks = []
+    for cells in games:
+        engine = RuleEngine(size, RENJU, NO_OPENING)
+        for move in cells:
+            if engine.state.is_over:
+                break
+            if engine.state.to_move == BLACK:
+                checks.append((list(engine.state.moves), move))
+            try:
+                engine.play(engine.seat_to_move(), *move)
+            except IllegalMove:
+                pass
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rule engine validation benchmark")
+    parser.add_argument('--games', type=int, default=200, help='Games to replay')
+    parser.add_argument('--size', type=int, default=15, help='Board size')
+    args   = parser.parse_args()
+    games  = random_games(args.size, args.games)
+
+    start  = time.perf_counter()
+    plain  = replay_plain(games, args.size)
+    t_bare = time.perf_counter() - start
+    start  = time.perf_counter()
+    ruled  = replay_rules(games, args.size)
+    t_rule = time.perf_counter() - start
+    print(f'{"replay":>22} {"moves":>8} {"us/move":>9}')
+    print(f'{"GameState":>22} {plain:>8} {t_bare / plain * 1e6:>9.2f}')
+    print(f'{"RuleEngine (renju)":>22} {ruled:>8} {t_rule / ruled * 1e6:>9.2f}')
+
+    states = []
+    for moves, move in black_positions(games, args.size):
+        state = GameState(args.size)
+        state.add_moves(moves)
+        states.append((state, move))
+    start  = time.perf_counter()
+    table  = [forbidden_reason(state, *move) for state, move in states]
+    t_tab  = time.perf_counter() - start
+    start  = time.perf_counter()
+    scan   = [scanned_reason(state, *move) for state, move in states]
+    t_scan = time.perf_counter() - start
+    assert table == scan, 'forbidden-move verdicts differ'
+    print()
+    print(f'{"black checks":>12} {"forbidden":>10} {"scan us/check":>14} {"table us/check":>15} {"speed-up":>9}')
+    print(f'{len(states):>12} {sum(reason is not None for reason in table):>10} '
+          f'{t_scan / len(states) * 1e6:>14.2f} {t_tab / len(states) * 1e6:>15.2f} {t_scan / t_tab:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
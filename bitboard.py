@@ -0,0 +1,225 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Board model shared by the client (main.py) and the server (server.py).
+# Each colour is one Python int used as a bitset: intersection (x, y) is bit
+# y * stride + x, where stride = width + 1. The spare column is never set, so a
+# horizontal or diagonal walk that leaves the board hits an empty bit instead of
+# wrapping onto the next row.
+BLACK         = 0                  # Colour of the stones on even plies, first move included
+WHITE         = 1
+COLOR_NAMES   = ('black', 'white')
+DEFAULT_SIZE  = 15
+WIN_LENGTH    = 5
+
+Move          = Tuple[int, int]
+
+
+class IllegalMove(ValueError):
+    """Raised when a move is off the board, on an occupied intersection, or played after the game ended."""
+    pass
+
+
+class GameState:
+    """
+    Moves of one game on a bitboard.
+
+    Occupancy, duplicate and ply lookups are O(1), and a win is detected by
+    walking the four lines through the last move only.
+
+    Attributes:
+        moves: Move stack, first move first.
+        current_turn: False = first player, True = second player; toggled by every
+            move and settable on its own, e.g. by a Swap2 choice.
+        winner: BLACK or WHITE once a move completed a line of WIN_LENGTH, else None.
+    """
+    def __init__(self, size_x: int = DEFAULT_SIZE, size_y: Optional[int] = None,
+                 overline_wins: Tuple[bool, bool] = (True, True), stop_at_win: bool = True):
+        """
+        Args:
+            size_x: Number of columns.
+            size_y: Number of rows; defaults to size_x.
+            overline_wins: Per colour, whether a line longer than WIN_LENGTH wins
+                (freestyle) or only an exact WIN_LENGTH does (standard, black in Renju).
+            stop_at_win: Reject moves once there is a winner. A client whose rules may
+                differ from the server's turns this off and waits for its RESULT instead.
+
+        Raises:
+            ValueError: If a dimension is smaller than 1.
+        """
+        size_y = size_x if size_y is None else size_y
+        if size_x < 1 or size_y < 1:
+            raise ValueError("Board dimensions must be positive")
+        self.size_x                        = size_x
+        self.size_y                        = size_y
+        self.stride                        = size_x + 1
+        self.overline_wins                 = overline_wins
+        self.stop_at_win                   = stop_at_win
+        self.stones      : List[int]       = [0, 0]            # Bitset per colour
+        self.moves       : List[Move]      = []
+        self.current_turn: bool            = False
+        self.winner      : Optional[int]   = None
+        self._win_ply    : Optional[int]   = None              # Ply of the move that set winner
+        self._ply        : Dict[Move, int] = {}                # Move -> its index in moves
+        self._bits                         = [1 << index for index in range(size_y * self.stride)]
+        self._directions                   = (1, self.stride, self.stride + 1, self.stride - 1)
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def __contains__(self, move: Move) -> bool:
+        return move in self._ply
+
+    def __iter__(self) -> Iterator[Move]:
+        return iter(self.moves)
+
+    @property
+    def last_move(self) -> Optional[Move]:
+        return self.moves[-1] if self.moves else None
+
+    @property
+    def is_over(self) -> bool:
+        return self.winner is not None
+
+    @property
+    def to_move(self) -> int:
+        """Colour of the next stone."""
+        return len(self.moves) & 1
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.size_x and 0 <= y < self.size_y
+
+    def index(self, x: int, y: int) -> int:
+        """
+        Bit index of an intersection.
+
+        Raises:
+            IllegalMove: If (x, y) is off the board.
+        """
+        if not self.in_bounds(x, y):
+            raise IllegalMove(f"({x}, {y}) is outside the {self.size_x}x{self.size_y} board")
+        return y * self.stride + x
+
+    def color_at(self, x: int, y: int) -> Optional[int]:
+        """BLACK, WHITE, or None for an empty or off-board intersection."""
+        if not self.in_bounds(x, y):
+            return None
+        bit = self._bits[y * self.stride + x]
+        if self.stones[BLACK] & bit:
+            return BLACK
+        return WHITE if self.stones[WHITE] & bit else None
+
+    def index_of(self, move: Move) -> Optional[int]:
+        """Ply at which a move was played, or None if it was not."""
+        return self._ply.get(move)
+
+    def line_length(self, index: int, color: int, direction: int) -> int:
+        """
+        Length of the run of a colour's stones through a bit index along one direction.
+
+        Args:
+            index: Bit index of a stone of that colour, see index().
+            color: BLACK or WHITE.
+            direction: Bit offset of one step, one of 1, stride, stride + 1, stride - 1.
+
+        Returns:
+            Number of stones in the run, at least 1.
+        """
+        stones, bits, limit = self.stones[color], self._bits, len(self._bits)
+        length = 1
+        step   = index + direction
+        while step < limit and stones & bits[step]:
+            length += 1
+            step   += direction
+        step   = index - direction
+        while step >= 0 and stones & bits[step]:
+            length += 1
+            step   -= direction
+        return length
+
+    def longest_line(self, x: int, y: int) -> int:
+        """Longest run through the stone at (x, y) in any direction, 0 if the intersection is empty."""
+        color = self.color_at(x, y)
+        if color is None:
+            return 0
+        index = y * self.stride + x
+        return max(self.line_length(index, color, direction) for direction in self._directions)
+
+    def add_move(self, x: int, y: int) -> bool:
+        """
+        Play the next stone at (x, y).
+
+        Returns:
+            True if the move completed the first winning line, ending the game.
+
+        Raises:
+            IllegalMove: If the game is over (see stop_at_win), or (x, y) is off the board or occupied.
+        """
+        if self.winner is not None and self.stop_at_win:
+            raise IllegalMove(f"Game is over, {COLOR_NAMES[self.winner]} won")
+        index = self.index(x, y)
+        bit   = self._bits[index]
+        if (self.stones[BLACK] | self.stones[WHITE]) & bit:
+            raise IllegalMove(f"({x}, {y}) is already occupied")
+
+        color                        = len(self.moves) & 1
+        self.stones[color]          |= bit
+        self._ply[(x, y)]            = len(self.moves)
+        self.moves.append((x, y))
+        self.current_turn            = not self.current_turn
+        if self.winner is not None:
+            return False
+        overline                     = self.overline_wins[color]
+        for direction in self._directions:
+            length                   = self.line_length(index, color, direction)
+            if length == WIN_LENGTH or (overline and length > WIN_LENGTH):
+                self.winner          = color
+                self._win_ply        = len(self.moves) - 1
+                return True
+        return False
+
+    def add_moves(self, moves: Sequence[Move]) -> bool:
+        """
+        Play several moves at once, e.g. an opening or a replayed game; all or none are applied.
+
+        Returns:
+            True if the game ended on the last of them.
+
+        Raises:
+            IllegalMove: If any move is illegal; the state is left unchanged.
+        """
+        played, turn = len(self.moves), self.current_turn
+        try:
+            for x, y in moves:
+                self.add_move(x, y)
+        except IllegalMove:
+            self.undo_moves(len(self.moves) - played)
+            self.current_turn = turn
+            raise
+        return self.winner is not None
+
+    def undo_moves(self, num_moves: int) -> List[Move]:
+        """
+        Take back the last num_moves moves, or all of them if there are fewer.
+
+        Returns:
+            The removed moves, last played first.
+        """
+        undone = []
+        for _ in range(min(num_moves, len(self.moves))):
+            move                = self.moves.pop()
+            del self._ply[move]
+            self.stones[len(self.moves) & 1] &= ~self._bits[move[1] * self.stride + move[0]]
+            undone.append(move)
+        if self.winner is not None and len(self.moves) <= self._win_ply:
+            self.winner         = None
+        self.current_turn       = bool(len(self.moves) % 2)
+        return undone
+
+    def clear(self) -> None:
+        """Reset to an empty board."""
+        self.stones             = [0, 0]
+        self.moves.clear()
+        self._ply.clear()
+        self.current_turn       = False
+        self.winner             = None
+        self._win_ply           = None
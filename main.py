@@ -1,48 +1,57 @@
 from utils        import ScreenCapture
 from utils        import detect_board, get_mouse_position, mouse_move_to, undo
+from utils        import calibrate_profile, get_color_store, CALIBRATED_PROFILE
+from utils        import DetectionCache, window_rects, refine_board, grid_rect
 from utils        import mouse_clip
 from utils        import Listener
-from utils        import Board
-from threading    import Thread, Event, Lock
-from enum         import Enum
+from utils.listener import DROP_IF_RUNNING
+from utils        import Board, BoardWatcher
+from threading    import Thread, Event, Lock, RLock, Condition, get_ident
+from collections  import deque
+from protocol     import HEADER_FORMAT, ADD_CONTENT_FORMAT, ADD_CONTENT_SIZE, UNDO_CONTENT_FORMAT, UNDO_CONTENT_SIZE
+from protocol     import SWAP_CONTENT_FORMAT, SWAP_CONTENT_SIZE, CLEAR_CONTENT_FORMAT, CLEAR_CONTENT_SIZE
+from protocol     import ROOM_CONTENT_FORMAT, ROOM_CONTENT_SIZE, NO_ROOM
+from protocol     import DataType, FrameReader, ProtocolError, decode_message, pack_moves
+from bitboard     import COLOR_NAMES, GameState, IllegalMove
 import ttkbootstrap
 import socket
+import select
 import struct
+import random
 import time
 
-
-
-HEADER_FORMAT        = '!ii'
-HEADER_SIZE          = struct.calcsize(HEADER_FORMAT)
-
-ADD_CONTENT_FORMAT   = '!ii'
-ADD_CONTENT_SIZE     = struct.calcsize(ADD_CONTENT_FORMAT)
-
-UNDO_CONTENT_FORMAT  = '!i'
-UNDO_CONTENT_SIZE    = struct.calcsize(UNDO_CONTENT_FORMAT)
-
-SWAP_CONTENT_FORMAT  = '!?' # Boolean for turn state
-SWAP_CONTENT_SIZE    = struct.calcsize(SWAP_CONTENT_FORMAT)
-
-CLEAR_CONTENT_FORMAT = ''
-CLEAR_CONTENT_SIZE   = 0
-
-
-class DataType(Enum):
-    UNDO  = 1
-    ADD   = 2
-    CLEAR = 3 
-    SWAP  = 4
+NOTHING = object()                                           # SocketClient._read: no complete frame yet
 
 
 class SocketClient:
-    def __init__(self, host, port):
-        self.host           = host
-        self.port           = port
-        self.socket         = None
-        self.__is_connected = False
-        self.__lock         = Lock()
-        self.connect()
+    def __init__(self, host, port, heartbeat_interval=5.0, peer_timeout=15.0,
+                 reconnect_delay=0.5, max_reconnect_delay=30.0, auto_reconnect=True):
+        self.host                = host
+        self.port                = port
+        self.socket              = None
+        self.heartbeat_interval  = heartbeat_interval         # Seconds between PINGs; also the socket timeout
+        self.peer_timeout        = peer_timeout               # Silence after which the server is considered dead
+        self.reconnect_delay     = reconnect_delay            # First backoff step, doubled on every failed attempt
+        self.max_reconnect_delay = max_reconnect_delay
+        self.auto_reconnect      = auto_reconnect
+        self.__reader            = None
+        self.__pending           = deque()                    # Frames already received but not yet consumed
+        self.__is_connected      = False
+        self.__closed            = False                      # Set by close(); stops heartbeat and reconnects
+        self.__resync_owner      = None                       # Thread resyncing a fresh connection, if any
+        self.__last_seen         = time.monotonic()
+        self.__lock              = RLock()
+        self.__send_lock         = Lock()                     # Heartbeat and game threads share the socket
+        self.__read_lock         = RLock()                    # One reader of __reader/__pending at a time; see _request
+        self.__state_changed     = Condition(self.__lock)
+        self.__reconnect_thread  = None
+        self.room_id             = None                       # Room this client plays in, learned from the server
+        self.snapshot            = None                       # Last (room_id, current_turn, moves) received
+        self.on_resync           = None                       # Called with (current_turn, moves) after a reconnect resync
+        if not self.connect() and self.auto_reconnect:
+            self._connection_lost('initial connection failed')
+        self.__heartbeat_thread  = Thread(target=self._heartbeat_loop, daemon=True)
+        self.__heartbeat_thread.start()
 
     @property
     def is_connected(self) -> bool:
@@ -50,15 +59,46 @@ class SocketClient:
         with self.__lock:
             return self.__is_connected and self.socket is not None
 
+    def _available(self) -> bool:
+        """Connected, and not being resynced by another thread"""
+        with self.__lock:
+            return (self.__is_connected and self.socket is not None and
+                    self.__resync_owner in (None, get_ident()))
+
+    def wait_connected(self, timeout=None) -> bool:
+        """Block until the connection is up and resynced; returns False if closed or timed out."""
+        with self.__state_changed:
+            self.__state_changed.wait_for(
+                lambda: self.__closed or (self.__is_connected and self.__resync_owner is None), timeout)
+            return self.__is_connected and not self.__closed
+
     def connect(self) -> bool:
-        """Attempt to connect to the server."""
+        """Attempt to connect to the server, then resync with its view of the game."""
+        with self.__lock:
+            self.__resync_owner = get_ident()
+        try:
+            if not self._open():
+                return False
+            self.resync()
+            return self.is_connected
+        finally:
+            with self.__state_changed:
+                self.__resync_owner = None
+                self.__state_changed.notify_all()
+
+    def _open(self) -> bool:
+        """Open the socket; returns True if already connected."""
         with self.__lock:
             if self.__is_connected and self.socket is not None:
                 return True
             
             try:
                 self.socket         = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self.socket.settimeout(self.heartbeat_interval)
                 self.socket.connect((self.host, self.port))
+                self.__reader       = FrameReader(self.socket)
+                self.__pending.clear()
+                self.__last_seen    = time.monotonic()
                 self.__is_connected = True
                 print(f"Connected to server at {self.host}:{self.port}")
                 return True
@@ -73,22 +113,46 @@ class SocketClient:
                 self.socket = None
                 return False
 
-    def _recv_all(self, n):
-        """Helper to receive exactly n bytes."""
-        data = b''
-        try:
-            while len(data) < n:
-                packet = self.socket.recv(n - len(data))
-                if not packet:    # Connection closed
-                    return None
-                data += packet
-            return data
-        except socket.error:
-            return None
+    def _connection_lost(self, reason):
+        """Drop a broken connection and start the reconnect loop unless closed."""
+        print(f'Connection lost: {reason}')
+        with self.__lock:
+            self._close_socket()
+            if self.__closed or not self.auto_reconnect:
+                return
+            if self.__reconnect_thread is not None and self.__reconnect_thread.is_alive():
+                return
+            self.__reconnect_thread = Thread(target=self._reconnect_loop, daemon=True)
+            self.__reconnect_thread.start()
+
+    def _reconnect_loop(self):
+        """Reconnect with exponential backoff and full jitter until connected or closed."""
+        delay = self.reconnect_delay
+        while True:
+            with self.__state_changed:
+                if self.__closed or self.__is_connected:
+                    return
+                self.__state_changed.wait(random.uniform(0, delay))   # Wakes early on close()
+                if self.__closed:
+                    return
+            print(f'Reconnecting to {self.host}:{self.port}...')
+            if self.connect():
+                return
+            delay = min(self.max_reconnect_delay, delay * 2)
+
+    def _heartbeat_loop(self):
+        """Send a PING every heartbeat_interval so both ends notice a dead connection."""
+        while True:
+            with self.__state_changed:
+                self.__state_changed.wait_for(lambda: self.__closed, self.heartbeat_interval)
+                if self.__closed:
+                    return
+            if self._available():
+                self.send(DataType.PING)
 
     def send(self, *args):
         print('Sending...')
-        if not self.is_connected:
+        if not self._available():
             print('Not connected')
             return False
         
@@ -104,7 +168,7 @@ class SocketClient:
             content_length  = 0
             content_format  = ''
 
-            print(f'Type: {data_type_enum} | Value: {data_type_value} | Content: {content_args[0]}')
+            print(f'Type: {data_type_enum} | Value: {data_type_value} | Content: {content_args}')
 
             # Pack content based on DataType
             if data_type_enum   == DataType.ADD:
@@ -155,6 +219,26 @@ class SocketClient:
                     print(f"Warning: DataType.CLEAR expects no content, but received {content_args}")
                 content_format     = CLEAR_CONTENT_FORMAT
                 content_length     = CLEAR_CONTENT_SIZE
+            elif data_type_enum == DataType.ADD_BATCH:
+                if len(content_args) != 1 or not all(isinstance(move, tuple) and len(move) == 2 for move in content_args[0]):
+                    print(f"Error: DataType.ADD_BATCH requires one list of (x, y) tuples, received {content_args}")
+                    return False
+                try:
+                    packed_content = pack_moves(content_args[0])
+                    content_length = len(packed_content)
+                except ProtocolError as e:
+                    print(f"Error: Could not pack ADD_BATCH content {content_args}. {e}")
+                    return False
+            elif data_type_enum in (DataType.CREATE, DataType.SNAPSHOT, DataType.PING):
+                if len(content_args) != 0:
+                    print(f"Warning: {data_type_enum} expects no content, but received {content_args}")
+            elif data_type_enum == DataType.JOIN:
+                if len(content_args) != 1 or not isinstance(content_args[0], int):
+                    print(f"Error: DataType.JOIN requires one integer (room_id), received {content_args}")
+                    return False
+                packed_content     = struct.pack(ROOM_CONTENT_FORMAT, content_args[0])
+                content_length     = ROOM_CONTENT_SIZE
+                content_format     = ROOM_CONTENT_FORMAT
 
             header                 = struct.pack(HEADER_FORMAT, data_type_value, content_length)
             message                = header + packed_content
@@ -162,88 +246,149 @@ class SocketClient:
             print('Message:', message)
             
             # Use sendall to ensure entire message is sent
-            self.socket.sendall(message)
+            with self.__send_lock:
+                self.socket.sendall(message)
             print('Sent:', message)
             return True
         except socket.error as e:
-            print(f'Socket send error: {e}')
-            with self.__lock:
-                self.__is_connected = False
-                self.close()
+            self._connection_lost(f'send failed: {e}')
             return False
         except Exception as e:
             print(f'Unexpected error: {e}')
             return False
 
     def receive(self):
-        if not self.is_connected:
-            return None
-        
+        """
+        Next frame from the server, or None if the connection is lost.
+
+        Waits for data without holding the read lock, so a _request from another
+        thread, e.g. a hotkey's resync, can make its round trip in the meantime.
+        """
+        while self._available():
+            with self.__read_lock:
+                received_data = self._read(block=False)
+            if received_data is not NOTHING:
+                return received_data
+            self._wait_readable()
+        return None
+
+    def _readable(self) -> bool:
+        """Whether the socket has data waiting; a read would not block."""
         try:
-            # Do network operations outside lock
-            header_bytes = self._recv_all(HEADER_SIZE)
-            if not header_bytes:
-                print('Connection lost while reading header.')
-                with self.__lock:
-                    self.__is_connected = False
-                    self.close()
-                return None
-            
-            print(f'HeaderSize: {len(header_bytes)}')
-            
-            data_type_value, content_length = struct.unpack(HEADER_FORMAT, header_bytes)
+            return bool(select.select([self.socket], [], [], 0)[0])
+        except (OSError, TypeError, ValueError):                  # Closed or replaced meanwhile: let the read fail
+            return True
+
+    def _wait_readable(self):
+        """Wait up to heartbeat_interval for data, declaring the server dead after peer_timeout."""
+        try:
+            ready = select.select([self.socket], [], [], self.heartbeat_interval)[0]
+        except (OSError, TypeError, ValueError) as e:
+            if self._available():
+                self._connection_lost(f'receive failed: {e}')
+            return
+        if not ready and time.monotonic() - self.__last_seen > self.peer_timeout:
+            self._connection_lost(f'no data for {self.peer_timeout}s')
+
+    def _read(self, block=True):
+        """
+        Pop the next non-PING frame, reading the socket as needed. The caller holds __read_lock.
+
+        Args:
+            block: Wait for a frame; otherwise return NOTHING when none is complete yet.
+
+        Returns:
+            The decoded frame, NOTHING, or None if the connection is lost or the frame is invalid.
+        """
+        try:
+            # One recv may complete several frames.
+            # The socket times out every heartbeat_interval so a silent server is noticed.
+            while not self.__pending:
+                if not block and not self._readable():
+                    return NOTHING
+                try:
+                    frames = self.__reader.read_frames()
+                except socket.timeout:
+                    if time.monotonic() - self.__last_seen > self.peer_timeout:
+                        self._connection_lost(f'no data for {self.peer_timeout}s')
+                        return None
+                    continue
+                self.__last_seen = time.monotonic()
+                self.__pending.extend(frame for frame in frames if frame[0] != DataType.PING.value)
+            data_type_value, content_bytes = self.__pending.popleft()
+
+            print('Data:', data_type_value, len(content_bytes))
 
-            print('Data:', data_type_value, content_length)
-            
-            # Validate content length before receiving
-            if content_length < 0:
-                print(f'Invalid content length: {content_length}')
-                return None
-            
-            content_bytes = b''
-            if content_length > 0:
-                content_bytes = self._recv_all(content_length)
-                if not content_bytes:
-                    print('Receive: Connection closed or failed while reading content.')
-                    with self.__lock:
-                        self.__is_connected = False
-                        self.close()
-                    return None
-                
-            # Process received data outside lock
-            try: 
-                data_type_enum   = DataType(data_type_value)
-            except ValueError:
-                print(f'Received unknown DataType value: {data_type_value}')
-                return None
-            
             # Unpack content based on type
-            unpacked_content     = None
-            if data_type_enum == DataType.ADD and content_length == ADD_CONTENT_SIZE:
-                unpacked_content = struct.unpack(ADD_CONTENT_FORMAT, content_bytes)
-            elif data_type_enum == DataType.UNDO and content_length == UNDO_CONTENT_SIZE:
-                unpacked_content = struct.unpack(UNDO_CONTENT_FORMAT, content_bytes)[0]
-            elif data_type_enum == DataType.SWAP and content_length == SWAP_CONTENT_SIZE:
-                unpacked_content = struct.unpack(SWAP_CONTENT_FORMAT, content_bytes)[0]
-            elif data_type_enum == DataType.CLEAR:
-                unpacked_content = None
-            else:
-                print(f'Unexpected content length {content_length} for data type {data_type_enum}')
+            try:
+                return decode_message(data_type_value, content_bytes)
+            except ProtocolError as e:
+                print(f'Receive: {e}')
                 return None
-            
-            return data_type_enum, unpacked_content
-        except socket.error as e:
-            print(f'Socket error: {e}')
-            with self.__lock:
-                self.__is_connected = False
-                self.close()
+        except (socket.error, ProtocolError) as e:
+            self._connection_lost(f'receive failed: {e}')
             return None
         except Exception as e:
             print(f'Unexpected error: {e}')
             return None
 
-    def close(self):
-        """Close socket connection safely"""
+    def _request(self, *args):
+        """
+        Send a request and wait for the reply of the same DataType.
+
+        Game frames received before the reply are discarded: the server answers in
+        order, so they are either already reflected in the reply or belong to the room
+        the client just left. The read lock is held for the whole round trip, so a
+        concurrent receive() cannot take the reply.
+        """
+        with self.__read_lock:
+            if not self._available() or not self.send(*args):
+                return None
+            while (received_data := self._read()) is not None:
+                if received_data[0] == args[0]:
+                    return received_data[1]
+                print(f'Discarding {received_data[0]} while waiting for {args[0]}')
+            return None
+
+    def _room_request(self, *args):
+        """Send a CREATE/JOIN request and wait for the server's reply."""
+        room_id = self._request(*args)
+        if room_id is None or room_id == NO_ROOM:
+            return None
+        self.room_id = room_id
+        return room_id
+
+    def request_snapshot(self):
+        """Fetch the server's move list and turn for this client's room in one round trip."""
+        snapshot = self._request(DataType.SNAPSHOT)
+        if snapshot is not None:
+            self.snapshot = snapshot
+            self.room_id  = snapshot[0]
+        return snapshot
+
+    def resync(self) -> bool:
+        """Rejoin the previous room if there was one and catch up with the server's game state."""
+        if self.room_id is not None and self.join_room(self.room_id) is None:
+            print(f'Room {self.room_id} is no longer available, continuing in a new room')
+        snapshot = self.request_snapshot()
+        if snapshot is None:
+            return False
+        _, current_turn, moves = snapshot
+        print(f'Resynced room {self.room_id}: {len(moves)} moves')
+        if self.on_resync is not None:
+            self.on_resync(current_turn, moves)
+        return True
+
+    def create_room(self):
+        """Open a private room on the server and return its join code, or None on failure."""
+        return self._room_request(DataType.CREATE)
+
+    def join_room(self, room_id):
+        """Join the room with the given code; returns the room id, or None if it is missing or full."""
+        return self._room_request(DataType.JOIN, room_id)
+
+    def _close_socket(self):
+        """Close the current socket without stopping the client"""
         with self.__lock:
             if self.__is_connected:
                 try:
@@ -256,6 +401,14 @@ class SocketClient:
                     pass
                 self.socket         = None
                 self.__is_connected = False
+                self.__state_changed.notify_all()
+
+    def close(self):
+        """Close socket connection safely and stop heartbeats and reconnects"""
+        with self.__lock:
+            self.__closed = True
+            self._close_socket()
+            self.__state_changed.notify_all()
 
     def __del__(self):
         """Ensure socket is closed on deletion"""
@@ -313,23 +466,27 @@ class Game:
     Swap4 stimulate with improved state management
     """
     def __init__(self, socket_client: SocketClient, board: Board):
-        self.__moves                           = []
+        self.__state            : GameState    = GameState(*board.size, stop_at_win=False)       # Moves on a bitboard: O(1) lookups; the server decides wins
         self.__client           : SocketClient = socket_client
         self.__board            : Board        = board
+        self.__watcher          : BoardWatcher = BoardWatcher(board)
         self.__listener         : Listener     = Listener()
         self.__game_state                      = Event()
         self.__lock_turn                       = False if input('B/W').lower() == 'b' else True    
+        self.__seat                            = 1 if self.__lock_turn else 0                        # 0 = opens the game, as in the server's current_turn
         self.__new_game                        = True
         self.__swap_pending                    = False
         self.__moves_until_swap                = 3
-        self.__lock                            = Lock()                                              # Add dedicated lock for thread safety
+        self.__lock                            = RLock()                                             # Guards every change to the game; hotkeys run in their own lanes
         self.__background_thread: Thread       = Thread(target=self.background_task, daemon=True)
         self.__is_running                      = True
+        self.__client.on_resync                = self.apply_snapshot
 
     def __recursive_get_move(self):
         while self.__is_running:                                                                     # Add timeout and interruption check
-            if (move := self.__board.get_last_move()) is not None:
-                return move
+            delta = self.__watcher.poll()                                                            # None while the board is unchanged
+            if delta is not None and delta.last_move is not None:
+                return delta.last_move
             time.sleep(0.05)                                                                         # Add small sleep to prevent CPU spinning
         return None
             
@@ -339,28 +496,31 @@ class Game:
                 # Do network operations outside of lock
                 received_data = self.__client.receive()
                 if received_data is None:
-                    time.sleep(0.1)  # Add small delay to prevent CPU spinning
+                    if not self.__client.wait_connected():                                            # Sleeps through reconnects
+                        break
                     continue
 
                 received_type, parsed_content = received_data
 
                 # Only acquire lock for state modifications
-                if received_type == DataType.UNDO:
-                    num_undone = parsed_content
-                    undo(num_undone)
-                    
-                    if len(self.__moves) <= self.__moves_until_swap:
-                        self.__swap_pending = False
-                    
-                    if num_undone % 2 == 0:
-                        self.__lock_turn = True
-
-                elif received_type == DataType.CLEAR:
-                    self.reset_game()
-                        
-                elif received_type == DataType.SWAP:
-                    self.__lock_turn = parsed_content
-                    print(f"Turn swapped by opponent. Your turn: {not self.__lock_turn}")
+                with self.__lock:
+                    if received_type == DataType.UNDO:
+                        num_undone = parsed_content
+                        undo(num_undone)
+                        self.__state.undo_moves(num_undone)
+
+                        if len(self.__state) <= self.__moves_until_swap:
+                            self.__swap_pending = False
+
+                        if num_undone % 2 == 0:
+                            self.__lock_turn = True
+
+                    elif received_type == DataType.CLEAR:
+                        self.reset_game()
+
+                    elif received_type == DataType.SWAP:
+                        self.__lock_turn = parsed_content
+                        print(f"Turn swapped by opponent. Your turn: {not self.__lock_turn}")
 
             except Exception as e:
                 print(f"Error in background task: {e}")
@@ -390,41 +550,79 @@ class Game:
             print('---Raw Data---', received_data)
             if received_data is None:
                 print('Sync: Failed to receive data from server.')
+                self.__client.wait_connected()
                 return
             
             received_type, parsed_content = received_data
             print(f'Received Data: {received_data}')
-
-
-            if received_type == DataType.ADD:
-                move     = parsed_content
-                if move in self.__moves:
-                    turn = len(self.__moves) - self.__moves.index(move) - 1
-                    undo(turn)
-                    return           
-
-                cur_mouse_position = get_mouse_position()
-                self.__lock_turn = False
-                self.__board.click(*self.__board.move_to_coord(*move))
-                self.__moves.append(move)
-                mouse_move_to(*cur_mouse_position)
+            with self.__lock:
+                self.__apply_received(received_type, parsed_content)
         else:
             print('Lock Release')
             # Get move outside lock
             move = self.__recursive_get_move()
 
-            if move and move not in self.__moves:
-                print(f'Append {move} | Len: {len(self.__moves)}')
-                self.__moves.append(move)
-            
-                self.__lock_turn ^= not swap2
-                    
-                # Send data outside lock 
-                status = self.__client.send(DataType.ADD, move)
-                print('Send Status:', status)
-                
-                if not swap2 and len(self.__moves) == self.__moves_until_swap:
-                    self.__swap_pending = True
+            with self.__lock:
+                if move and move not in self.__state:
+                    print(f'Append {move} | Len: {len(self.__state)}')
+                    try:
+                        if self.__state.add_move(*move):
+                            print(f'Five in a row: {COLOR_NAMES[self.__state.winner]} wins')
+                    except IllegalMove as e:
+                        print(f'Cannot play {move}: {e}')
+                        self.resync()
+                        return
+
+                    self.__lock_turn ^= not swap2
+
+                    status = self.__client.send(DataType.ADD, move)
+                    print('Send Status:', status)
+
+                    if not swap2 and len(self.__state) == self.__moves_until_swap:
+                        self.__swap_pending = True
+
+    def __apply_received(self, received_type, parsed_content):
+        """Play a frame sync() received from the opponent or the server; called with the lock held"""
+        if received_type == DataType.ADD:
+            move     = parsed_content
+            ply      = self.__state.index_of(move)
+            if ply is not None:
+                turn = len(self.__state) - ply - 1
+                undo(turn)
+                self.__state.undo_moves(turn)
+                return
+
+            try:
+                self.__state.add_move(*move)
+            except IllegalMove as e:
+                print(f'Cannot play received move {move}: {e}')
+                self.resync()
+                return
+            cur_mouse_position = get_mouse_position()
+            self.__lock_turn = False
+            self.__board.click(*self.__board.move_to_coord(*move))
+            mouse_move_to(*cur_mouse_position)
+
+        elif received_type == DataType.ADD_BATCH:
+            moves    = [move for move in parsed_content if move not in self.__state]
+            try:
+                self.__state.add_moves(moves)
+            except IllegalMove as e:
+                print(f'Cannot play received batch: {e}')
+                self.resync()
+                return
+            cur_mouse_position = get_mouse_position()
+            for move in moves:
+                self.__board.click(*self.__board.move_to_coord(*move))
+            mouse_move_to(*cur_mouse_position)
+            self.__lock_turn = len(parsed_content) % 2 == 0                                           # Odd batch hands the turn over
+
+        elif received_type == DataType.SNAPSHOT:                                                     # The server rejected our last move
+            _, current_turn, moves = parsed_content
+            self.apply_snapshot(current_turn, moves)
+
+        elif received_type == DataType.RESULT:
+            print(f'Game over: {COLOR_NAMES[parsed_content]} wins')
 
     def ask_swap2(self):
         if not self.__swap_pending:
@@ -434,44 +632,100 @@ class Game:
         dialog                      = SwapDialog()
         result                      = dialog.show()
         
-        self.__swap_pending         = False                                                          # Reset swap pending state
-        
-        if result == 2:                                                                              # Add 2 more stones
-            self.__lock_turn        = False
-            self.__moves_until_swap = 5                                                              # Next swap opportunity after 2 more moves
+        with self.__lock:
+            self.__swap_pending         = False                                                      # Reset swap pending state
+            if result == 2:                                                                          # Add 2 more stones
+                self.__lock_turn        = False
+                self.__moves_until_swap = 5                                                          # Next swap opportunity after 2 more moves
+            else:                                                                                    # Chose black (0) or white (1)
+                self.__client.send(DataType.SWAP, result == 1)                                       # White moves next: True = this player
+                self.resync()                                                                        # Turn changes only if the server accepted
+        if result == 2:
             for _ in range(2):
                 self.sync(True)
-        else:                                                                                        # Chose black (0) or white (1)
-            self.__lock_turn        = result == 0                                                    # True if black, False if white
-            self.__client.send(DataType.SWAP, not self.__lock_turn)                                  # Send opposite turn to opponent
         
         return
 
+    def resync(self):
+        """Replace the local game with the server's after the two disagreed"""
+        snapshot = self.__client.request_snapshot()
+        if snapshot is None:
+            print('Resync failed: no snapshot from the server')
+            return
+        _, current_turn, moves = snapshot
+        self.apply_snapshot(current_turn, moves)
+
+    def apply_snapshot(self, current_turn, moves):
+        """Converge the local board and turn on the server's after a reconnect or a rejected move"""
+        with self.__lock:
+            moves  = list(moves)
+            local  = self.__state.moves
+            played = len(local)
+            common = 0
+            while common < min(len(moves), played) and moves[common] == local[common]:
+                common += 1
+
+            cur_mouse_position = get_mouse_position()
+            undo(played - common)                                                                    # Take back moves the server never saw
+            for move in moves[common:]:
+                self.__board.click(*self.__board.move_to_coord(*move))
+            mouse_move_to(*cur_mouse_position)
+
+            self.__lock_turn       = current_turn != (self.__seat == 1)                              # Server's turn wins, also after a SWAP
+            self.__state.undo_moves(played - common)
+            try:
+                self.__state.add_moves(moves[common:])
+            except IllegalMove as e:                                                                 # Not resynced again: the server's game does not fit this board
+                print(f'Cannot apply the server position: {e}')
+            if len(self.__state) <= self.__moves_until_swap:
+                self.__swap_pending = False
+
+    def load_opening(self, move_string=None):
+        """Place an opening on the board and send it to the opponent as a single batch"""
+        if move_string is None:
+            move_string = input('Opening: ')
+        with self.__lock:
+            moves = [move for move in self.__board.set_pos(move_string) if move not in self.__state]
+            if not moves:
+                return
+            try:
+                self.__state.add_moves(moves)
+            except IllegalMove as e:
+                print(f'Cannot play opening {move_string}: {e}')
+                self.resync()
+                return
+            self.__lock_turn ^= len(moves) % 2 == 1
+            self.__client.send(DataType.ADD_BATCH, moves)
+
     def reset_game(self):
         """Reset the game state completely"""
-        undo(len(self.__moves))
-        self.__moves.clear()
-        self.__new_game             = True
-        self.__swap_pending         = False
-        self.__moves_until_swap     = 3
-        self.__lock_turn            = False
-        self.__client.send(DataType.CLEAR)
+        with self.__lock:
+            undo(len(self.__state))
+            self.__state.clear()
+            self.__new_game             = True
+            self.__swap_pending         = False
+            self.__moves_until_swap     = 3
+            self.__lock_turn            = False
+            self.__seat                 = 0
+            self.__client.send(DataType.CLEAR)
 
     def swap_turn(self):
-        """Manually swap turns and notify opponent"""
-        self.__lock_turn            = not self.__lock_turn
-        self.__client.send(DataType.SWAP, not self.__lock_turn)
+        """Manually swap turns and notify opponent; the turn follows the server's answer"""
+        with self.__lock:
+            self.__client.send(DataType.SWAP, self.__lock_turn)                                      # Locked now: ask to move next
+            self.resync()
 
     def manager(self):
         """Main game loop with improved state management"""
         print('Manager Start')
         print('PlayerTurn:', self.__lock_turn)
         while not self.__game_state.is_set():
-            if self.__new_game:
-                self.__new_game = False
-                self.__moves_until_swap = 3
+            with self.__lock:
+                if self.__new_game:
+                    self.__new_game = False
+                    self.__moves_until_swap = 3
                 
-            if len(self.__moves) < 3:
+            if len(self.__state) < 3:
                 self.sync(True)
             elif self.__swap_pending:
                 self.ask_swap2()
@@ -483,12 +737,12 @@ class Game:
             try:
                 listener.add_hotkey('alt+w', self.swap_turn)
                 listener.add_hotkey('alt+r', self.reset_game)
-                listener.add_hotkey('alt+p', self.manager)
+                listener.add_hotkey('alt+p', self.manager, lane=DROP_IF_RUNNING)                 # Game loop runs in its own lane
+                listener.add_hotkey('alt+o', self.load_opening, lane=DROP_IF_RUNNING)
     
                 # self.__background_thread.start()
 
-                while not listener._stop_event.is_set():
-                    time.sleep(0.1)
+                listener.wait()
             except Exception as e:
                 print(f'Error: {e}')
 
@@ -497,22 +751,41 @@ class Controller:
     def __init__(self):
         self._screen_capture             = None
         self._detected_board             = None
+        self._detection_cache            = DetectionCache()
         self._client_host : SocketClient = None
         self._game_manager: Game         = None
         self._board_game  : Board        = None
         self._listener    : Listener     = None
         self._is_running  : bool         = False
 
-    def select_board(self):
+    def select_board(self, auto=True):
+        """
+        Locate the board, headless first (cached board, visible windows, then the whole
+        monitor), falling back to dragging a rectangle around it.
+        """
         try:
             self._detected_board             = None
+            self._board_game                 = None
+            if auto:
+                grid                         = self._detection_cache.locate(window_rects())
+                if grid is not None:
+                    self._board_game         = grid.to_board()
+                    self._detected_board     = grid_rect(grid)
+                    print(f'Board found at {self._detected_board}, {grid.size_x}x{grid.size_y}')
             while self._detected_board is None:       
                 self._screen_capture         = ScreenCapture().get()     
                 self._detected_board         = detect_board(self._screen_capture[0], self._screen_capture[2], self._screen_capture[1])    
                 if None in self._detected_board:
                     self._detected_board     = None
-            
-            self._board_game                 = Board((self._detected_board[0], self._detected_board[1]),
+
+            if self._board_game is None:
+                try:
+                    grid                     = refine_board(self._detected_board)
+                    self._board_game         = grid.to_board()
+                    print(f'Grid {grid.size_x}x{grid.size_y}, pitch {grid.pitch_x:.2f}x{grid.pitch_y:.2f}')
+                except ValueError as e:
+                    print(f'Grid fit failed ({e}), using the detected rectangle')
+                    self._board_game         = Board((self._detected_board[0], self._detected_board[1]),
                                                      (self._detected_board[2], self._detected_board[3]), 15, 15)
             # mouse_clip(self._detected_board[0]                          , self._detected_board[1], 
             #            self._detected_board[0] + self._detected_board[2], self._detected_board[1] + self._detected_board[3])
@@ -521,6 +794,17 @@ class Controller:
             self.cleanup()
             raise
 
+    def calibrate_colors(self):
+        """Derive a colour profile from the selected board, which must show both stone colours; color.cfg is left alone"""
+        if self._board_game is None:
+            print('Select the board (Alt+B) before calibrating colours')
+            return
+        try:
+            path = get_color_store().save(calibrate_profile(self._board_game, CALIBRATED_PROFILE))
+            print(f"Colour profile '{CALIBRATED_PROFILE}' written to {path}")
+        except ValueError as e:
+            print(f'Calibration failed: {e}')
+
     def setup_client(self):
         try:
             host               = input('Server Host: ')
@@ -528,6 +812,7 @@ class Controller:
             if not (0 <= port <= 65535):
                 raise ValueError("Port must be between 0-65535")
             self._client_host  = SocketClient(host, port)
+            self.setup_room()
         except ValueError as e:
             print(f"Invalid port number: {e}")
             self.cleanup()
@@ -537,6 +822,22 @@ class Controller:
             self.cleanup()
             raise
 
+    def setup_room(self):
+        """Pick the room to play in: auto-match, a new private room, or an existing join code."""
+        code = input('Room code (empty = auto-match, "new" = create): ').strip().lower()
+        if not code:
+            return
+        if code == 'new':
+            room_id = self._client_host.create_room()
+            if room_id is None:
+                raise RuntimeError("Server refused to create a room")
+            print(f'Created room {room_id}, share this code with your opponent')
+        else:
+            room_id = self._client_host.join_room(int(code))
+            if room_id is None:
+                raise RuntimeError(f"Room {code} does not exist or is full")
+            print(f'Joined room {room_id}')
+
     def game_init(self):
         try:
             if not self._client_host or not self._board_game:
@@ -569,14 +870,13 @@ class Controller:
                         game.start()
 
             # Register hotkey for board selection (Alt+B)
-            self._listener.add_hotkey('alt+b', on_board_select)
+            self._listener.add_hotkey('alt+b', on_board_select, lane=DROP_IF_RUNNING)       # Blocks for the whole game
+            self._listener.add_hotkey('alt+k', self.calibrate_colors, lane=DROP_IF_RUNNING)
 
             # Start listening for hotkeys
             print("Press Alt+B to select the game board and start...")
-            while self._is_running:
-                if self._listener._stop_event.is_set():
-                    break
-                time.sleep(0.1)
+            while self._is_running and not self._listener.wait(timeout=1.0):              # Timeout keeps Ctrl+C responsive on Windows
+                pass
 
         except KeyboardInterrupt:
             print("\nGame initialization interrupted by user.")
@@ -640,6 +940,8 @@ def main():
             print("- Alt+W: Swap turn")
             print("- Alt+R: Reset game")
             print("- Alt+P: Play/Continue game")
+            print("- Alt+O: Load an opening")
+            print("- Alt+K: Calibrate colours from the board")
             print("- ESC: Exit")
             
             controller.init_game()
@@ -0,0 +1,235 @@
+import socket
+import struct
+from   enum   import Enum
+from   typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Wire protocol shared by the client (main.py) and the server (server.py).
+# Every frame is a HEADER_FORMAT header (type, content length) followed by the content.
+HEADER_FORMAT        = '!ii'
+HEADER_SIZE          = struct.calcsize(HEADER_FORMAT)
+
+ADD_CONTENT_FORMAT   = '!ii'
+ADD_CONTENT_SIZE     = struct.calcsize(ADD_CONTENT_FORMAT)
+
+UNDO_CONTENT_FORMAT  = '!i'
+UNDO_CONTENT_SIZE    = struct.calcsize(UNDO_CONTENT_FORMAT)
+
+SWAP_CONTENT_FORMAT  = '!?' # Boolean for turn state
+SWAP_CONTENT_SIZE    = struct.calcsize(SWAP_CONTENT_FORMAT)
+
+CLEAR_CONTENT_FORMAT = ''
+CLEAR_CONTENT_SIZE   = 0
+
+ROOM_CONTENT_FORMAT  = '!i' # Room id / join code, -1 = request refused
+ROOM_CONTENT_SIZE    = struct.calcsize(ROOM_CONTENT_FORMAT)
+
+NO_ROOM              = -1
+
+RESULT_CONTENT_FORMAT = '!b' # Winning colour, see bitboard.BLACK / bitboard.WHITE
+RESULT_CONTENT_SIZE   = struct.calcsize(RESULT_CONTENT_FORMAT)
+
+MOVE_FORMAT          = '!BB' # One (x, y) pair inside an ADD_BATCH frame
+MOVE_SIZE            = struct.calcsize(MOVE_FORMAT)
+
+SNAPSHOT_FORMAT      = '!i?' # Room id, current turn; followed by the moves packed as in ADD_BATCH
+SNAPSHOT_SIZE        = struct.calcsize(SNAPSHOT_FORMAT)
+
+MAX_CONTENT_SIZE     = 1 << 20  # Anything larger is treated as a corrupt stream
+
+_HEADER              = struct.Struct(HEADER_FORMAT)
+_ADD                 = struct.Struct(ADD_CONTENT_FORMAT)
+_UNDO                = struct.Struct(UNDO_CONTENT_FORMAT)
+_SWAP                = struct.Struct(SWAP_CONTENT_FORMAT)
+_ROOM                = struct.Struct(ROOM_CONTENT_FORMAT)
+_SNAPSHOT            = struct.Struct(SNAPSHOT_FORMAT)
+_RESULT              = struct.Struct(RESULT_CONTENT_FORMAT)
+
+
+class DataType(Enum):
+    UNDO      = 1
+    ADD       = 2
+    CLEAR     = 3
+    SWAP      = 4
+    CREATE    = 5
+    JOIN      = 6
+    ADD_BATCH = 7
+    SNAPSHOT  = 8
+    PING      = 9
+    RESULT    = 10                 # Server -> clients only: the game ended
+
+
+class ProtocolError(Exception):
+    """Raised when a frame cannot be decoded."""
+    pass
+
+
+def pack_moves(moves) -> bytes:
+    """
+    Pack (x, y) pairs into an ADD_BATCH content array, MOVE_SIZE bytes per move.
+
+    Raises:
+        ProtocolError: If a coordinate does not fit in a byte.
+    """
+    flat = [int(coord) for move in moves for coord in move]
+    try:
+        return struct.pack(f'!{len(flat)}B', *flat)
+    except struct.error as e:
+        raise ProtocolError(f"Cannot pack moves {moves}: {e}")
+
+
+def unpack_moves(content: bytes) -> List[Tuple[int, int]]:
+    """Unpack ADD_BATCH content into a list of (x, y) pairs."""
+    if len(content) % MOVE_SIZE:
+        raise ProtocolError(f"ADD_BATCH content length {len(content)} is not a multiple of {MOVE_SIZE}")
+    return list(zip(content[0::2], content[1::2]))
+
+
+def pack_snapshot(room_id: int, current_turn: bool, moves) -> bytes:
+    """Pack a SNAPSHOT reply: the room's full move list and turn in one frame."""
+    return _SNAPSHOT.pack(room_id, current_turn) + pack_moves(moves)
+
+
+def unpack_snapshot(content: bytes) -> Optional[Tuple[int, bool, List[Tuple[int, int]]]]:
+    """
+    Unpack SNAPSHOT content.
+
+    Returns:
+        None for a request (empty content), else (room id, current turn, moves).
+    """
+    if not content:
+        return None
+    if len(content) < SNAPSHOT_SIZE:
+        raise ProtocolError(f"SNAPSHOT content too short: {len(content)}")
+    room_id, current_turn = _SNAPSHOT.unpack_from(content)
+    return room_id, current_turn, unpack_moves(content[SNAPSHOT_SIZE:])
+
+
+# DataType -> (expected content size or None if variable, decoder)
+CONTENT_DECODERS: Dict[DataType, Tuple[Optional[int], Callable[[bytes], Any]]] = {
+    DataType.ADD      : (ADD_CONTENT_SIZE,   _ADD.unpack),
+    DataType.UNDO     : (UNDO_CONTENT_SIZE,  lambda content: _UNDO.unpack(content)[0]),
+    DataType.SWAP     : (SWAP_CONTENT_SIZE,  lambda content: _SWAP.unpack(content)[0]),
+    DataType.CLEAR    : (None,               lambda content: None),
+    DataType.CREATE   : (None,               lambda content: _ROOM.unpack(content)[0] if content else None),
+    DataType.JOIN     : (ROOM_CONTENT_SIZE,  lambda content: _ROOM.unpack(content)[0]),
+    DataType.ADD_BATCH: (None,               unpack_moves),
+    DataType.SNAPSHOT : (None,               unpack_snapshot),
+    DataType.PING     : (None,               lambda content: None),
+    DataType.RESULT   : (RESULT_CONTENT_SIZE, lambda content: _RESULT.unpack(content)[0]),
+}
+
+_DATA_TYPES          = {data_type.value: data_type for data_type in DataType}
+
+
+def decode_message(data_type_value: int, content: bytes) -> Tuple[DataType, Any]:
+    """
+    Decode a frame's type and content with a table lookup.
+
+    Args:
+        data_type_value: Raw type field from the header.
+        content: Frame content.
+
+    Returns:
+        Tuple of (DataType, decoded content).
+
+    Raises:
+        ProtocolError: If the type is unknown or the content has the wrong size.
+    """
+    data_type = _DATA_TYPES.get(data_type_value)
+    if data_type is None:
+        raise ProtocolError(f"Unknown DataType value: {data_type_value}")
+    size, decoder = CONTENT_DECODERS[data_type]
+    if size is not None and len(content) != size:
+        raise ProtocolError(f"Unexpected content length {len(content)} for data type {data_type}")
+    try:
+        return data_type, decoder(content)
+    except struct.error as e:
+        raise ProtocolError(f"Malformed {data_type} content: {e}")
+
+
+def encode_message(data_type: DataType, content: bytes = b'') -> bytes:
+    """Frame already packed content with its header."""
+    return _HEADER.pack(data_type.value, len(content)) + content
+
+
+class FrameReader:
+    """
+    Buffered frame reader for a blocking socket.
+
+    Each recv_into fills a preallocated buffer, and every complete frame in it is
+    parsed in place, so a burst of small frames costs one syscall instead of two
+    per frame and no message is ever rebuilt by repeated concatenation.
+    """
+    def __init__(self, sock: socket.socket, buffer_size: int = 64 * 1024):
+        """
+        Args:
+            sock: Connected socket to read from.
+            buffer_size: Initial buffer size; grows for frames that do not fit.
+        """
+        self.sock   = sock
+        self._buf   = bytearray(buffer_size)
+        self._view  = memoryview(self._buf)
+        self._start = 0                                    # First unparsed byte
+        self._end   = 0                                    # One past the last received byte
+
+    def _make_room(self, needed: int) -> None:
+        """Move the partial frame to the front, growing the buffer if it still does not fit."""
+        pending = self._end - self._start
+        if self._start:
+            self._buf[:pending] = self._buf[self._start:self._end]
+            self._start, self._end = 0, pending
+        if needed > len(self._buf):
+            self._view.release()
+            self._buf  = self._buf + bytearray(needed - len(self._buf))
+            self._view = memoryview(self._buf)
+
+    def parse_frames(self) -> List[Tuple[int, bytes]]:
+        """
+        Parse every complete frame currently buffered.
+
+        Returns:
+            List of (data type value, content) tuples, possibly empty.
+
+        Raises:
+            ProtocolError: If a header carries an invalid content length.
+        """
+        frames = []
+        view   = self._view
+        while self._end - self._start >= HEADER_SIZE:
+            data_type_value, content_length = _HEADER.unpack_from(view, self._start)
+            if content_length < 0 or content_length > MAX_CONTENT_SIZE:
+                raise ProtocolError(f"Invalid content length: {content_length}")
+            frame_end = self._start + HEADER_SIZE + content_length
+            if frame_end > self._end:
+                break
+            frames.append((data_type_value, bytes(view[self._start + HEADER_SIZE:frame_end])))
+            self._start = frame_end
+
+        if self._start == self._end:
+            self._start = self._end = 0
+        elif self._end - self._start >= HEADER_SIZE:
+            frame_size = HEADER_SIZE + _HEADER.unpack_from(view, self._start)[1]
+            if self._start + frame_size > len(self._buf):
+                self._make_room(frame_size)
+        elif self._end == len(self._buf):
+            self._make_room(HEADER_SIZE)
+        return frames
+
+    def read_frames(self) -> List[Tuple[int, bytes]]:
+        """
+        Receive once and return every frame completed by that read.
+
+        Returns:
+            List of (data type value, content) tuples; empty if the read only produced a partial frame.
+
+        Raises:
+            ConnectionError: If the peer closed the connection.
+            ProtocolError: If the stream is corrupt.
+        """
+        if self._end == len(self._buf):
+            self._make_room(self._end - self._start + 1)
+        received = self.sock.recv_into(self._view[self._end:])
+        if not received:
+            raise ConnectionError("Connection closed by peer")
+        self._end += received
+        return self.parse_frames()
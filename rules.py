@@ -0,0 +1,369 @@
+from enum   import Enum
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from bitboard import BLACK, WHITE, DEFAULT_SIZE, WIN_LENGTH, GameState, IllegalMove, Move
+
+# Server-side rule engine: who may move, where, and whether the opening protocol is followed.
+# Seats are the players' positions in their room: seat 0 opens the game, seat 1 answers.
+FREESTYLE  = 'freestyle'           # Five or more in a row wins
+STANDARD   = 'standard'            # Exactly five wins, overlines are legal but do not win
+RENJU      = 'renju'               # Black: exactly five, no overline, double-four or double-three; white: five or more
+RULES      = (FREESTYLE, STANDARD, RENJU)
+
+SWAP2      = 'swap2'
+NO_OPENING = 'none'
+OPENINGS   = (SWAP2, NO_OPENING)
+
+SIDE       = WIN_LENGTH            # Cells examined on each side of a move
+SIDE_CODES = (1 << (SIDE + 1)) - 1 # Distinct sides, see side_code()
+
+_EMPTY, _STONE, _BLOCKED = 0, 1, 2
+
+
+class RuleViolation(IllegalMove):
+    """Raised when a move or choice is legal on the board but not allowed by the rules or the opening protocol."""
+    pass
+
+
+class Phase(Enum):
+    OPENING      = 'opening'       # Seat 0 places the first three stones
+    SWAP2_CHOICE = 'swap2-choice'  # Seat 1 picks a colour, or places stones 4 and 5
+    SWAP2_EXTRA  = 'swap2-extra'   # Seat 1 places stones 4 and 5
+    SWAP2_FINAL  = 'swap2-final'   # Seat 0 picks a colour
+    PLAY         = 'play'          # Colours are settled, the players alternate
+
+
+class LineShape(NamedTuple):
+    """What a new stone makes along one line, with the stones of its own colour only."""
+    five     : bool                # Exactly WIN_LENGTH in a row through the stone
+    overline : bool                # More than WIN_LENGTH in a row through the stone
+    fours    : int                 # Fours through the stone: 0, 1 or 2 on a single line
+    three    : bool                # An open three: one more stone makes a straight four
+
+
+def side_code(length: int, stones: int) -> int:
+    """
+    Index of one side of a line: `length` open cells next to the move (at most
+    SIDE, the next one being the edge or an opposing stone), `stones` a bitmask of
+    which of them hold the mover's stones, nearest first.
+    """
+    return (1 << length) - 1 + stones
+
+
+def _side_cells(code: int) -> List[int]:
+    """Cells of a side code, nearest first, padded with _BLOCKED to SIDE cells."""
+    length = (code + 1).bit_length() - 1
+    stones = code - ((1 << length) - 1)
+    return [(_STONE if stones >> i & 1 else _EMPTY) if i < length else _BLOCKED for i in range(SIDE)]
+
+
+def _run(line: List[int], index: int) -> Tuple[int, int]:
+    """First and last index of the run of stones through line[index]."""
+    first = last = index
+    while first > 0 and line[first - 1] == _STONE:
+        first -= 1
+    while last < len(line) - 1 and line[last + 1] == _STONE:
+        last  += 1
+    return first, last
+
+
+def _completions(line: List[int], center: int) -> List[int]:
+    """Empty cells that would give the center stone a run of exactly WIN_LENGTH."""
+    cells = []
+    for index, cell in enumerate(line):
+        if cell != _EMPTY:
+            continue
+        line[index]  = _STONE
+        first, last  = _run(line, center)
+        line[index]  = _EMPTY
+        if first <= index <= last and last - first + 1 == WIN_LENGTH:
+            cells.append(index)
+    return cells
+
+
+def _count_fours(completions: List[int]) -> int:
+    """Fours among completion cells; both ends of a straight four count once."""
+    if len(completions) == 2 and completions[1] - completions[0] == WIN_LENGTH:
+        return 1
+    return min(len(completions), 2)
+
+
+def _classify(left: int, right: int) -> LineShape:
+    """Shape of a line given the codes of its two sides, see side_code()."""
+    line         = _side_cells(left)[::-1] + [_STONE] + _side_cells(right)
+    center       = SIDE
+    first, last  = _run(line, center)
+    length       = last - first + 1
+    completions  = _completions(line, center)
+    fours        = _count_fours(completions)
+    three        = False
+    if not fours and length < WIN_LENGTH:
+        for index, cell in enumerate(line):
+            if cell != _EMPTY:
+                continue
+            line[index] = _STONE
+            straight    = _completions(line, center)
+            line[index] = _EMPTY
+            if len(straight) == 2 and straight[1] - straight[0] == WIN_LENGTH:
+                three   = True
+                break
+    return LineShape(length == WIN_LENGTH, length > WIN_LENGTH, fours, three)
+
+
+def _build_line_table() -> List[LineShape]:
+    """Shape of every line a move can make, indexed by left * SIDE_CODES + right."""
+    return [_classify(left, right) for left in range(SIDE_CODES) for right in range(SIDE_CODES)]
+
+
+LINE_TABLE = _build_line_table()   # SIDE_CODES ** 2 = 3969 entries, built once at import
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+
+def line_shapes(state: GameState, x: int, y: int, color: int) -> List[LineShape]:
+    """
+    Shapes a stone of `color` at the empty (x, y) would make in the four directions.
+
+    Each side is read up to SIDE cells or the first opposing stone or edge, and
+    the pair of sides is looked up in LINE_TABLE.
+    """
+    own, other = state.stones[color], state.stones[1 - color]
+    bits       = state._bits
+    stride     = state.stride
+    shapes     = []
+    for dx, dy in DIRECTIONS:
+        codes  = []
+        for sign in (-1, 1):
+            length = stones = 0
+            cx, cy = x, y
+            while length < SIDE:
+                cx += sign * dx
+                cy += sign * dy
+                if not (0 <= cx < state.size_x and 0 <= cy < state.size_y):
+                    break
+                bit = bits[cy * stride + cx]
+                if other & bit:
+                    break
+                if own & bit:
+                    stones |= 1 << length
+                length += 1
+            codes.append(side_code(length, stones))
+        shapes.append(LINE_TABLE[codes[0] * SIDE_CODES + codes[1]])
+    return shapes
+
+
+def forbidden_reason(state: GameState, x: int, y: int) -> Optional[str]:
+    """
+    Why a black stone at the empty (x, y) is forbidden under Renju, or None if it is allowed.
+
+    A move that makes exactly five is always allowed. Otherwise an overline, two
+    fours or two open threes are forbidden. A three is counted without checking
+    that the stone completing its straight four would itself be allowed.
+    """
+    shapes = line_shapes(state, x, y, BLACK)
+    if any(shape.five for shape in shapes):
+        return None
+    if any(shape.overline for shape in shapes):
+        return 'overline'
+    if sum(shape.fours for shape in shapes) >= 2:
+        return 'double four'
+    if sum(shape.three for shape in shapes if not shape.fours) >= 2:
+        return 'double three'
+    return None
+
+
+class RuleEngine:
+    """
+    A game under a rule set and an opening protocol.
+
+    Every move and colour choice names the seat it comes from and is checked for
+    turn order and the opening protocol before it reaches the board, where bounds,
+    occupancy and Renju restrictions are checked. Undo restores the phase the game
+    was in before the undone moves.
+
+    Attributes:
+        state: The board; shared with snapshots and win detection.
+        phase: Current Phase.
+        black_seat: Seat playing black, None until the opening settles it.
+    """
+    def __init__(self, size: int = DEFAULT_SIZE, rule: str = FREESTYLE, opening: str = SWAP2):
+        """
+        Args:
+            size: Board width and height.
+            rule: One of RULES.
+            opening: One of OPENINGS.
+
+        Raises:
+            ValueError: If rule or opening is unknown.
+        """
+        if rule not in RULES:
+            raise ValueError(f"rule must be one of {RULES}")
+        if opening not in OPENINGS:
+            raise ValueError(f"opening must be one of {OPENINGS}")
+        self.rule                                = rule
+        self.opening                             = opening
+        overline_wins                            = {FREESTYLE: (True, True), STANDARD: (False, False), RENJU: (False, True)}[rule]
+        self.state                               = GameState(size, overline_wins=overline_wins)
+        self.phase      : Phase                  = Phase.OPENING
+        self.black_seat : Optional[int]          = None
+        self._history   : List[Tuple[Phase, Optional[int]]] = []   # (phase, black_seat) before every move
+        self._reset_phase()
+
+    def _reset_phase(self) -> None:
+        if self.opening == SWAP2:
+            self.phase, self.black_seat = Phase.OPENING, None
+        else:
+            self.phase, self.black_seat = Phase.PLAY, 0
+
+    def seat_to_move(self) -> int:
+        """Seat whose move or choice is awaited."""
+        return self._seat_to_move(self.phase, self.black_seat, self.state.to_move)
+
+    @staticmethod
+    def _seat_to_move(phase: Phase, black_seat: Optional[int], to_move: int) -> int:
+        if phase in (Phase.OPENING, Phase.SWAP2_FINAL):
+            return 0
+        if phase in (Phase.SWAP2_CHOICE, Phase.SWAP2_EXTRA):
+            return 1
+        return black_seat if to_move == BLACK else 1 - black_seat
+
+    def _sync_turn(self) -> None:
+        """Keep GameState.current_turn (True = seat 1) in step with the seat to move."""
+        self.state.current_turn = self.seat_to_move() == 1
+
+    def check_move(self, seat: int, x: int, y: int) -> None:
+        """
+        Raise if seat may not play (x, y) now; the board is not changed.
+
+        Raises:
+            IllegalMove: If the game is over or (x, y) is off the board or occupied.
+            RuleViolation: If it is not this seat's move, a colour choice is awaited,
+                or the move is forbidden for black under Renju.
+        """
+        state = self.state
+        if state.is_over:
+            raise IllegalMove("Game is over")
+        if self.phase == Phase.SWAP2_FINAL:
+            raise RuleViolation("Seat 0 must choose a colour first")
+        if seat != self.seat_to_move():
+            raise RuleViolation(f"Seat {seat} moved out of turn during {self.phase.value}")
+        index = state.index(x, y)
+        if (state.stones[BLACK] | state.stones[WHITE]) & state._bits[index]:
+            raise IllegalMove(f"({x}, {y}) is already occupied")
+        if self.rule == RENJU and state.to_move == BLACK:
+            reason = forbidden_reason(state, x, y)
+            if reason is not None:
+                raise RuleViolation(f"({x}, {y}) is forbidden for black: {reason}")
+
+    def play(self, seat: int, x: int, y: int) -> bool:
+        """
+        Validate and play one move.
+
+        Returns:
+            True if the move won the game.
+
+        Raises:
+            IllegalMove: See check_move(); RuleViolation is a subclass.
+        """
+        self.check_move(seat, x, y)
+        self._history.append((self.phase, self.black_seat))
+        won = self.state.add_move(x, y)
+        played = len(self.state)
+        if self.phase == Phase.OPENING and played == 3:
+            self.phase = Phase.SWAP2_CHOICE
+        elif self.phase == Phase.SWAP2_CHOICE:
+            self.phase = Phase.SWAP2_EXTRA                  # Placing stone 4 instead of choosing: stones 4 and 5
+        elif self.phase == Phase.SWAP2_EXTRA and played == 5:
+            self.phase = Phase.SWAP2_FINAL
+        self._sync_turn()
+        return won
+
+    def play_many(self, seat: int, moves: Sequence[Move]) -> bool:
+        """
+        Validate and play several moves from one seat; all or none are applied.
+
+        Under Swap2 they must all fall within that seat's part of the opening. With
+        no opening protocol, a batch on an empty board from seat 0 is a free opening.
+
+        Returns:
+            True if the game ended on the last of them.
+
+        Raises:
+            IllegalMove: If any move is rejected; the game is left unchanged.
+        """
+        free    = self.opening == NO_OPENING and not self.state.moves and seat == 0
+        played  = len(self.state)
+        try:
+            for x, y in moves:
+                if free:
+                    self.check_move(self.seat_to_move(), x, y)
+                    self._history.append((self.phase, self.black_seat))
+                    self.state.add_move(x, y)
+                else:
+                    self.play(seat, x, y)
+        except IllegalMove:
+            self.undo(len(self.state) - played)
+            raise
+        self._sync_turn()
+        return self.state.is_over
+
+    def choose(self, seat: int, to_move: bool) -> None:
+        """
+        A colour choice, sent as a SWAP frame.
+
+        Under Swap2 only the seat whose choice is awaited may send one; with no
+        opening protocol either seat may swap colours at any time, as before.
+
+        Args:
+            seat: Seat choosing.
+            to_move: True if the chooser takes the next move (white after 3 or 5
+                stones), False if it hands the next move to the opponent.
+
+        Raises:
+            RuleViolation: If no choice is awaited from this seat.
+        """
+        if self.opening == SWAP2:
+            if self.phase not in (Phase.SWAP2_CHOICE, Phase.SWAP2_FINAL):
+                raise RuleViolation(f"No colour choice is open during {self.phase.value}")
+            if seat != self.seat_to_move():
+                raise RuleViolation(f"Seat {seat} cannot choose, seat {self.seat_to_move()} does")
+        mover           = seat if to_move else 1 - seat
+        self.black_seat = mover if self.state.to_move == BLACK else 1 - mover
+        self.phase      = Phase.PLAY
+        self._sync_turn()
+
+    def take_back(self, seat: int, num_moves: int) -> List[Move]:
+        """
+        An UNDO request: take back moves so that seat is to move again.
+
+        A seat may take back its own last move, or the opponent's reply together with
+        its own move before it, but never leave the opponent to move.
+
+        Returns:
+            The moves taken back, most recent first.
+
+        Raises:
+            RuleViolation: If num_moves is not between 1 and the number of moves
+                played, or the opponent would be to move afterwards.
+        """
+        played = len(self.state)
+        if not 1 <= num_moves <= played:
+            raise RuleViolation(f"Cannot take back {num_moves} of {played} moves")
+        phase, black_seat = self._history[-num_moves]
+        if self._seat_to_move(phase, black_seat, (played - num_moves) & 1) != seat:
+            raise RuleViolation(f"Seat {seat} cannot take back the opponent's moves")
+        return self.undo(num_moves)
+
+    def undo(self, num_moves: int) -> List[Move]:
+        """Take back moves and the phase changes they caused."""
+        undone = self.state.undo_moves(num_moves)
+        if undone:
+            self.phase, self.black_seat = self._history[-len(undone)]
+            del self._history[-len(undone):]
+        self._sync_turn()
+        return undone
+
+    def clear(self) -> None:
+        self.state.clear()
+        self._history.clear()
+        self._reset_phase()
+        self._sync_turn()
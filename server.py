@@ -1,8 +1,11 @@
 import socket
 import struct
+import asyncio
 import logging
 import threading
 import argparse
+import random
+import queue
 from   enum   import Enum
 from   typing import Dict, Tuple, Optional, List
 
@@ -16,136 +19,366 @@ logging.basicConfig(
     ]
 )
 
-# Protocol Constants (matching client protocol)
-HEADER_FORMAT        = '!ii'
-HEADER_SIZE          = struct.calcsize(HEADER_FORMAT)
+from   protocol import HEADER_FORMAT, HEADER_SIZE, ROOM_CONTENT_FORMAT, RESULT_CONTENT_FORMAT, MAX_CONTENT_SIZE, NO_ROOM
+from   protocol import DataType, FrameReader, ProtocolError, decode_message, encode_message, pack_snapshot
+from   bitboard import COLOR_NAMES, DEFAULT_SIZE, IllegalMove
+from   rules    import FREESTYLE, OPENINGS, RULES, SWAP2, RuleEngine
 
-ADD_CONTENT_FORMAT   = '!ii'
-ADD_CONTENT_SIZE     = struct.calcsize(ADD_CONTENT_FORMAT)
 
-UNDO_CONTENT_FORMAT  = '!i'
-UNDO_CONTENT_SIZE    = struct.calcsize(UNDO_CONTENT_FORMAT)
+class OverflowPolicy(Enum):
+    """What to do when a client's outbound queue is full."""
+    DROP_NEWEST = 'drop-newest'       # Discard the message being queued
+    DROP_OLDEST = 'drop-oldest'       # Discard the oldest queued message to make room
+    DISCONNECT  = 'disconnect'        # Treat the client as dead and drop it
 
-SWAP_CONTENT_FORMAT  = '!?' # Boolean for turn state
-SWAP_CONTENT_SIZE    = struct.calcsize(SWAP_CONTENT_FORMAT)
 
-CLEAR_CONTENT_FORMAT = ''
-CLEAR_CONTENT_SIZE   = 0
+DEFAULT_OUTBOX_SIZE  = 256
 
 
-class DataType(Enum):
-    UNDO  = 1
-    ADD   = 2
-    CLEAR = 3
-    SWAP  = 4
+def enqueue_outbound(outbox, message: bytes, policy: OverflowPolicy, addr) -> bool:
+    """
+    Put a framed message on a bounded outbound queue without ever blocking.
 
+    Works with both queue.Queue and asyncio.Queue.
 
-class GameState:
-    """Manages the state of a game between two players."""
-    def __init__(self):
-        self.moves       : List[Tuple[int, int]] = []
-        self.current_turn: bool                  = False     # False = first player, True = second player
+    Returns:
+        False if the client should be disconnected, True otherwise.
+    """
+    try:
+        outbox.put_nowait(message)
+        return True
+    except (queue.Full, asyncio.QueueFull):
+        pass
+
+    if policy == OverflowPolicy.DISCONNECT:
+        logging.warning(f"Outbound queue full for {addr}, disconnecting slow client")
+        return False
+
+    if policy == OverflowPolicy.DROP_OLDEST:
+        try:
+            outbox.get_nowait()
+            outbox.put_nowait(message)
+        except (queue.Empty, queue.Full, asyncio.QueueEmpty, asyncio.QueueFull):
+            pass
+    logging.warning(f"Outbound queue full for {addr}, dropped a message ({policy.value})")
+    return True
+
+
+def apply_message(rules: RuleEngine, seat: int, data_type: DataType, value) -> bool:
+    """
+    Apply a decoded message from one seat to a game under its rules.
+
+    Moves are checked against the board and the rules: one that is off the board,
+    on an occupied intersection, out of turn, against the opening protocol, forbidden
+    or played after the game ended is rejected and not relayed. So is a SWAP sent
+    when no colour choice is open, and an UNDO that would take back more moves than
+    were played or leave the opponent to move.
+
+    Args:
+        rules: The room's game.
+        seat: Sender's seat, 0 for the player who opened the game.
+        data_type: Decoded message type.
+        value: Decoded content.
+
+    Returns:
+        True if the message was valid and should be relayed to the other players.
+    """
+    if data_type == DataType.ADD:
+        x, y = value
+        try:
+            rules.play(seat, x, y)
+        except IllegalMove as e:
+            logging.warning(f"Rejected move ({x}, {y}) from seat {seat}: {e}")
+            return False
+        logging.info(f"Move added at ({x}, {y})")
 
-    def add_move(self, x: int, y: int) -> None:
-        """Add a move to the game state."""
-        self.moves.append((x, y))
-        self.current_turn                        = not self.current_turn
+    elif data_type == DataType.ADD_BATCH:
+        try:
+            rules.play_many(seat, value)
+        except IllegalMove as e:
+            logging.warning(f"Rejected batch of {len(value)} moves from seat {seat}: {e}")
+            return False
+        logging.info(f"Batch of {len(value)} moves added")
+
+    elif data_type == DataType.UNDO:
+        try:
+            rules.take_back(seat, value)
+        except IllegalMove as e:
+            logging.warning(f"Rejected undo of {value} moves from seat {seat}: {e}")
+            return False
+        logging.info(f"Undo {value} moves by seat {seat}")
+
+    elif data_type == DataType.SWAP:
+        try:
+            rules.choose(seat, value)
+        except IllegalMove as e:
+            logging.warning(f"Rejected swap from seat {seat}: {e}")
+            return False
+        logging.info(f"Turn swapped by seat {seat}, black is seat {rules.black_seat}")
+
+    elif data_type == DataType.CLEAR:
+        rules.clear()
+        logging.info("Game cleared")
+
+    else:
+        return False
+    return True
+
+
+class Room:
+    """A single match: its own RuleEngine and the clients subscribed to it."""
+    def __init__(self, room_id: int, capacity: int = 2, public: bool = True, board_size: int = DEFAULT_SIZE,
+                 rule: str = FREESTYLE, opening: str = SWAP2):
+        self.room_id       = room_id
+        self.capacity      = capacity
+        self.public        = public                      # Public rooms are filled by auto-matching, private ones by join code
+        self.rules         = RuleEngine(board_size, rule, opening)
+        self.game_state    = self.rules.state
+        self.members: List = []
+        self.seats  : Dict = {}                          # Client -> seat, taken on joining; members beyond two watch
+        self.lock          = threading.Lock()            # Guards game_state and members of this room only
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.members) >= self.capacity
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.members
+
+    def add_member(self, client) -> None:
+        """
+        Add a joining client and give it the lowest free seat, if any. Must be called with the lock held.
+
+        The first member opens the game as seat 0; a seat left by a member goes to the
+        next client that joins, e.g. the same player reconnecting.
+        """
+        self.members.append(client)
+        free = [seat for seat in (0, 1) if seat not in self.seats.values()]
+        if free:
+            self.seats[client] = free[0]
+
+    def remove_member(self, client) -> None:
+        """Remove a client and free its seat. Must be called with the lock held."""
+        if client in self.members:
+            self.members.remove(client)
+        self.seats.pop(client, None)
+
+    def snapshot(self) -> bytes:
+        """Pack the room's full move list and turn as SNAPSHOT content."""
+        with self.lock:
+            return pack_snapshot(self.room_id, self.game_state.current_turn, self.game_state.moves)
+
+    def dispatch(self, sender, data_type: DataType, value, content: bytes = b'') -> List:
+        """
+        Apply a decoded message to this room's state and relay its raw content to the other members.
+
+        A rejected move, SWAP or UNDO is answered with a SNAPSHOT so the sender can
+        resync, and the move that ends the game is followed by a RESULT to every member.
+        Messages from a member without a seat are rejected the same way.
+
+        Returns:
+            The members whose send failed, so the caller can drop them outside the lock.
+        """
+        with self.lock:
+            game   = self.game_state
+            over   = game.is_over
+            seat   = self.seats.get(sender)
+            if seat is None or not apply_message(self.rules, seat, data_type, value):
+                if data_type in (DataType.ADD, DataType.ADD_BATCH, DataType.SWAP, DataType.UNDO):
+                    sender._send_message(DataType.SNAPSHOT, pack_snapshot(self.room_id, game.current_turn, game.moves))
+                return []
+            failed = [client for client in self.members
+                      if client is not sender and not client._send_message(data_type, content)]
+            if game.is_over and not over:
+                logging.info(f"Room {self.room_id}: {COLOR_NAMES[game.winner]} wins after {len(game)} moves")
+                result = struct.pack(RESULT_CONTENT_FORMAT, game.winner)
+                for client in self.members:
+                    if not client._send_message(DataType.RESULT, result) and client is not sender and client not in failed:
+                        failed.append(client)
+            return failed
+
+
+class RoomRegistry:
+    """
+    Maps join codes to rooms and seats clients in them.
+
+    The registry lock is only held while seating or unseating a client; all
+    in-game traffic goes through the per-room lock.
+    """
+    def __init__(self, room_capacity: int = 2, board_size: int = DEFAULT_SIZE, rule: str = FREESTYLE,
+                 opening: str = SWAP2):
+        self.room_capacity                 = room_capacity
+        self.board_size                    = board_size
+        self.rule                          = rule
+        self.opening                       = opening
+        self.rooms      : Dict[int, Room]  = {}
+        self._open_rooms: Dict[int, Room]  = {}          # Public rooms with a free seat, oldest first
+        self._lock                         = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def get(self, room_id: int) -> Optional[Room]:
+        return self.rooms.get(room_id)
+
+    def _new_code(self) -> int:
+        while True:
+            code = random.randint(100000, 999999)
+            if code not in self.rooms:
+                return code
+
+    def _new_room(self, public: bool) -> Room:
+        room                     = Room(self._new_code(), self.room_capacity, public, self.board_size,
+                                        self.rule, self.opening)
+        self.rooms[room.room_id] = room
+        if public:
+            self._open_rooms[room.room_id] = room
+        return room
+
+    def _seat(self, client, room: Room) -> None:
+        with room.lock:
+            room.add_member(client)
+            client.room = room
+            if room.is_full:
+                self._open_rooms.pop(room.room_id, None)
+
+    def _unseat(self, client) -> Optional[Room]:
+        room = client.room
+        if room is None:
+            return None
+        with room.lock:
+            room.remove_member(client)
+            client.room = None
+            if room.is_empty:
+                self.rooms.pop(room.room_id, None)
+                self._open_rooms.pop(room.room_id, None)
+            elif room.public:
+                self._open_rooms.setdefault(room.room_id, room)
+        return room
+
+    def assign(self, client) -> Room:
+        """Seat a client in the oldest public room with a free seat, creating one if needed."""
+        with self._lock:
+            self._unseat(client)
+            room = next(iter(self._open_rooms.values())) if self._open_rooms else self._new_room(public=True)
+            self._seat(client, room)
+            return room
 
-    def undo_moves(self, num_moves: int) -> None:
-        """Remove the last n moves from the game state."""
-        for _ in range(min(num_moves, len(self.moves))):
-            self.moves.pop()
-        # Adjust turn based on number of moves
-        self.current_turn                        = bool(len(self.moves) % 2)
+    def create(self, client) -> Room:
+        """Move a client into a new private room, reachable only by its join code."""
+        with self._lock:
+            self._unseat(client)
+            room = self._new_room(public=False)
+            self._seat(client, room)
+            return room
 
-    def clear(self) -> None:
-        """Reset the game state."""
-        self.moves.clear()
-        self.current_turn                        = False
+    def join(self, client, room_id: int) -> Optional[Room]:
+        """Move a client into an existing room; returns None if it is missing or full."""
+        with self._lock:
+            room = self.rooms.get(room_id)
+            if room is client.room:
+                return room
+            if room is None or room.is_full:
+                return None
+            self._unseat(client)
+            self._seat(client, room)
+            return room
+
+    def leave(self, client) -> Optional[Room]:
+        """Remove a client from its room, dropping the room once it is empty."""
+        with self._lock:
+            return self._unseat(client)
+
+
+def handle_room_request(registry: RoomRegistry, client, data_type: DataType, room_id: Optional[int]) -> None:
+    """Serve a CREATE or JOIN request and reply to the client with the resulting room id."""
+    if data_type == DataType.CREATE:
+        room = registry.create(client)
+    else:
+        room = registry.join(client, room_id)
+
+    if room is None:
+        logging.info(f"Client {client.addr} was refused a room")
+        client._send_message(data_type, struct.pack(ROOM_CONTENT_FORMAT, NO_ROOM))
+        return
+    logging.info(f"Client {client.addr} {'created' if data_type == DataType.CREATE else 'joined'} room {room.room_id}")
+    client._send_message(data_type, struct.pack(ROOM_CONTENT_FORMAT, room.room_id))
+
+
+def route_message(server, client, data_type: DataType, value, content: bytes) -> None:
+    """Route a decoded message to the room registry, a direct reply, or the client's room."""
+    if data_type in (DataType.CREATE, DataType.JOIN):
+        handle_room_request(server.registry, client, data_type, value)
+    elif data_type == DataType.PING:
+        client._send_message(DataType.PING)                # Heartbeat echo, never relayed
+    elif data_type == DataType.SNAPSHOT:
+        room = client.room
+        if room is not None:
+            client._send_message(DataType.SNAPSHOT, room.snapshot())
+    else:
+        # Handle message based on type and broadcast to the other players in the room
+        server.broadcast(client, data_type, value, content)
 
 
 class ClientHandler:
     """Handles communication with a single client."""
-    def __init__(self, sock: socket.socket, addr: Tuple[str, int], game: GameState, server: 'GameServer'):
+    def __init__(self, sock: socket.socket, addr: Tuple[str, int], server: 'GameServer'):
         self.sock    = sock
         self.addr    = addr
-        self.game    = game
         self.server  = server
+        self.room    : Optional[Room] = None
         self.running = True
-
-    def _recv_all(self, n: int) -> Optional[bytes]:
-        """Helper to receive exactly n bytes."""
-        data = b''
-        try:
-            while len(data) < n and self.running:
-                packet = self.sock.recv(n - len(data))
-                if not packet:                             # Connection closed by client
-                    return None
-                data  += packet
-            return data if self.running else None
-        except Exception:                                  # Any socket error
-            return None
+        self._outbox = queue.Queue(maxsize=server.outbox_size)
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
 
     def _send_message(self, data_type: DataType, content: bytes = b'') -> bool:
-        """Send a message to the client with proper protocol formatting."""
+        """Queue a message for the client's writer thread; never blocks on the socket."""
+        if not self.running:
+            return False
+        return enqueue_outbound(self._outbox, encode_message(data_type, content), self.server.overflow_policy, self.addr)
+
+    def _writer_loop(self) -> None:
+        """Drain the outbound queue so a slow peer only ever stalls its own thread."""
         try:
-            header = struct.pack(HEADER_FORMAT, data_type.value, len(content))
-            self.sock.sendall(header + content)
-            return True
+            while self.running:
+                message = self._outbox.get()
+                if message is None:                        # Shutdown sentinel
+                    break
+                self.sock.sendall(message)
         except Exception as e:
-            logging.error(f"Error sending message to {self.addr}: {e}")
-            return False
+            if self.running:
+                logging.error(f"Error sending message to {self.addr}: {e}")
+        finally:
+            self.cleanup()
+
+    def _handle_frame(self, data_type_value: int, content: bytes) -> None:
+        """Decode one frame and route it to the room registry or the client's room."""
+        try:
+            data_type, value = decode_message(data_type_value, content)
+        except ProtocolError as e:
+            logging.error(f"Invalid message from {self.addr}: {e}")
+            return
+
+        route_message(self.server, self, data_type, value, content)
 
     def handle_client(self) -> None:
         """Main client handling loop."""
         logging.info(f"New connection from {self.addr}")
+        self._writer.start()
         
         try:
+            reader = FrameReader(self.sock)
             while self.running:
-                # Read header
-                header_data = self._recv_all(HEADER_SIZE)
-                if not header_data:
-                    logging.info(f"Client {self.addr} disconnected")
-                    break
-
-                data_type_value, content_length = struct.unpack(HEADER_FORMAT, header_data)
-
-                # Read content if any
-                content = self._recv_all(content_length) if content_length > 0 else b''
-                if content_length > 0 and not content:
-                    logging.info(f"Client {self.addr} disconnected during content read")
-                    break
-
-                try:
-                    data_type = DataType(data_type_value)
-                except ValueError:
-                    logging.error(f"Invalid data type received: {data_type_value}")
-                    continue
-
-                # Handle message based on type and broadcast to other players
-                if data_type == DataType.ADD and content_length == ADD_CONTENT_SIZE:
-                    x, y = struct.unpack(ADD_CONTENT_FORMAT, content)
-                    self.game.add_move(x, y)
-                    logging.info(f"Move added at ({x}, {y})")
-                    self.server.broadcast(self.addr, data_type, content)
-
-                elif data_type == DataType.UNDO and content_length == UNDO_CONTENT_SIZE:
-                    num_moves = struct.unpack(UNDO_CONTENT_FORMAT, content)[0]
-                    self.game.undo_moves(num_moves)
-                    logging.info(f"Undo {num_moves} moves")
-                    self.server.broadcast(self.addr, data_type, content)
-
-                elif data_type == DataType.SWAP and content_length == SWAP_CONTENT_SIZE:
-                    new_turn = struct.unpack(SWAP_CONTENT_FORMAT, content)[0]
-                    self.game.current_turn = new_turn
-                    logging.info(f"Turn swapped, current turn: {new_turn}")
-                    self.server.broadcast(self.addr, data_type, content)
-
-                elif data_type == DataType.CLEAR:
-                    self.game.clear()
-                    logging.info("Game cleared")
-                    self.server.broadcast(self.addr, data_type, content)
-
+                # Every frame completed by one recv, header and content alike
+                for data_type_value, content in reader.read_frames():
+                    self._handle_frame(data_type_value, content)
+
+        except (ConnectionError, OSError):
+            if self.running:
+                logging.info(f"Client {self.addr} disconnected")
+        except ProtocolError as e:
+            logging.error(f"Corrupt stream from {self.addr}: {e}")
         except Exception as e:
             logging.error(f"Error handling client {self.addr}: {e}")
         finally:
@@ -157,77 +390,79 @@ class ClientHandler:
             return
             
         self.running = False
+        try:
+            self._outbox.put_nowait(None)                  # Wake the writer; if the queue is full it fails on the closed socket instead
+        except queue.Full:
+            pass
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass                                           # Socket may already be disconnected
         try:
             self.sock.close()
         except Exception as e:
             logging.error(f"Error closing socket for {self.addr}: {e}")
         
         # Make sure we're removed from server's client list
-        self.server.remove_client(self.addr)
+        self.server.remove_client(self)
         logging.info(f"Connection closed for {self.addr}")
 
 
 class GameServer:
     """Main server class that accepts connections and manages games."""
-    def __init__(self, host: str = 'localhost', port: int  = 8888):
+    def __init__(self, host: str = 'localhost', port: int  = 8888,
+                 outbox_size: int = DEFAULT_OUTBOX_SIZE, overflow_policy: OverflowPolicy = OverflowPolicy.DISCONNECT,
+                 board_size: int = DEFAULT_SIZE, rule: str = FREESTYLE, opening: str = SWAP2):
         self.host                                          = host
         self.port                                          = port
         self.sock                                          = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.running                                       = False
+        self.outbox_size                                   = outbox_size
+        self.overflow_policy                               = overflow_policy
         self.clients: Dict[Tuple[str, int], ClientHandler] = {}
-        self.game_state                                    = GameState()
-        self._lock                                         = threading.Lock()  # Add lock for thread-safe broadcasting
+        self.registry                                      = RoomRegistry(board_size=board_size, rule=rule, opening=opening)
+        self._lock                                         = threading.Lock()  # Guards the client list only
 
-    def remove_client(self, addr: Tuple[str, int]) -> None:
-        """Remove a client from the server's client list."""
+    def remove_client(self, client: ClientHandler) -> None:
+        """Remove a client from its room and from the server's client list."""
+        room = self.registry.leave(client)
         with self._lock:
-            if addr in self.clients:
-                del self.clients[addr]
-                logging.info(f"Removed client {addr}. Total clients: {len(self.clients)}")
-
-    def broadcast(self, sender_addr: Tuple[str, int], data_type: DataType, content: bytes = b'') -> None:
-        """Broadcast a message to all clients except the sender."""
-        print('Broadcast Called')
-        with self._lock:
-            disconnected = []
-            for addr, client in self.clients.items():
-                if addr != sender_addr:  # Don't send back to sender
-                    try:
-                        if not client._send_message(data_type, content):
-                            disconnected.append(addr)
-                    except Exception as e:
-                        logging.error(f"Error broadcasting to {addr}: {e}")
-                        disconnected.append(addr)
-            
-            # Remove disconnected clients
-            for addr in disconnected:
-                self.remove_client(addr)
+            if self.clients.get(client.addr) is client:
+                del self.clients[client.addr]
+                logging.info(f"Removed client {client.addr}"
+                             f"{f' from room {room.room_id}' if room else ''}. Total clients: {len(self.clients)}")
+
+    def broadcast(self, sender: ClientHandler, data_type: DataType, value, content: bytes = b'') -> None:
+        """Apply a message to the sender's room and broadcast it to the other members."""
+        room = sender.room
+        if room is None:
+            return
+        for client in room.dispatch(sender, data_type, value, content):
+            client.cleanup()
 
     def start(self) -> None:
         """Start the server."""
         try:
             self.sock.bind((self.host, self.port))
-            self.sock.listen(2)  # Only allow 2 connections for a 2-player game
+            self.sock.listen()
             self.running = True
             logging.info(f"Server started on {self.host}:{self.port}")
 
             while self.running:
                 try:
                     client_socket, addr = self.sock.accept()
-                    if len(self.clients) >= 2:
-                        logging.warning(f"Rejected connection from {addr}: Game full")
-                        client_socket.close()
-                        continue
 
-                    handler            = ClientHandler(client_socket, addr, self.game_state, self)
-                    self.clients[addr] = handler
+                    handler            = ClientHandler(client_socket, addr, self)
+                    room               = self.registry.assign(handler)
+                    with self._lock:
+                        self.clients[addr] = handler
                     
                     # Start client handler in a new thread
                     thread             = threading.Thread(target=handler.handle_client)
                     thread.daemon      = True
                     thread.start()
 
-                    logging.info(f"Client {addr} connected. Total clients: {len(self.clients)}")
+                    logging.info(f"Client {addr} joined room {room.room_id}. Total clients: {len(self.clients)}")
 
                 except Exception as e:
                     logging.error(f"Error accepting connection: {e}")
@@ -242,7 +477,9 @@ class GameServer:
         self.running = False
         
         # Clean up client connections
-        for handler in self.clients.values():
+        with self._lock:
+            handlers = list(self.clients.values())
+        for handler in handlers:
             handler.cleanup()
         self.clients.clear()
 
@@ -255,15 +492,190 @@ class GameServer:
         logging.info("Server shutdown complete")
 
 
+class AsyncClientHandler:
+    """Handles communication with a single client on the server's event loop."""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, server: 'AsyncGameServer'):
+        self.reader  = reader
+        self.writer  = writer
+        self.addr    = writer.get_extra_info('peername')
+        self.server  = server
+        self.room    : Optional[Room] = None
+        self.running = True
+        self._outbox = asyncio.Queue(maxsize=server.outbox_size)
+        self._drainer: Optional[asyncio.Task] = None
+
+    def _send_message(self, data_type: DataType, content: bytes = b'') -> bool:
+        """Queue a message for this client's drain task; never blocks the event loop."""
+        if not self.running or self.writer.is_closing():
+            return False
+        return enqueue_outbound(self._outbox, encode_message(data_type, content), self.server.overflow_policy, self.addr)
+
+    async def _drain_outbox(self) -> None:
+        """Write queued messages and wait for the transport to drain, one client at a time."""
+        try:
+            while True:
+                self.writer.write(await self._outbox.get())
+                await self.writer.drain()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Error sending message to {self.addr}: {e}")
+            self.writer.close()                            # Unblocks the reader so the handler cleans up
+
+    async def handle_client(self) -> None:
+        """Main client handling coroutine."""
+        logging.info(f"New connection from {self.addr}")
+        self._drainer = asyncio.create_task(self._drain_outbox())
+
+        try:
+            while self.running:
+                # Read header
+                header_data = await self.reader.readexactly(HEADER_SIZE)
+                data_type_value, content_length = struct.unpack(HEADER_FORMAT, header_data)
+                if content_length < 0 or content_length > MAX_CONTENT_SIZE:
+                    logging.error(f"Invalid content length from {self.addr}: {content_length}")
+                    break
+
+                # Read content if any
+                content = await self.reader.readexactly(content_length) if content_length > 0 else b''
+
+                try:
+                    data_type, value = decode_message(data_type_value, content)
+                except ProtocolError as e:
+                    logging.error(f"Invalid message from {self.addr}: {e}")
+                    continue
+
+                if self.room is None:                      # Dropped from the room by a failed broadcast
+                    break
+
+                route_message(self.server, self, data_type, value, content)
+
+        except asyncio.IncompleteReadError:
+            logging.info(f"Client {self.addr} disconnected")
+        except (ConnectionError, OSError) as e:
+            logging.info(f"Client {self.addr} connection error: {e}")
+        except Exception as e:
+            logging.error(f"Error handling client {self.addr}: {e}")
+        finally:
+            await self.cleanup()
+
+    def close(self) -> None:
+        """Leave the room, stop the drain task and close the transport without waiting for it."""
+        if not self.running:  # Already closed
+            return
+
+        self.running = False
+        self.server.remove_client(self)
+        if self._drainer is not None:
+            self._drainer.cancel()
+        self.writer.close()                                # Ends the read loop, which then awaits cleanup()
+        logging.info(f"Connection closed for {self.addr}")
+
+    async def cleanup(self) -> None:
+        """Clean up resources used by this client handler."""
+        self.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception as e:
+            logging.debug(f"Error closing transport for {self.addr}: {e}")
+
+
+class AsyncGameServer:
+    """
+    Event-loop server that multiplexes every connection in a single thread.
+
+    Each new connection is paired into the oldest public room that still has a
+    free seat, so every pair of clients plays its own game with its own GameState.
+    Clients may instead CREATE a private room or JOIN one by its code.
+    """
+    def __init__(self, host: str = 'localhost', port: int = 8888, room_capacity: int = 2,
+                 outbox_size: int = DEFAULT_OUTBOX_SIZE, overflow_policy: OverflowPolicy = OverflowPolicy.DISCONNECT,
+                 board_size: int = DEFAULT_SIZE, rule: str = FREESTYLE, opening: str = SWAP2):
+        self.host                                          = host
+        self.port                                          = port
+        self.outbox_size                                   = outbox_size
+        self.overflow_policy                               = overflow_policy
+        self.registry                                      = RoomRegistry(room_capacity, board_size, rule, opening)
+        self._server    : Optional[asyncio.AbstractServer] = None
+        self.running                                       = False
+
+    @property
+    def client_count(self) -> int:
+        return sum(len(room.members) for room in list(self.registry.rooms.values()))
+
+    def remove_client(self, handler: AsyncClientHandler) -> None:
+        """Remove a client from its room, dropping the room once it is empty."""
+        room = self.registry.leave(handler)
+        if room is not None:
+            logging.info(f"Removed client {handler.addr} from room {room.room_id}. Total clients: {self.client_count}")
+
+    def broadcast(self, sender: AsyncClientHandler, data_type: DataType, value, content: bytes = b'') -> None:
+        """Apply a message to the sender's room and broadcast it to the other members."""
+        room = sender.room
+        if room is None:
+            return
+        for client in room.dispatch(sender, data_type, value, content):
+            client.close()
+
+    async def _on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        handler = AsyncClientHandler(reader, writer, self)
+        room    = self.registry.assign(handler)
+        logging.info(f"Client {handler.addr} joined room {room.room_id}. Total clients: {self.client_count}")
+        await handler.handle_client()
+
+    async def serve(self) -> None:
+        """Accept connections until cancelled."""
+        self._server = await asyncio.start_server(self._on_connect, self.host, self.port)
+        self.running = True
+        logging.info(f"Async server started on {self.host}:{self.port}")
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self.running = False
+
+    def start(self) -> None:
+        """Start the server and run its event loop in the calling thread."""
+        try:
+            asyncio.run(self.serve())
+        except Exception as e:
+            logging.error(f"Server error: {e}")
+        finally:
+            self.cleanup()
+
+    def cleanup(self) -> None:
+        """Clean up server resources."""
+        self.running = False
+        if self._server is not None:
+            self._server.close()
+        logging.info("Server shutdown complete")
+
+
 def main():
     
     parser = argparse.ArgumentParser(description="Swap4 Game Server")
     parser.add_argument('--host', default='localhost', help='Host to bind to')
     parser.add_argument('--port', type=int, default=8888, help='Port to bind to')
+    parser.add_argument('--mode', choices=('threaded', 'async'), default='threaded',
+                        help='threaded: one thread per client; async: every client on one event loop')
+    parser.add_argument('--outbox-size', type=int, default=DEFAULT_OUTBOX_SIZE,
+                        help='Maximum number of messages queued for a single client')
+    parser.add_argument('--overflow-policy', choices=[policy.value for policy in OverflowPolicy],
+                        default=OverflowPolicy.DISCONNECT.value, help='What to do when a client\'s queue is full')
+    parser.add_argument('--board-size', type=int, default=DEFAULT_SIZE, help='Board width and height, moves outside are rejected')
+    parser.add_argument('--rule', choices=RULES, default=FREESTYLE,
+                        help='freestyle: five or more wins; standard: exactly five; renju: standard plus black restrictions')
+    parser.add_argument('--opening', choices=OPENINGS, default=SWAP2, help='Opening protocol enforced on the first moves')
     
     args   = parser.parse_args()
+    policy = OverflowPolicy(args.overflow_policy)
     
-    server = GameServer(args.host, args.port)
+    if args.mode == 'async':
+        server = AsyncGameServer(args.host, args.port, outbox_size=args.outbox_size, overflow_policy=policy,
+                                 board_size=args.board_size, rule=args.rule, opening=args.opening)
+    else:
+        server = GameServer(args.host, args.port, outbox_size=args.outbox_size, overflow_policy=policy,
+                            board_size=args.board_size, rule=args.rule, opening=args.opening)
     try:
         server.start()
     except KeyboardInterrupt:
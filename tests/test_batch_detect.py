@@ -0,0 +1,27 @@
+import cv2
+import numpy as np
+
+from batch_detect import process_frame
+
+BOARD_COLOR = (100, 170, 220)
+
+
+def screenshot():
+    """A 15x15 board on a grey desktop, black stone on h8 and white on i9."""
+    image = np.full((600, 600, 3), 60, np.uint8)
+    cv2.rectangle(image, (70, 70), (530, 530), BOARD_COLOR, -1)
+    for i in range(15):
+        offset = 90 + i * 30
+        cv2.line(image, (offset, 90), (offset, 510), (0, 0, 0), 1)
+        cv2.line(image, (90, offset), (510, offset), (0, 0, 0), 1)
+    cv2.circle(image, (90 + 7 * 30, 90 + 7 * 30), 13, (0, 0, 0), -1)
+    cv2.circle(image, (90 + 8 * 30, 90 + 6 * 30), 13, (255, 255, 255), -1)
+    return image
+
+
+def test_hand_made_profile_reads_stones(tmp_path):
+    path = tmp_path / 'color.cfg'
+    path.write_text('0 0 0\n255 255 255\n')
+    record = process_frame(('frame', screenshot(), str(path), (15,)))
+    assert record['error'] is None
+    assert sorted((stone['move'], stone['color']) for stone in record['stones']) == [('h8', 'black'), ('i9', 'white')]
@@ -0,0 +1,17 @@
+from utils.colors import ColorProfile, ColorProfileStore
+
+CALIBRATED = {'black': (22, 20, 18), 'white': (231, 228, 225), 'empty': (96, 168, 214)}
+
+
+def test_renamed_calibrated_profile_keeps_nearest_matching(tmp_path):
+    store = ColorProfileStore(str(tmp_path))
+    store.save(ColorProfile('skin', CALIBRATED))
+    store.invalidate()
+    profile = store.get('skin')
+    assert profile.tolerance is None
+    assert profile.classify(profile.palette + 5, profile.tolerance).tolist() == profile.states.tolist()
+
+
+def test_hand_made_profile_matches_exactly(tmp_path):
+    (tmp_path / 'color.cfg').write_text('0 0 0\n255 255 255\n')
+    assert ColorProfileStore(str(tmp_path)).get().tolerance == 0
@@ -0,0 +1,26 @@
+import cv2
+import numpy as np
+
+from utils.detect import find_board_candidates
+
+BOARD_COLOR = (100, 170, 220)
+
+
+def framed_board(width=2600, height=1800, x=900, y=500, side=942, size=19, frame=32):
+    """A large screenshot of a board whose grid sits inside a thin dark outer frame."""
+    image = np.full((height, width, 3), 110, np.uint8)
+    cv2.rectangle(image, (x - frame, y - frame), (x + side + frame, y + side + frame), BOARD_COLOR, -1)
+    cv2.rectangle(image, (x - frame, y - frame), (x + side + frame, y + side + frame), (30, 30, 30), 1)
+    for i in range(size):
+        offset = int(round(i * side / (size - 1)))
+        cv2.line(image, (x + offset, y), (x + offset, y + side), (0, 0, 0), 2)
+        cv2.line(image, (x, y + offset), (x + side, y + offset), (0, 0, 0), 2)
+    return image
+
+
+def test_pyramid_search_finds_the_grid_not_the_frame():
+    image = framed_board()
+    full  = find_board_candidates(image, max_side=max(image.shape))[0]
+    fast  = find_board_candidates(image)[0]
+    assert fast[:4] == full[:4]
+    assert abs(fast.x - 900) <= 2 and abs(fast.w - 942) <= 4
@@ -0,0 +1,35 @@
+from threading import Event, Thread
+
+from utils.listener import Listener, ManualEventSource
+
+KEYMAP = {'alt': 56, 'p': 25, 'o': 24}
+
+
+def test_key_seen_before_registration_triggers_after_it():
+    source   = ManualEventSource(KEYMAP)
+    fired    = Event()
+    with Listener(event_source=source) as listener:
+        source.tap('alt', 'p')
+        listener.add_hotkey('alt+p', fired.set)
+        source.tap('alt', 'p')
+        assert fired.wait(1)
+
+
+def test_registration_racing_key_events_leaves_no_stale_bit():
+    source   = ManualEventSource(KEYMAP)
+    running  = True
+
+    def typist():
+        while running:
+            source.emit('p', 'up')
+
+    with Listener(event_source=source) as listener:
+        thread = Thread(target=typist)
+        thread.start()
+        try:
+            listener.add_hotkey('alt+o', lambda: None)
+            listener.add_hotkey('alt+p', lambda: None)
+        finally:
+            running = False
+            thread.join()
+        assert listener._key_bit('p') != 0
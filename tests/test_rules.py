@@ -0,0 +1,32 @@
+import pytest
+
+from rules import NO_OPENING, FREESTYLE, RuleEngine, RuleViolation
+
+
+def engine_with(*moves):
+    engine = RuleEngine(15, FREESTYLE, NO_OPENING)
+    for x, y in moves:
+        engine.play(engine.seat_to_move(), x, y)
+    return engine
+
+
+@pytest.mark.parametrize('num_moves', [-1, 0, 3])
+def test_take_back_rejects_counts_outside_the_game(num_moves):
+    engine = engine_with((7, 7), (8, 8))
+    with pytest.raises(RuleViolation):
+        engine.take_back(1, num_moves)
+    assert len(engine.state) == 2
+
+
+def test_take_back_own_moves_only():
+    engine = engine_with((7, 7), (8, 8))
+    with pytest.raises(RuleViolation):
+        engine.take_back(0, 1)                     # Seat 1's reply alone
+    assert engine.take_back(0, 2) == [(8, 8), (7, 7)]
+    assert engine.seat_to_move() == 0
+
+
+def test_take_back_last_move_returns_the_turn():
+    engine = engine_with((7, 7), (8, 8))
+    engine.take_back(1, 1)
+    assert engine.seat_to_move() == 1
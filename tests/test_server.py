@@ -0,0 +1,46 @@
+from protocol import DataType, pack_moves
+from server   import Room, RoomRegistry
+
+
+class FakeClient:
+    def __init__(self):
+        self.room = None
+        self.sent = []
+
+    def _send_message(self, data_type, content=b''):
+        self.sent.append(data_type)
+        return True
+
+
+def test_seats_follow_joining_order_and_vacated_seats_are_reused():
+    registry = RoomRegistry()
+    opener, second, rejoined = FakeClient(), FakeClient(), FakeClient()
+    room     = registry.create(opener)
+    registry.join(second, room.room_id)
+    assert room.seats == {opener: 0, second: 1}
+
+    registry.leave(opener)
+    registry.join(rejoined, room.room_id)
+    assert room.seats == {second: 1, rejoined: 0}
+
+
+def test_absent_opener_cannot_be_played_for():
+    room             = Room(1)
+    opener, second   = FakeClient(), FakeClient()
+    for client in (opener, second):
+        room.add_member(client)
+    room.remove_member(opener)
+    room.dispatch(second, DataType.ADD_BATCH, [(7, 7), (8, 8), (6, 8)], pack_moves([(7, 7), (8, 8), (6, 8)]))
+    assert not room.game_state.moves
+    assert second.sent == [DataType.SNAPSHOT]
+
+
+def test_rejected_undo_is_answered_with_a_snapshot():
+    room            = Room(1)
+    opener, second  = FakeClient(), FakeClient()
+    for client in (opener, second):
+        room.add_member(client)
+    room.dispatch(opener, DataType.ADD_BATCH, [(7, 7), (8, 8), (6, 8)], b'')
+    room.dispatch(second, DataType.UNDO, 1, b'')
+    assert len(room.game_state) == 3
+    assert second.sent == [DataType.ADD_BATCH, DataType.SNAPSHOT]
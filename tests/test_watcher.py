@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+
+from utils         import Board, BoardWatcher, FrameBackend
+from utils.board   import LAST_MOVE_COLOR
+from utils.watcher import BLACK, WHITE, MARKER, EMPTY
+
+BOARD_COLOR = (100, 170, 220)
+LINE_COLOR  = (0, 0, 0)
+
+
+def lined_board():
+    """A 15x15 board image with 1 px black grid lines, and a Board reading it."""
+    image  = np.full((400, 400, 3), BOARD_COLOR, np.uint8)
+    board  = Board((20, 20), (350, 350), 15, 15, backend=FrameBackend(image))
+    xs, ys = board.intersections
+    for i in range(15):
+        cv2.line(image, (int(xs[0, i]), int(ys.min())), (int(xs[0, i]), int(ys.max())), LINE_COLOR, 1)
+        cv2.line(image, (int(xs.min()), int(ys[i, 0])), (int(xs.max()), int(ys[i, 0])), LINE_COLOR, 1)
+    return image, board
+
+
+def place(image, board, x, y, color, marker=False):
+    xs, ys = board.intersections
+    center = (int(xs[y, x]), int(ys[y, x]))
+    cv2.circle(image, center, int(board.spacing[0] * 0.45), color, -1)
+    if marker:
+        cv2.circle(image, center, 2, LAST_MOVE_COLOR, -1)
+
+
+def test_grid_lines_read_as_empty():
+    image, board = lined_board()
+    watcher      = BoardWatcher(board)
+    assert watcher.poll() is None
+    assert (watcher.states == EMPTY).all()
+
+
+def test_stones_on_lined_board_are_reported():
+    image, board = lined_board()
+    watcher      = BoardWatcher(board)
+    watcher.poll()
+
+    place(image, board, 3, 4, (20, 20, 20))
+    place(image, board, 7, 7, (235, 235, 235), marker=True)
+    delta = watcher.poll()
+    assert sorted(delta.added) == [(3, 4), (7, 7)]
+    assert delta.removed == []
+    assert delta.last_move == (7, 7)
+    assert watcher.states[4, 3] == BLACK
+    assert watcher.states[7, 7] == MARKER
+
+    place(image, board, 7, 7, (235, 235, 235))
+    place(image, board, 10, 2, (20, 20, 20), marker=True)
+    delta = watcher.poll()
+    assert delta.added == [(10, 2)]
+    assert delta.last_move == (10, 2)
+    assert watcher.states[7, 7] == WHITE
@@ -1,21 +1,51 @@
-from .listener        import Listener, HotkeyError
+from .listener        import Listener, HotkeyError, KeyEventSource, ManualEventSource
 from .contours        import group_overlapping_contours
+from .capture         import CaptureSession, get_capture_session, CaptureBackend, ScreenBackend, FrameBackend
 from .screen_capture  import ScreenCapture
 from .helper          import CustomArr, ArrangedArr, img_crop, screenshot, screenshot_region, get_mouse_position, get_pixel, mouse_clip
-from .helper          import mouse_move_to, undo, redo
+from .helper          import mouse_move_to, undo, redo, window_rects
 from .board           import Board
-from .detect          import detect_board, detect_opening
+from .watcher         import BoardWatcher, BoardDelta
+from .colors          import ColorProfile, ColorProfileStore, get_color_profile, get_color_store, CALIBRATED_PROFILE
+from .calibrate       import calibrate_profile, calibrate_image
+from .detect          import detect_board, detect_opening, find_board_candidates, auto_detect_board, BoardCandidate
+from .grid            import GridGeometry, fit_grid, refine_board
+from .locate          import DetectionCache, grid_rect
 
 __all__ = [
     'Listener',
     'HotkeyError',
+    'KeyEventSource',
+    'ManualEventSource',
     'group_overlapping_contours',
     'ScreenCapture',
     'CustomArr',
     'ArrangedArr',
+    'CaptureSession',
+    'get_capture_session',
+    'CaptureBackend',
+    'ScreenBackend',
+    'FrameBackend',
     'Board',
+    'BoardWatcher',
+    'BoardDelta',
+    'ColorProfile',
+    'ColorProfileStore',
+    'get_color_profile',
+    'get_color_store',
+    'CALIBRATED_PROFILE',
+    'calibrate_profile',
+    'calibrate_image',
     'detect_board',
     'detect_opening',
+    'find_board_candidates',
+    'auto_detect_board',
+    'BoardCandidate',
+    'GridGeometry',
+    'fit_grid',
+    'refine_board',
+    'DetectionCache',
+    'grid_rect',
     'img_crop',
     'screenshot',
     'screenshot_region',
@@ -24,5 +54,6 @@ __all__ = [
     'mouse_clip',
     'mouse_move_to',
     'undo',
-    'redo'
+    'redo',
+    'window_rects'
 ]
\ No newline at end of file
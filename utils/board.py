@@ -1,8 +1,15 @@
 import time
-import win32api
-import win32con
+import numpy as np
 from typing import Tuple, List, Optional
-from utils  import get_pixel
+from utils  import CaptureBackend, ScreenBackend
+try:
+    import win32api
+    import win32con
+except ImportError:                       # Non-Windows: the board can be sampled but not clicked
+    win32api = win32con = None
+
+
+LAST_MOVE_COLOR = (0, 0, 255)             # BGR (get_pixel order) of the last-move marker
 
 
 def valid(move: str, size_x: int = 15, size_y: int = 15) -> bool:
@@ -84,15 +91,17 @@ class Board:
     Maps move strings (e.g., 'a1') to screen coordinates based on a top-left point
     and grid size, performing clicks for valid moves.
     """
-    def __init__(self, point: Tuple[int, int], size: Tuple[int, int], size_x: int, size_y: int):
+    def __init__(self, point: Tuple[float, float], size: Tuple[float, float], size_x: int, size_y: int,
+                 backend: Optional[CaptureBackend] = None):
         """
         Initialize the board with grid geometry.
 
         Args:
-            point: Top-left corner (x, y) of the grid.
-            size: Grid dimensions (width, height) in pixels.
+            point: Top-left intersection (x, y); may be sub-pixel, e.g. from fit_grid.
+            size: Distance (width, height) in pixels between the outer intersections.
             size_x: Number of columns.
             size_y: Number of rows.
+            backend: Source of board pixels; defaults to the screen.
 
         Raises:
             ValueError: If size_x, size_y, or size are invalid.
@@ -110,6 +119,49 @@ class Board:
         self.__size_y   = size_y
         self.__dis_x    = self.__w / (size_x - 1) if size_x > 1 else 0
         self.__dis_y    = self.__h / (size_y - 1) if size_y > 1 else 0
+        self.__backend  = backend if backend is not None else ScreenBackend()
+
+        # Screen pixel of every column and row (rows counted from the top), shared by clicks and sampling
+        self.__cols     = np.rint(self.__x1 + np.arange(size_x) * self.__dis_x).astype(np.intp)
+        self.__rows     = np.rint(self.__y1 + np.arange(size_y) * self.__dis_y).astype(np.intp)
+
+        # Pixel offsets of every intersection inside the grabbed region, indexed [y, x]
+        # in get_last_move's scan order (row 0 is the bottom row of the board)
+        left, top       = int(self.__cols[0]), int(self.__rows[0])
+        cols            = self.__cols - left
+        rows            = self.__rows[::-1] - top
+        self.__sample_x = np.broadcast_to(cols[np.newaxis, :], (size_y, size_x))
+        self.__sample_y = np.broadcast_to(rows[:, np.newaxis], (size_y, size_x))
+        self.__region   = (left, top, int(cols[-1]) + 1, int(rows[0]) + 1)
+
+    @property
+    def backend(self) -> CaptureBackend:
+        return self.__backend
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Number of (columns, rows)."""
+        return self.__size_x, self.__size_y
+
+    @property
+    def spacing(self) -> Tuple[float, float]:
+        """Distance in pixels between neighbouring intersections (x, y)."""
+        return self.__dis_x, self.__dis_y
+
+    @property
+    def intersections(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Screen (x, y) of every intersection as two arrays indexed like get_last_move."""
+        return self.__sample_x + self.__region[0], self.__sample_y + self.__region[1]
+
+    def sample(self) -> np.ndarray:
+        """
+        Grab the board once and read the pixel under every intersection.
+
+        Returns:
+            Array of shape (size_y, size_x, 3) with BGR values, indexed like get_last_move.
+        """
+        frame = self.__backend.grab(*self.__region)
+        return self.__backend.to_bgr(frame[self.__sample_y, self.__sample_x])
 
     def click(self, x: int, y: int) -> None:
         """
@@ -140,27 +192,29 @@ class Board:
         Returns:
             Tuple of (screen_x, screen_y) coordinates.
         """
-        screen_x    = self.__x1 + round(x * self.__dis_x)
-        screen_y    = self.__y1 + round(y * self.__dis_y)
-        return screen_x, screen_y
+        return int(self.__cols[x]), int(self.__rows[y])
 
-    def set_pos(self, move_string: str) -> None:
+    def set_pos(self, move_string: str) -> List[Tuple[int, int]]:
         """
         Simulate clicks for a string of moves.
 
         Args:
             move_string: String of moves (e.g., 'a1b2c3').
+
+        Returns:
+            The parsed moves, in the order they were clicked.
         """
         moves = get(move_string, self.__size_x, self.__size_y)
         for move in moves:
             self.click(*self.move_to_coord(*move))
+        return moves
 
     def get_last_move(self) -> Tuple[int, int] | None:
         """
         Return last move on board
         """
-        for y in range(15):
-            for x in range(15):
-                coord = self.move_to_coord(x, 14 - y)
-                if get_pixel(*coord) == (0, 0, 255):
-                    return (x, y)
\ No newline at end of file
+        hits = np.argwhere(np.all(self.sample() == LAST_MOVE_COLOR, axis=-1))
+        if not len(hits):
+            return None
+        y, x = hits[0]
+        return (int(x), int(y))
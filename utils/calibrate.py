@@ -0,0 +1,131 @@
+import numpy as np
+from typing import Tuple
+from utils  import Board, FrameBackend
+from utils.colors import CALIBRATED_PROFILE, ColorProfile
+
+
+def sample_patches(board: Board, patch_ratio: float = 0.2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grab the board once and read a robust colour for every intersection.
+
+    Each intersection is summarised by the median of points along its two diagonals,
+    which stay clear of the grid lines and of a small last-move marker.
+
+    Args:
+        board: Board whose geometry and capture backend are used.
+        patch_ratio: Diagonal reach as a fraction of the grid spacing.
+
+    Returns:
+        Tuple of (medians, centers): arrays of shape (N, 3), BGR, one row per intersection.
+    """
+    xs, ys    = board.intersections
+    xs, ys    = xs.ravel(), ys.ravel()
+    radius    = max(1, int(min(board.spacing) * patch_ratio))
+    left, top = int(xs.min()) - radius, int(ys.min()) - radius
+    frame     = board.backend.grab(left, top, int(xs.max()) + radius - left + 1, int(ys.max()) + radius - top + 1)
+
+    steps     = np.arange(1, radius + 1)
+    dx        = np.concatenate([steps, steps, -steps, -steps])
+    dy        = np.concatenate([steps, -steps, steps, -steps])
+    patches   = board.backend.to_bgr(frame[(ys - top)[:, np.newaxis] + dy, (xs - left)[:, np.newaxis] + dx])
+    centers   = board.backend.to_bgr(frame[ys - top, xs - left])
+    return np.median(patches, axis=1), centers.astype(np.uint8)
+
+
+def kmeans(points: np.ndarray, init: np.ndarray, iterations: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lloyd's k-means from fixed initial centroids, so calibration is deterministic.
+
+    Args:
+        points: Array of shape (N, D).
+        init: Initial centroids, shape (K, D).
+        iterations: Upper bound on refinement rounds.
+
+    Returns:
+        Tuple of (centroids, labels).
+    """
+    points    = points.astype(np.float64)
+    centroids = init.astype(np.float64)
+    labels    = np.zeros(len(points), dtype=np.intp)
+    for _ in range(iterations):
+        labels   = ((points[:, np.newaxis, :] - centroids[np.newaxis, :, :]) ** 2).sum(axis=-1).argmin(axis=1)
+        updated  = np.array([points[labels == k].mean(axis=0) if np.any(labels == k) else centroids[k]
+                             for k in range(len(centroids))])
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+    return centroids, labels
+
+
+def calibrate_profile(board: Board, name: str = CALIBRATED_PROFILE, patch_ratio: float = 0.2,
+                      min_separation: int = 40) -> ColorProfile:
+    """
+    Derive a colour profile from a board with at least one black and one white stone.
+
+    Intersection colours are clustered into empty, black and white: the most common
+    cluster is the empty board, the darker of the others black, the brighter white.
+    The last-move marker is the most saturated stone centre that differs from its
+    stone's colour.
+
+    Args:
+        board: Board to calibrate from, e.g. one built from a detect_board rectangle.
+        name: Name of the resulting profile.
+        patch_ratio: Diagonal reach of each intersection sample, see sample_patches.
+        min_separation: Smallest per-channel distance between the empty, black and
+            white centroids for the clusters to be trusted.
+
+    Returns:
+        The calibrated profile, matched by nearest colour; save it with ColorProfileStore.save.
+
+    Raises:
+        ValueError: If the board does not show both stone colours.
+    """
+    medians, centers = sample_patches(board, patch_ratio)
+    luma             = medians.mean(axis=-1)
+    init             = medians[[luma.argmin(), np.argsort(luma)[len(luma) // 2], luma.argmax()]]
+    centroids, labels = kmeans(medians, init)
+
+    counts           = np.bincount(labels, minlength=3)
+    empty            = int(counts.argmax())
+    stones           = sorted((k for k in range(3) if k != empty), key=lambda k: centroids[k].mean())
+    black, white     = stones
+    for a, b in ((empty, black), (empty, white), (black, white)):
+        if counts[a] == 0 or counts[b] == 0 or np.abs(centroids[a] - centroids[b]).max() < min_separation:
+            raise ValueError("Calibration needs a board showing both black and white stones")
+
+    colors           = {
+        'black': tuple(int(v) for v in np.rint(centroids[black])),
+        'white': tuple(int(v) for v in np.rint(centroids[white])),
+        'empty': tuple(int(v) for v in np.rint(centroids[empty])),
+    }
+
+    # Marker: a stone whose centre pixel is far from the stone's own colour
+    on_stone         = labels != empty
+    offset           = np.abs(centers.astype(np.int16) - centroids[labels].astype(np.int16)).max(axis=-1)
+    candidates       = np.nonzero(on_stone & (offset >= min_separation))[0]
+    if len(candidates):
+        saturation   = centers[candidates].max(axis=-1).astype(np.int16) - centers[candidates].min(axis=-1)
+        colors['spot'] = tuple(int(v) for v in centers[candidates[saturation.argmax()]])
+
+    return ColorProfile(name, colors)
+
+
+def calibrate_image(image: np.ndarray, rect: Tuple[int, int, int, int], size: int = 15, name: str = CALIBRATED_PROFILE,
+                    order: str = 'BGR', patch_ratio: float = 0.2, min_separation: int = 40) -> ColorProfile:
+    """
+    Calibrate from a saved screenshot and a board rectangle found in it by detect_board.
+
+    Args:
+        image: Screenshot containing the board.
+        rect: (x, y, w, h) of the board's outer intersections, in image coordinates.
+        size: Number of rows and columns.
+        name: Name of the resulting profile.
+        order: Channel order of the image, see FrameBackend.
+        patch_ratio: Diagonal reach of each intersection sample, see sample_patches.
+        min_separation: See calibrate_profile.
+
+    Returns:
+        The calibrated profile.
+    """
+    board = Board((rect[0], rect[1]), (rect[2], rect[3]), size, size, backend=FrameBackend(image, order=order))
+    return calibrate_profile(board, name, patch_ratio, min_separation)
@@ -0,0 +1,170 @@
+import cv2
+import mss
+import threading
+import numpy as np
+from abc    import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+
+class CaptureSession:
+    """
+    Long-lived screen grabber.
+
+    Keeps one mss handle per thread (mss handles are not shareable across threads)
+    instead of creating one per screenshot, and grabs only the requested rectangle.
+    Frames are returned as BGRA views over the grabbed buffer; colour conversion
+    only happens when asked for.
+    """
+    def __init__(self):
+        self.__local = threading.local()
+
+    @property
+    def sct(self) -> 'mss.base.MSSBase':
+        """The calling thread's mss handle, created on first use."""
+        sct = getattr(self.__local, 'sct', None)
+        if sct is None:
+            sct = self.__local.sct = mss.mss()
+        return sct
+
+    def monitor(self, index: int = 1) -> Dict[str, int]:
+        """
+        Geometry of a monitor.
+
+        Args:
+            index: 0 for the union of all monitors, 1 for the primary monitor, and so on.
+        """
+        return self.sct.monitors[index]
+
+    def grab(self, left: int, top: int, width: int, height: int, rgb: bool = False) -> np.ndarray:
+        """
+        Capture a rectangle of the screen.
+
+        Args:
+            left: Screen x-coordinate of the top-left corner.
+            top: Screen y-coordinate of the top-left corner.
+            width: Width of the rectangle in pixels.
+            height: Height of the rectangle in pixels.
+            rgb: If True, convert to a (height, width, 3) RGB copy.
+
+        Returns:
+            A (height, width, 4) BGRA view, or an RGB image if rgb is True.
+        """
+        image = np.asarray(self.sct.grab({'left': left, 'top': top, 'width': width, 'height': height}))
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2RGB) if rgb else image
+
+    def grab_monitor(self, index: int = 1, rgb: bool = False) -> np.ndarray:
+        """Capture a whole monitor; see monitor() for the index."""
+        monitor = self.monitor(index)
+        return self.grab(monitor['left'], monitor['top'], monitor['width'], monitor['height'], rgb)
+
+    def close(self) -> None:
+        """Release the calling thread's mss handle."""
+        sct = getattr(self.__local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            self.__local.sct = None
+
+
+_default_session: Optional[CaptureSession] = None
+
+
+def get_capture_session() -> CaptureSession:
+    """Shared session used by screenshots, board polling and opening detection."""
+    global _default_session
+    if _default_session is None:
+        _default_session = CaptureSession()
+    return _default_session
+
+
+class CaptureBackend(ABC):
+    """
+    Source of screen pixels for board sampling.
+
+    Backends return the requested rectangle as a uint8 array of shape
+    (height, width, channels) in the channel order named by `order`.
+    """
+    order = 'BGR'
+
+    @abstractmethod
+    def grab(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        """
+        Capture a rectangle of the screen.
+
+        Args:
+            left: Screen x-coordinate of the top-left corner.
+            top: Screen y-coordinate of the top-left corner.
+            width: Width of the rectangle in pixels.
+            height: Height of the rectangle in pixels.
+
+        Returns:
+            The captured pixels as a numpy array.
+        """
+
+    @abstractmethod
+    def screen_rect(self) -> Tuple[int, int, int, int]:
+        """(left, top, width, height) of everything this backend can grab."""
+
+    def to_bgr(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Convert pixels sampled from a grabbed frame to BGR, dropping any alpha channel.
+
+        BGR is the order get_pixel returns and the order colours are configured in.
+        """
+        return pixels[..., :3] if self.order.startswith('BGR') else pixels[..., 2::-1]
+
+
+class ScreenBackend(CaptureBackend):
+    """Captures from the live screen through a shared CaptureSession, without colour conversion."""
+    order = 'BGRA'
+
+    def __init__(self, session: Optional[CaptureSession] = None, monitor: int = 1):
+        """
+        Args:
+            session: Capture session to grab with; defaults to the shared one.
+            monitor: Monitor reported by screen_rect, see CaptureSession.monitor.
+        """
+        self.session = session if session is not None else get_capture_session()
+        self.monitor = monitor
+
+    def grab(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        return self.session.grab(left, top, width, height)
+
+    def screen_rect(self) -> Tuple[int, int, int, int]:
+        monitor = self.session.monitor(self.monitor)
+        return monitor['left'], monitor['top'], monitor['width'], monitor['height']
+
+
+class FrameBackend(CaptureBackend):
+    """
+    Captures from an in-memory frame, e.g. a saved screenshot or a synthetic board.
+
+    Lets board detection run headless (and on Linux) without touching the screen.
+    """
+    def __init__(self, frame: Optional[np.ndarray] = None, origin: Tuple[int, int] = (0, 0), order: str = 'BGR'):
+        """
+        Args:
+            frame: Image standing in for the screen (e.g. from cv2.imread).
+            origin: Screen coordinates of the frame's top-left pixel.
+            order: Channel order of the frame, 'BGR', 'BGRA', 'RGB' or 'RGBA'.
+        """
+        self.frame  = frame
+        self.origin = origin
+        self.order  = order
+
+    def set_frame(self, frame: np.ndarray) -> None:
+        """Replace the current frame, e.g. to simulate a move being played."""
+        self.frame = frame
+
+    def grab(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        if self.frame is None:
+            raise ValueError("FrameBackend has no frame to grab from")
+        x1 = left - self.origin[0]
+        y1 = top  - self.origin[1]
+        if x1 < 0 or y1 < 0 or x1 + width > self.frame.shape[1] or y1 + height > self.frame.shape[0]:
+            raise ValueError(f"Region ({left}, {top}, {width}, {height}) lies outside the frame")
+        return self.frame[y1:y1 + height, x1:x1 + width]
+
+    def screen_rect(self) -> Tuple[int, int, int, int]:
+        if self.frame is None:
+            raise ValueError("FrameBackend has no frame to grab from")
+        return self.origin[0], self.origin[1], self.frame.shape[1], self.frame.shape[0]
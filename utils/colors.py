@@ -0,0 +1,215 @@
+import os
+import time
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from utils.watcher import EMPTY, BLACK, WHITE, MARKER
+
+# Line order of a profile file; one "b g r" triple per line, blank lines for unknown colours
+PROFILE_LINES   = ('black', 'white', 'spot', 'spot2', 'empty')
+PROFILE_STATES  = (BLACK, WHITE, MARKER, MARKER, EMPTY)
+
+DEFAULT_PROFILE    = 'default'
+CALIBRATED_PROFILE = 'calibrated'    # Profile Controller.calibrate_colors writes
+
+
+def classify_colors(pixels: np.ndarray, palette: np.ndarray, tolerance: int = 0) -> np.ndarray:
+    """
+    Match every pixel against every palette colour at once.
+
+    Args:
+        pixels: Array of shape (N, 3).
+        palette: Array of shape (K, 3) in the same channel order.
+        tolerance: Largest per-channel difference still counted as a match.
+
+    Returns:
+        Array of N palette indices, -1 where no colour is within tolerance.
+    """
+    diff    = np.abs(pixels[:, np.newaxis, :].astype(np.int16) - palette[np.newaxis, :, :].astype(np.int16)).max(axis=-1)
+    nearest = diff.argmin(axis=1)
+    return np.where(diff[np.arange(len(pixels)), nearest] <= tolerance, nearest, -1)
+
+
+class ColorProfile:
+    """
+    Colours of one client skin, parsed into arrays ready for vectorised classification.
+
+    Colours are in get_pixel (BGR) order.
+    """
+    def __init__(self, name: str, colors: Dict[str, Tuple[int, int, int]]):
+        """
+        Args:
+            name: Profile name.
+            colors: Colour per PROFILE_LINES key; 'black' and 'white' are required.
+
+        Raises:
+            ValueError: If black or white is missing.
+        """
+        if 'black' not in colors or 'white' not in colors:
+            raise ValueError(f"Colour profile '{name}' must define black and white")
+        self.name    = name
+        self.colors  = dict(colors)
+        keys         = [key for key in PROFILE_LINES if key in colors]
+        self.palette = np.array([colors[key] for key in keys], dtype=np.uint8)                      # (K, 3)
+        self.states  = np.array([PROFILE_STATES[PROFILE_LINES.index(key)] for key in keys], dtype=np.uint8)
+        self.stones  = np.array([colors['black'], colors['white']], dtype=np.uint8)                 # (2, 3)
+
+    @classmethod
+    def load(cls, path: str, name: Optional[str] = None) -> 'ColorProfile':
+        """
+        Parse a profile file.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If a line is malformed or black/white are missing.
+        """
+        colors = {}
+        with open(path, 'r') as f:
+            for key, line in zip(PROFILE_LINES, f.read().split('\n')):
+                if not line.strip():
+                    continue
+                values = tuple(map(int, line.split()))
+                if len(values) != 3 or not all(0 <= v <= 255 for v in values):
+                    raise ValueError(f"Invalid colour '{line}' for {key} in {path}")
+                colors[key] = values
+        return cls(name or os.path.splitext(os.path.basename(path))[0], colors)
+
+    @property
+    def tolerance(self) -> Optional[int]:
+        """
+        Tolerance detection uses by default, see classify(): None (nearest colour) when
+        the profile has an empty colour, as calibrated ones do, else 0 (exact match).
+        """
+        return None if 'empty' in self.colors else 0
+
+    def save(self, path: str) -> None:
+        """Write the profile in the format load() reads."""
+        lines = [' '.join(map(str, self.colors[key])) if key in self.colors else '' for key in PROFILE_LINES]
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines).rstrip('\n') + '\n')
+
+    def classify(self, pixels: np.ndarray, tolerance: Optional[int] = 0) -> np.ndarray:
+        """
+        Classify pixels into intersection states.
+
+        Args:
+            pixels: Array of shape (N, 3), BGR.
+            tolerance: Largest per-channel difference still counted as a match; None
+                classifies every pixel by its nearest colour instead, see nearest().
+
+        Returns:
+            Array of N states; pixels matching no colour are EMPTY.
+        """
+        if tolerance is None:
+            return self.nearest(pixels)
+        index = classify_colors(pixels, self.palette, tolerance)
+        return np.where(index >= 0, self.states[index], EMPTY).astype(np.uint8)
+
+    def nearest(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Classify pixels by their nearest profile colour (squared RGB distance).
+
+        Robust to scaling and anti-aliasing, but only meaningful when the profile
+        has an empty colour, e.g. one written by calibrate_profile.
+
+        Raises:
+            ValueError: If the profile has no empty colour.
+        """
+        if 'empty' not in self.colors:
+            raise ValueError(f"Colour profile '{self.name}' has no empty colour for nearest-colour matching")
+        diff = pixels[:, np.newaxis, :].astype(np.int32) - self.palette[np.newaxis, :, :].astype(np.int32)
+        return self.states[(diff * diff).sum(axis=-1).argmin(axis=1)]
+
+    def classifier(self, tolerance: Optional[int] = 0):
+        """Bind a tolerance, e.g. to use this profile as a BoardWatcher classifier."""
+        return lambda pixels: self.classify(pixels, tolerance)
+
+
+class ColorProfileStore:
+    """
+    Cache of colour profiles keyed by name.
+
+    The default profile is color.cfg; any other name maps to colors/<name>.cfg.
+    A cached profile is reused until its file's mtime changes, and the mtime
+    itself is checked at most once per check_interval, so repeated detections
+    normally do no file I/O at all.
+    """
+    def __init__(self, root: str = '.', check_interval: float = 1.0):
+        """
+        Args:
+            root: Directory holding color.cfg and the colors/ folder.
+            check_interval: Seconds between mtime checks of a cached profile.
+        """
+        self.root           = root
+        self.check_interval = check_interval
+        self._cache         : Dict[str, Tuple[ColorProfile, int, float]] = {}    # name -> (profile, mtime_ns, checked_at)
+        self._lock          = threading.Lock()
+
+    def path(self, name: str = DEFAULT_PROFILE) -> str:
+        if name == DEFAULT_PROFILE:
+            return os.path.join(self.root, 'color.cfg')
+        return os.path.join(self.root, 'colors', f'{name}.cfg')
+
+    def names(self) -> List[str]:
+        """Names of the profiles available on disk."""
+        names = [DEFAULT_PROFILE] if os.path.exists(self.path()) else []
+        folder = os.path.join(self.root, 'colors')
+        if os.path.isdir(folder):
+            names += sorted(os.path.splitext(file)[0] for file in os.listdir(folder) if file.endswith('.cfg'))
+        return names
+
+    def get(self, name: str = DEFAULT_PROFILE) -> ColorProfile:
+        """
+        Return a profile, reloading it only if its file changed.
+
+        Raises:
+            FileNotFoundError: If the profile file does not exist.
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(name)
+            if cached is not None and now - cached[2] < self.check_interval:
+                return cached[0]
+
+            path  = self.path(name)
+            mtime = os.stat(path).st_mtime_ns
+            if cached is not None and cached[1] == mtime:
+                self._cache[name] = (cached[0], mtime, now)
+                return cached[0]
+
+            profile           = ColorProfile.load(path, name)
+            self._cache[name] = (profile, mtime, now)
+            return profile
+
+    def save(self, profile: ColorProfile) -> str:
+        """Write a profile to its file and cache it; returns the path written."""
+        path = self.path(profile.name)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        profile.save(path)
+        with self._lock:
+            self._cache[profile.name] = (profile, os.stat(path).st_mtime_ns, time.monotonic())
+        return path
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop one cached profile, or all of them."""
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(name, None)
+
+
+_default_store: Optional[ColorProfileStore] = None
+
+
+def get_color_store() -> ColorProfileStore:
+    """Shared store rooted at the working directory."""
+    global _default_store
+    if _default_store is None:
+        _default_store = ColorProfileStore()
+    return _default_store
+
+
+def get_color_profile(name: str = DEFAULT_PROFILE) -> ColorProfile:
+    """Profile from the shared store."""
+    return get_color_store().get(name)
@@ -7,6 +7,9 @@ from typing        import List, Tuple, Optional
 class UnionFind:
     """
     Disjoint-set data structure for efficient grouping operations.
+
+    Parents live in a numpy array, find() is iterative (path halving) so deep chains
+    cannot hit the recursion limit, and union_pairs() merges whole pair arrays at once.
     """
     def __init__(self, n: int):
         """
@@ -15,12 +18,12 @@ class UnionFind:
         Args:
             n: Number of elements in the disjoint-set.
         """
-        self.parent = list(range(n))
-        self.rank   = [0] * n
+        self.parent = np.arange(n, dtype=np.intp)
+        self.rank   = np.zeros(n, dtype=np.int8)
 
     def find(self, x: int) -> int:
         """
-        Find the root of element x with path compression.
+        Find the root of element x with path halving.
 
         Args:
             x: Element to find.
@@ -28,9 +31,11 @@ class UnionFind:
         Returns:
             Root of the set containing x.
         """
-        if self.parent[x] != x:
-            self.parent[x] = self.find(self.parent[x])  # Path compression
-        return self.parent[x]
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # Path halving
+            x         = parent[x]
+        return int(x)
 
     def union(self, x: int, y: int) -> None:
         """
@@ -50,6 +55,103 @@ class UnionFind:
         if self.rank[px] == self.rank[py]:
             self.rank[px] += 1
 
+    def union_pairs(self, pairs: np.ndarray) -> None:
+        """
+        Merge the sets of every (x, y) row of an (M, 2) array, vectorised.
+
+        Each round hooks the larger root of every still-split pair onto the smaller
+        one and then compresses all paths, so the work is a few array passes over
+        the pairs rather than one Python call per pair.
+
+        Args:
+            pairs: Element pairs to merge.
+        """
+        if not len(pairs):
+            return
+        x, y = pairs[:, 0], pairs[:, 1]
+        while True:
+            roots        = self.roots()
+            root_x       = roots[x]
+            root_y       = roots[y]
+            split        = root_x != root_y
+            if not split.any():
+                return
+            low          = np.minimum(root_x[split], root_y[split])
+            high         = np.maximum(root_x[split], root_y[split])
+            np.minimum.at(self.parent, high, low)
+
+    def roots(self) -> np.ndarray:
+        """Root of every element, with every path compressed."""
+        parent = self.parent
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                return parent
+            parent[:] = grand
+
+
+def candidate_pairs(centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    """
+    All pairs (i, j), i < j, whose centres lie within radii[i] of each other.
+
+    Most pairs come from a single KDTree.query_pairs call bounded by the 95th
+    percentile radius; the few contours with a larger radius are queried on their own,
+    so one huge contour does not turn the batch query quadratic.
+
+    Args:
+        centers: Array of shape (N, 2).
+        radii: Search radius per element.
+
+    Returns:
+        Array of shape (M, 2) with i < j in each row.
+    """
+    tree   = KDTree(centers)
+    cutoff = float(np.percentile(radii, 95))
+    pairs  = tree.query_pairs(cutoff, output_type='ndarray')
+    pairs  = pairs[radii[pairs[:, 0]] <= cutoff] if len(pairs) else pairs.reshape(0, 2)
+
+    large  = np.flatnonzero(radii > cutoff)
+    if len(large):
+        hits   = tree.query_ball_point(centers[large], radii[large])
+        extra  = [(i, j) for i, js in zip(large.tolist(), hits) for j in js if j > i]
+        if extra:
+            pairs = np.vstack([pairs, np.array(extra, dtype=pairs.dtype)])
+
+    # query_pairs bounds by cutoff; enforce each pair's own radius
+    distance = np.linalg.norm(centers[pairs[:, 0]] - centers[pairs[:, 1]], axis=1)
+    return pairs[distance <= radii[pairs[:, 0]]]
+
+
+def contours_overlap(contour1: np.ndarray, contour2: np.ndarray, rect1: Tuple[int, int, int, int],
+                     rect2: Tuple[int, int, int, int]) -> bool:
+    """
+    Pixel-level overlap of two filled contours.
+
+    Both contours are rasterised only inside the intersection of their bounding
+    rects, the only place they can share pixels, so memory is bounded by that
+    intersection rather than by the image.
+
+    Args:
+        contour1: First contour.
+        contour2: Second contour.
+        rect1: cv2.boundingRect of the first contour.
+        rect2: cv2.boundingRect of the second contour.
+
+    Returns:
+        True if the filled contours share at least one pixel.
+    """
+    x1 = max(rect1[0], rect2[0])
+    y1 = max(rect1[1], rect2[1])
+    x2 = min(rect1[0] + rect1[2], rect2[0] + rect2[2])
+    y2 = min(rect1[1] + rect1[3], rect2[1] + rect2[3])
+    if x2 <= x1 or y2 <= y1:
+        return False
+    mask1 = np.zeros((y2 - y1, x2 - x1), dtype=np.uint8)
+    mask2 = np.zeros_like(mask1)
+    cv2.drawContours(mask1, [contour1], -1, 255, thickness=cv2.FILLED, offset=(-x1, -y1))
+    cv2.drawContours(mask2, [contour2], -1, 255, thickness=cv2.FILLED, offset=(-x1, -y1))
+    return bool(np.any(cv2.bitwise_and(mask1, mask2)))
+
 
 def group_overlapping_contours(
     contours         : List,
@@ -62,19 +164,20 @@ def group_overlapping_contours(
     """
     Group overlapping or nearby contours efficiently.
 
+    Candidate pairs come from one batched KDTree query, and bounding-rect overlap
+    and centre distances are computed for all of them at once.
+
     Args:
         contours: List of contours from cv2.findContours.
         distanceThreshold: Max distance between contour centers to consider them related.
         areaSize: Minimum contour area to filter noise.
         useConvexHull: If True, merge grouped contours into a convex hull; else, concatenate points.
-        useMasks: If True, use pixel-level overlap detection (requires imageShape).
-        imageShape: Tuple (height, width) of the image, required if useMasks=True.
+        useMasks: If True, also use pixel-level overlap detection, see contours_overlap.
+        imageShape: Tuple (height, width) of the image; no longer needed, since masks
+            are rasterised per pair within their bounding rects.
 
     Returns:
         List of grouped contours.
-
-    Raises:
-        ValueError: If imageShape is None when useMasks=True.
     """
     # Filter contours by area to remove noise
     significant_contours = [cnt for cnt in contours if cv2.contourArea(cnt) >= areaSize]
@@ -83,55 +186,38 @@ def group_overlapping_contours(
 
     # Initialize variables
     n                 = len(significant_contours)
-    bounding_rects    = [cv2.boundingRect(cnt) for cnt in significant_contours]
-    centers           = np.array([(rect[0] + rect[2] / 2, rect[1] + rect[3] / 2) for rect in bounding_rects])
+    rects             = np.array([cv2.boundingRect(cnt) for cnt in significant_contours], dtype=np.float64).reshape(n, 4)
+    centers           = rects[:, :2] + rects[:, 2:] / 2
     uf                = UnionFind(n)
 
-    # Create masks for pixel-level overlap if needed
-    if useMasks:
-        if imageShape is None:
-            raise ValueError("imageShape must be provided when useMasks=True")
-        masks = [np.zeros(imageShape, dtype=np.uint8) for _ in range(n)]
-        for i, cnt in enumerate(significant_contours):
-            cv2.drawContours(masks[i], [cnt], -1, 255, thickness=cv2.FILLED)
-
-    # Build KDTree for efficient neighbor queries
-    tree = KDTree(centers)
-
-    # Group contours based on proximity or overlap
-    for i in range(n):
-        rect1   = bounding_rects[i]
-        center1 = centers[i]
-        indices = tree.query_ball_point(center1, distanceThreshold + max(rect1[2], rect1[3]))
-
-        for j in indices:
-            if i >= j or uf.find(i) == uf.find(j):
-                continue
-            rect2         = bounding_rects[j]
-            x_overlap     = max(0, min(rect1[0] + rect1[2], rect2[0] + rect2[2]) - max(rect1[0], rect2[0]))
-            y_overlap     = max(0, min(rect1[1] + rect1[3], rect2[1] + rect2[3]) - max(rect1[1], rect2[1]))
-            rects_overlap = x_overlap > 0 and y_overlap > 0
-            distance      = np.linalg.norm(center1 - centers[j]) if not rects_overlap else 0
-            pixel_overlap = False
-
-            if useMasks and (rects_overlap or distance <= distanceThreshold):
-                overlap_mask  = cv2.bitwise_and(masks[i], masks[j])
-                pixel_overlap = np.any(overlap_mask)
-
-            if rects_overlap or pixel_overlap or (distance > 0 and distance <= distanceThreshold):
-                uf.union(i, j)
-
-    # Collect grouped contours
-    groups = {}
-    for idx in range(n):
-        root = uf.find(idx)
-        if root not in groups:
-            groups[root] = []
-        groups[root].append(significant_contours[idx])
+    if n > 1:
+        # Candidate pairs: centres within distanceThreshold plus the larger side of the first rect
+        pairs         = candidate_pairs(centers, distanceThreshold + rects[:, 2:].max(axis=1))
+        rect1, rect2  = rects[pairs[:, 0]], rects[pairs[:, 1]]
+        x_overlap     = np.minimum(rect1[:, 0] + rect1[:, 2], rect2[:, 0] + rect2[:, 2]) - np.maximum(rect1[:, 0], rect2[:, 0])
+        y_overlap     = np.minimum(rect1[:, 1] + rect1[:, 3], rect2[:, 1] + rect2[:, 3]) - np.maximum(rect1[:, 1], rect2[:, 1])
+        rects_overlap = (x_overlap > 0) & (y_overlap > 0)
+        distance      = np.where(rects_overlap, 0, np.linalg.norm(centers[pairs[:, 0]] - centers[pairs[:, 1]], axis=1))
+        related       = rects_overlap | ((distance > 0) & (distance <= distanceThreshold))
+
+        if useMasks:
+            bounds = rects.astype(np.intp).tolist()
+            for k in np.flatnonzero(~related & (distance <= distanceThreshold)):
+                i, j       = pairs[k]
+                related[k] = contours_overlap(significant_contours[i], significant_contours[j], bounds[i], bounds[j])
+
+        uf.union_pairs(pairs[related])
+
+    # Collect grouped contours, groups ordered by their first member
+    roots             = uf.roots()
+    order             = np.argsort(roots, kind='stable')
+    bounds            = np.flatnonzero(np.diff(roots[order])) + 1
+    groups            = sorted(np.split(order, bounds), key=lambda members: members[0])
 
     # Merge contours in each group
     grouped_contours = [
-        cv2.convexHull(np.vstack(group)) if useConvexHull else np.vstack(group)
-        for group in groups.values()
+        cv2.convexHull(np.vstack([significant_contours[i] for i in group])) if useConvexHull
+        else np.vstack([significant_contours[i] for i in group])
+        for group in groups
     ]
-    return grouped_contours
\ No newline at end of file
+    return grouped_contours
@@ -1,11 +1,184 @@
 import cv2
 import numpy as np
-from typing import Tuple, Optional
-from PIL    import Image
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
 from utils  import group_overlapping_contours
-from utils  import screenshot_region
-from utils  import ArrangedArr
-import os
+from utils  import CaptureSession, get_capture_session, CaptureBackend, ScreenBackend
+from utils.colors import DEFAULT_PROFILE, ColorProfile, classify_colors, get_color_profile
+from utils.watcher import BLACK, WHITE
+
+
+class BoardCandidate(NamedTuple):
+    x         : int       # Screen (or image) x of the top-left corner
+    y         : int       # Screen (or image) y of the top-left corner
+    w         : int
+    h         : int
+    area      : float     # Contour area of the grouped grid lines
+    squareness: float     # min(w, h) / max(w, h)
+    grid      : float     # Grid-line evidence in [0, 1], see grid_evidence
+    score     : float     # Combined confidence in [0, 1], used for ranking
+
+
+# Weights of the combined candidate score
+SCORE_WEIGHTS   = {'grid': 0.5, 'squareness': 0.3, 'area': 0.2}
+MIN_GRID_LINES  = 15
+
+# detect_opening's default tolerance: whatever the colour profile itself uses
+PROFILE_TOLERANCE = -1
+
+# How far line_mask looks around a pixel: its 5x5 closing dilates, then erodes, by 2
+MASK_REACH        = 4
+
+
+def line_mask(gray: np.ndarray) -> np.ndarray:
+    """
+    Mark dark pixels inside bright regions, i.e. grid lines drawn on a board.
+
+    Args:
+        gray: Grayscale image.
+
+    Returns:
+        uint8 mask, 255 on line pixels.
+    """
+    _, thresh     = cv2.threshold(gray, 120, 255, cv2.THRESH_BINARY)
+    thresh_inv    = cv2.bitwise_not(thresh)  # Invert for white background
+
+    # Morphological closing to remove noise
+    kernel        = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+    morph         = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+
+    # Refine threshold (optional: adjust based on intent)
+    return cv2.bitwise_and(thresh_inv, thresh_inv, mask=morph)
+
+
+def grid_evidence(mask: np.ndarray) -> float:
+    """
+    How much a masked region looks like a grid of evenly spaced lines.
+
+    Rows and columns covered by the mask over most of the region are grid lines;
+    the score grows with their count (up to MIN_GRID_LINES per axis) and drops as
+    their spacing becomes irregular.
+
+    Args:
+        mask: line_mask cropped to the candidate region.
+
+    Returns:
+        Evidence in [0, 1].
+    """
+    evidence = 1.0
+    for axis in (0, 1):
+        profile = (mask > 0).mean(axis=axis) > 0.5
+        edges   = np.flatnonzero(np.diff(np.concatenate([[0], profile.astype(np.int8), [0]])))
+        centers = (edges[0::2] + edges[1::2] - 1) / 2
+        if len(centers) < 3:
+            return 0.0
+        gaps      = np.diff(centers)
+        regular   = max(0.0, 1.0 - gaps.std() / gaps.mean())
+        evidence *= min(1.0, len(centers) / MIN_GRID_LINES) * regular
+    return float(evidence)
+
+
+def _find_regions(mask: np.ndarray, scale: int, rectangle: bool, min_area: float) -> List[Tuple[int, int, int, int, float, float]]:
+    """
+    One pass of the board pipeline over the line_mask of a (possibly downscaled) image.
+
+    Returns:
+        (x, y, w, h, area, grid) per region, in full-resolution pixels.
+    """
+    # Find and group contours; thresholds are given in full-resolution pixels
+    contours, _   = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    contour_group = group_overlapping_contours(contours, distanceThreshold=10.0 / scale, areaSize=300.0 / scale ** 2)
+
+    regions       = []
+    for contour in contour_group:
+        area         = cv2.contourArea(contour) * scale ** 2
+        if area < min_area:
+            continue
+        box          = np.rint(cv2.boxPoints(cv2.minAreaRect(contour))).astype(np.intp)
+        x1           = max(0, int(min(box[:, 0])))
+        y1           = max(0, int(min(box[:, 1])))
+        w            = int(max(box[:, 0]) - x1)
+        h            = int(max(box[:, 1]) - y1)
+        aspect_ratio = float(w) / h if h > 0 else 1.0
+
+        if w > 0 and h > 0 and (rectangle or 0.9 <= aspect_ratio <= 1.1):
+            grid = grid_evidence(mask[y1:y1 + h + 1, x1:x1 + w + 1])
+            regions.append((x1 * scale, y1 * scale, w * scale, h * scale, area, grid))
+    return regions
+
+
+def find_board_candidates(
+    img          : np.ndarray,
+    top          : int   = 0,
+    left         : int   = 0,
+    rectangle    : bool  = False,
+    min_area     : float = 1000,
+    max_side     : int   = 1280
+) -> List[BoardCandidate]:
+    """
+    Find every board-like region in an image, best first.
+
+    Large images are searched on a min-pooled pyramid level no bigger than max_side
+    (min-pooling keeps thin dark grid lines), and each hit is then re-detected in a
+    full-resolution crop around it, so the cost stays bounded as resolution grows
+    while the rectangles stay pixel-accurate.
+
+    Args:
+        img: Input image as a numpy array, 3 channels (BGR or RGB) or 4 (BGRA).
+        top: Y-offset to adjust output coordinates.
+        left: X-offset to adjust output coordinates.
+        rectangle: If True, allow any rectangle; if False, require near-square (0.9 <= w/h <= 1.1).
+        min_area: Smallest grouped contour area considered a board, in full-resolution pixels.
+        max_side: Longest image side searched without downscaling.
+
+    Returns:
+        List of BoardCandidate, ranked by score, then area.
+
+    Raises:
+        ValueError: If img is invalid (empty or not 3/4-channel).
+    """
+    if not isinstance(img, np.ndarray) or img.size == 0 or img.ndim != 3 or img.shape[2] not in (3, 4):
+        raise ValueError("Input image must be a non-empty RGB or BGRA numpy array")
+
+    gray    = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY if img.shape[2] == 3 else cv2.COLOR_BGRA2GRAY)
+    scale   = 1
+    level   = gray
+    pool    = np.ones((2, 2), dtype=np.uint8)
+    while max(level.shape) > max_side:
+        level  = cv2.erode(level, pool)
+        level  = cv2.resize(level, (level.shape[1] // 2, level.shape[0] // 2), interpolation=cv2.INTER_NEAREST)
+        scale *= 2
+
+    regions = _find_regions(line_mask(level), scale, rectangle, min_area)
+    if scale > 1:
+        # Re-detect each coarse hit at full resolution within a margin of a few coarse pixels
+        refined = []
+        margin  = 8 * scale
+        for x, y, w, h, area, grid in regions:
+            x1, y1 = max(0, x - margin), max(0, y - margin)
+            # Mask with MASK_REACH pixels of context, so lines on the crop's edge read as at full resolution
+            cx, cy = max(0, x1 - MASK_REACH), max(0, y1 - MASK_REACH)
+            mask   = line_mask(gray[cy:y + h + margin + MASK_REACH, cx:x + w + margin + MASK_REACH])
+            exact  = _find_regions(mask[y1 - cy:y + h + margin - cy, x1 - cx:x + w + margin - cx], 1, rectangle, min_area)
+            if exact:
+                # Closest to the coarse box: a wider crop can also catch the board's outer frame
+                best = min(exact, key=lambda region: abs(region[0] + x1 - x) + abs(region[1] + y1 - y)
+                                                     + abs(region[2] - w) + abs(region[3] - h))
+                refined.append((best[0] + x1, best[1] + y1) + best[2:])
+            else:
+                refined.append((x, y, w, h, area, grid))
+        regions = refined
+
+    largest    = max((region[4] for region in regions), default=1.0)
+    candidates = []
+    for x, y, w, h, area, grid in regions:
+        squareness = min(w, h) / max(w, h)
+        score      = (SCORE_WEIGHTS['grid'] * grid + SCORE_WEIGHTS['squareness'] * squareness
+                      + SCORE_WEIGHTS['area'] * area / largest)
+        candidates.append(BoardCandidate(x + left, y + top, w, h, float(area), squareness, grid, score))
+
+    candidates.sort(key=lambda candidate: (candidate.score, candidate.area), reverse=True)
+    return candidates
 
 
 def detect_board(
@@ -17,14 +190,12 @@ def detect_board(
     """
     Detect a game board in an image, returning its top-left corner and size.
 
-    Processes the image to find the largest near-square or rectangular region,
-    optionally masking circular objects (e.g., game pieces).
+    Returns the best-scored near-square or rectangular region, see find_board_candidates.
 
     Args:
         img: Input RGB image as a numpy array.
         top: Y-offset to adjust output coordinates.
         left: X-offset to adjust output coordinates.
-        enable_border: If True, detect and mask circular objects.
         rectangle: If True, allow any rectangle; if False, require near-square (0.9 <= w/h <= 1.1).
 
     Returns:
@@ -34,76 +205,133 @@ def detect_board(
     Raises:
         ValueError: If img is invalid (empty or not RGB).
     """
-    if not isinstance(img, np.ndarray) or img.size == 0 or img.shape[2] != 3:
-        raise ValueError("Input image must be a non-empty RGB numpy array")
+    candidates = find_board_candidates(img, top, left, rectangle)
+    return tuple(candidates[0][:4]) if candidates else (None, None, None, None)
 
-    # Convert to grayscale and apply adaptive thresholding
-    gray          = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    _, thresh     = cv2.threshold(gray, 120, 255, cv2.THRESH_BINARY)
-    thresh_inv    = cv2.bitwise_not(thresh)  # Invert for white background
 
-    # Morphological closing to remove noise
-    kernel        = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-    morph         = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+def auto_detect_board(
+    regions      : Optional[Sequence[Tuple[int, int, int, int]]] = None,
+    backend      : Optional[CaptureBackend]                      = None,
+    rectangle    : bool                                          = False
+) -> List[BoardCandidate]:
+    """
+    Find boards on screen without any user interaction.
 
-    # Refine threshold (optional: adjust based on intent)
-    thresh        = cv2.bitwise_and(thresh_inv, thresh_inv, mask=morph)
+    The screen is grabbed once; each candidate window (or the whole screen if none
+    are given) is searched separately, so a small board is not swallowed by a
+    larger region elsewhere.
 
-    # Find and group contours
-    contours, _   = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    contour_group = group_overlapping_contours(contours)
+    Args:
+        regions: Screen rectangles (left, top, width, height) to search, e.g. from
+            window_rects; parts outside the screen are ignored.
+        backend: Source of screen pixels; a FrameBackend runs this on a saved or
+            synthetic image. Defaults to the primary monitor.
+        rectangle: See find_board_candidates.
 
-    # Select largest near-square or rectangular region
-    min_area      = 1000  # Minimum board area
-    cur_info      = (None, None, None, None)
+    Returns:
+        Candidates in screen coordinates, best first, without duplicates.
+    """
+    backend                 = backend if backend is not None else ScreenBackend()
+    s_left, s_top, s_w, s_h = backend.screen_rect()
+    frame                   = backend.grab(s_left, s_top, s_w, s_h)
 
-    for contour in contour_group:
-        area         = cv2.contourArea(contour)
-        if area < min_area:
+    found = {}
+    for left, top, width, height in (regions or [(s_left, s_top, s_w, s_h)]):
+        x1, y1 = max(left, s_left), max(top, s_top)
+        x2, y2 = min(left + width, s_left + s_w), min(top + height, s_top + s_h)
+        if x2 <= x1 or y2 <= y1:
             continue
-        rect         = cv2.minAreaRect(contour)
-        box          = cv2.boxPoints(rect)
-        box          = np.int0(box)
-        x1           = int(min(box[:, 0]))
-        y1           = int(min(box[:, 1]))
-        w            = int(max(box[:, 0]) - x1)
-        h            = int(max(box[:, 1]) - y1)
-        aspect_ratio = float(w) / h if h > 0 else 1.0
+        crop   = frame[y1 - s_top:y2 - s_top, x1 - s_left:x2 - s_left]
+        for candidate in find_board_candidates(crop, y1, x1, rectangle):
+            found.setdefault(candidate[:4], candidate)
 
-        if (rectangle or 0.9 <= aspect_ratio <= 1.1):
-            min_area = max(min_area, area)
-            cur_info = (x1 + left, y1 + top, w, h)
-
-    return cur_info
-
-
-def detect_opening(left: int, top: int, width: int, height: int, distance: int):
-    # Step 1: Load color configuration
-    assert os.path.exists('color.cfg')
-    with open('color.cfg', 'r') as f:
-        lines  = f.read().split('\n')
-        colors = []   # 0: Black; 1: White; 2: Spot; 3: Spot 2
-        for i in range(2):
-            colors.append(tuple(map(int, lines[i].split())))
-    # Step 2: Screenshot board
-    image = screenshot_region(left, top, height, width)
-    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    image = Image.fromarray(image)
-    
-    # Step 3: Scan board
-    deviation  = 0.2
-    list_coord = ArrangedArr()
-    for y in range(15):
-        for x in range(15):
-            coord        = (x, 14 - y)            
-            deviation_x  = deviation if x == 14 else -deviation
-            deviation_y  = deviation if y == 14 else -deviation
-            actual_coord = (int(round((x - deviation_x) * distance)), 
-                            int(round((y - deviation_y) * distance)))
-            r, g, b      = image.getpixel((actual_coord[0], actual_coord[1]))
-            if (r, g, b) == colors[0]:
-                list_coord.add(coord, 'b')
-            elif (r, g, b) == colors[1]:
-                list_coord.add(coord, 'w')
-    return list_coord.get()
-            
\ No newline at end of file
+    return sorted(found.values(), key=lambda candidate: (candidate.score, candidate.area), reverse=True)
+
+
+@lru_cache(maxsize=32)
+def opening_sample_points(distance: float, size: int = 15, deviation: float = 0.2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pixel positions sampled by detect_opening, relative to the board's top-left corner.
+
+    Each intersection is sampled `deviation` cells inside its lower-right quadrant
+    (upper-left on the last row/column) to stay clear of grid lines and markers.
+
+    Args:
+        distance: Spacing between intersections in pixels.
+        size: Number of rows and columns.
+        deviation: Offset from the intersection as a fraction of the spacing.
+
+    Returns:
+        Tuple of (xs, ys, coords) in scan order: pixel columns, pixel rows, and the
+        (x, y) board coordinate of each sample (y counted from the bottom).
+    """
+    index   = np.arange(size)
+    offset  = np.where(index == size - 1, -deviation, deviation)
+    pixel   = np.rint((index + offset) * distance).astype(np.intp)
+    ys, xs  = np.meshgrid(pixel, pixel, indexing='ij')
+    rows    = np.repeat(size - 1 - index, size)
+    cols    = np.tile(index, size)
+    return xs.ravel(), ys.ravel(), np.stack([cols, rows], axis=1)
+
+
+def classify_opening(image: np.ndarray, distance: float, colors: Union[np.ndarray, ColorProfile], tolerance: Optional[int] = 0,
+                     size: int = 15):
+    """
+    Read the stones of a board image and order them as an opening.
+
+    Args:
+        image: Board image whose top-left pixel is the top-left intersection, BGR(A).
+        distance: Spacing between intersections in pixels.
+        colors: Array of shape (2, 3) with the black and white stone colours (BGR), or a ColorProfile.
+        tolerance: Largest per-channel difference still counted as a match; None matches
+            each pixel to the nearest colour of a calibrated profile instead.
+        size: Number of rows and columns.
+
+    Returns:
+        List of moves alternating black, white, black, ... with None where one colour runs out.
+    """
+    xs, ys, coords = opening_sample_points(float(distance), size)
+    if xs.max() >= image.shape[1] or ys.max() >= image.shape[0]:
+        raise ValueError(f"Image of shape {image.shape[:2]} is too small for spacing {distance}")
+    pixels   = image[ys, xs, :3]
+    if isinstance(colors, ColorProfile):
+        states = colors.classify(pixels, tolerance)
+        labels = np.select([states == BLACK, states == WHITE], [0, 1], -1)
+    else:
+        labels = classify_colors(pixels, colors, tolerance)
+
+    # Same layout ArrangedArr builds: black on even indices, white on odd ones
+    black    = list(map(tuple, coords[labels == 0].tolist()))
+    white    = list(map(tuple, coords[labels == 1].tolist()))
+    sequence = [None] * max(2 * len(black) - 1, 2 * len(white), 0)
+    sequence[0:2 * len(black):2] = black
+    sequence[1:2 * len(white):2] = white
+    return sequence
+
+
+def detect_opening(left: int, top: int, width: int, height: int, distance: int, session: Optional[CaptureSession] = None,
+                   tolerance: Optional[int] = PROFILE_TOLERANCE, profile: str = DEFAULT_PROFILE):
+    """
+    Capture the board and read its stones as an opening.
+
+    Args:
+        left: Screen x-coordinate of the board's top-left intersection.
+        top: Screen y-coordinate of the board's top-left intersection.
+        width: Board width in pixels.
+        height: Board height in pixels.
+        distance: Spacing between intersections in pixels.
+        session: Capture session to grab with; defaults to the shared one.
+        tolerance: Largest per-channel difference from a configured colour still counted as a stone,
+            or None for nearest-colour matching against a calibrated profile. Defaults to the
+            profile's own tolerance: exact for hand-made colours, nearest colour for calibrated ones.
+        profile: Name of the colour profile of the client skin, see ColorProfileStore.
+
+    Returns:
+        Moves alternating black, white, black, ..., see classify_opening.
+    """
+    colors  = get_color_profile(profile)
+    if tolerance == PROFILE_TOLERANCE:
+        tolerance = colors.tolerance
+    session = session if session is not None else get_capture_session()
+    image   = session.grab(left, top, width, height)
+    return classify_opening(image, distance, colors, tolerance)
@@ -0,0 +1,130 @@
+import cv2
+import numpy as np
+from typing import NamedTuple, Optional, Sequence, Tuple
+from utils  import Board, CaptureBackend, ScreenBackend
+from utils.detect import line_mask
+
+BOARD_SIZES = (15, 19, 20)
+
+
+class GridGeometry(NamedTuple):
+    x      : float     # Screen x of the top-left intersection, sub-pixel
+    y      : float     # Screen y of the top-left intersection, sub-pixel
+    pitch_x: float     # Distance between neighbouring columns
+    pitch_y: float     # Distance between neighbouring rows
+    size_x : int       # Number of columns
+    size_y : int       # Number of rows
+
+    def to_board(self, backend: Optional[CaptureBackend] = None) -> Board:
+        """Board whose click and sampling tables follow the fitted grid lines."""
+        return Board((self.x, self.y), (self.pitch_x * (self.size_x - 1), self.pitch_y * (self.size_y - 1)),
+                     self.size_x, self.size_y, backend)
+
+
+def line_centers(profile: np.ndarray, threshold: float = 0.5) -> np.ndarray:
+    """
+    Sub-pixel centres of the lines in a projection profile.
+
+    Args:
+        profile: Fraction of line pixels per row or column.
+        threshold: Fraction of the profile's peak a line must reach.
+
+    Returns:
+        Weighted centroid of every run above the threshold.
+    """
+    above   = profile >= threshold * profile.max()
+    edges   = np.flatnonzero(np.diff(np.concatenate([[0], above.astype(np.int8), [0]])))
+    index   = np.arange(len(profile), dtype=np.float64)
+    return np.array([np.average(index[start:end], weights=profile[start:end])
+                     for start, end in zip(edges[0::2], edges[1::2])])
+
+
+def fit_lines(centers: np.ndarray, outlier: float = 0.15) -> Tuple[float, float, int]:
+    """
+    Fit evenly spaced lines, tolerating missing lines and stray ones (e.g. a frame).
+
+    The pitch is first estimated as the median gap, each centre gets the nearest
+    line index, and origin and pitch are then least-squares fitted to the centres
+    lying within `outlier` pitches of their line.
+
+    Args:
+        centers: Line centres in ascending order.
+        outlier: Largest residual kept, as a fraction of the pitch.
+
+    Returns:
+        Tuple of (origin, pitch, count).
+
+    Raises:
+        ValueError: If fewer than three lines are found.
+    """
+    if len(centers) < 3:
+        raise ValueError(f"Found {len(centers)} grid lines, need at least 3")
+    pitch = float(np.median(np.diff(centers)))
+    # Phase of the grid as the circular mean of the centres modulo the pitch, so a stray line cannot anchor it
+    angle = 2 * np.pi * centers / pitch
+    phase = np.arctan2(np.sin(angle).mean(), np.cos(angle).mean()) * pitch / (2 * np.pi)
+    start = centers[0] + (phase - centers[0] + pitch / 2) % pitch - pitch / 2
+    for _ in range(2):
+        index         = np.rint((centers - start) / pitch)
+        inliers       = np.abs(centers - (start + index * pitch)) <= outlier * pitch
+        pitch, start  = np.polyfit(index[inliers], centers[inliers], 1)
+    index = np.rint((centers[inliers] - start) / pitch).astype(np.intp)
+    first = int(index.min())
+    return float(start + first * pitch), float(pitch), int(index.max() - first + 1)
+
+
+def fit_grid(image: np.ndarray, top: int = 0, left: int = 0, sizes: Optional[Sequence[int]] = BOARD_SIZES) -> GridGeometry:
+    """
+    Locate the grid lines of a board image to sub-pixel accuracy.
+
+    Projection profiles of the line mask give the line centres on each axis, which
+    are fitted to an evenly spaced grid; padding or a frame around the board does
+    not skew the result.
+
+    Args:
+        image: Board crop, 3 channels (BGR or RGB) or 4 (BGRA), e.g. a detect_board rectangle plus a margin.
+        top: Y-offset to adjust output coordinates.
+        left: X-offset to adjust output coordinates.
+        sizes: Accepted numbers of lines per axis; None accepts any count.
+
+    Returns:
+        The fitted GridGeometry.
+
+    Raises:
+        ValueError: If no grid is found or its size is not one of `sizes`.
+    """
+    if not isinstance(image, np.ndarray) or image.size == 0 or image.ndim != 3 or image.shape[2] not in (3, 4):
+        raise ValueError("Input image must be a non-empty RGB or BGRA numpy array")
+    gray    = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY if image.shape[2] == 3 else cv2.COLOR_BGRA2GRAY)
+    mask    = line_mask(gray) > 0
+
+    x0, pitch_x, size_x = fit_lines(line_centers(mask.mean(axis=0)))
+    y0, pitch_y, size_y = fit_lines(line_centers(mask.mean(axis=1)))
+    if sizes is not None and (size_x not in sizes or size_y not in sizes):
+        raise ValueError(f"Found a {size_x}x{size_y} grid, expected one of {tuple(sizes)}")
+    return GridGeometry(x0 + left, y0 + top, pitch_x, pitch_y, size_x, size_y)
+
+
+def refine_board(rect: Tuple[int, int, int, int], backend: Optional[CaptureBackend] = None,
+                 sizes: Optional[Sequence[int]] = BOARD_SIZES, margin: float = 0.05) -> GridGeometry:
+    """
+    Grab a detected board rectangle with a small margin and fit its grid.
+
+    Args:
+        rect: (x, y, w, h) from detect_board or auto_detect_board, in screen coordinates.
+        backend: Source of screen pixels; defaults to the primary monitor.
+        sizes: See fit_grid.
+        margin: Extra border grabbed on every side, as a fraction of the rectangle.
+
+    Returns:
+        The fitted GridGeometry in screen coordinates.
+
+    Raises:
+        ValueError: See fit_grid.
+    """
+    backend                 = backend if backend is not None else ScreenBackend()
+    s_left, s_top, s_w, s_h = backend.screen_rect()
+    pad_x, pad_y            = int(rect[2] * margin) + 1, int(rect[3] * margin) + 1
+    x1, y1                  = max(rect[0] - pad_x, s_left), max(rect[1] - pad_y, s_top)
+    x2, y2                  = min(rect[0] + rect[2] + pad_x, s_left + s_w), min(rect[1] + rect[3] + pad_y, s_top + s_h)
+    return fit_grid(backend.grab(x1, y1, x2 - x1, y2 - y1), y1, x1, sizes)
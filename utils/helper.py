@@ -1,9 +1,10 @@
-import cv2
-import numpy as np
-import mss
-import win32gui
-import win32api
-import win32con
+from utils import get_capture_session
+try:
+    import win32gui
+    import win32api
+    import win32con
+except ImportError:                       # Non-Windows: screen capture still works, input simulation does not
+    win32gui = win32api = win32con = None
 
 
 class CustomArr:
@@ -61,19 +62,19 @@ def img_crop(image, x1, y1, h, w):
 
 def screenshot():
     """
-    Capture a screenshot of the entire primary monitor.
+    Capture a screenshot of all monitors.
 
     Returns:
         numpy.ndarray: The captured screenshot as an RGB image.
     """
-    sct   = mss.mss()
-    image = cv2.cvtColor(np.array(sct.grab(sct.monitors[0])), cv2.COLOR_BGR2RGB)
-    return image
+    return get_capture_session().grab_monitor(0, rgb=True)
 
 
 def screenshot_region(x1, y1, h, w):
     """
-    Capture a screenshot of a specific region of the primary monitor.
+    Capture a screenshot of a specific region of the screen.
+
+    Only the region itself is grabbed, through the shared capture session.
 
     Args:
         x1 (int): The x-coordinate of the top-left corner of the region.
@@ -84,9 +85,7 @@ def screenshot_region(x1, y1, h, w):
     Returns:
         numpy.ndarray: The captured screenshot of the specified region as an RGB image.
     """
-    image = screenshot()
-    image = image[y1:y1 + h, x1:x1 + w]
-    return image
+    return get_capture_session().grab(x1, y1, w, h, rgb=True)
 
 
 def get_pixel(x, y):
@@ -107,6 +106,31 @@ def get_pixel(x, y):
         return None
     
 
+def window_rects(min_size=200):
+    """
+    Screen rectangles of the visible top-level windows, largest first.
+
+    Args:
+        min_size (int): Smallest width and height of a window worth searching for a board.
+
+    Returns:
+        list: (left, top, width, height) tuples; empty where windows cannot be enumerated.
+    """
+    if win32gui is None:
+        return []
+    rects = []
+
+    def collect(hwnd, _):
+        if win32gui.IsWindowVisible(hwnd) and not win32gui.IsIconic(hwnd):
+            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+            if right - left >= min_size and bottom - top >= min_size:
+                rects.append((left, top, right - left, bottom - top))
+        return True
+
+    win32gui.EnumWindows(collect, None)
+    return sorted(set(rects), key=lambda rect: rect[2] * rect[3], reverse=True)
+
+
 def get_mouse_position():
     return win32api.GetCursorPos()
 
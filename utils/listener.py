@@ -1,15 +1,22 @@
 import keyboard
 import time
 import logging
-from threading          import Thread, Lock, Event
+from threading          import Lock, Event
 from concurrent.futures import ThreadPoolExecutor
-from typing             import Set, Callable
+from typing             import Dict, NamedTuple, Optional, Sequence, Set, Callable
 
 # Type aliases for clarity
 ScanCode      = int
 BitIndex      = int
-HashKey       = str
+HashKey       = int
 CallbackFunc  = Callable[[], None]
+EventHandler  = Callable[[str, str], None]             # (key name, 'down' or 'up')
+
+# Execution lanes of a hotkey
+EXCLUSIVE       = 'exclusive'      # Own single worker: presses queue and run one at a time, in order
+CONCURRENT      = 'concurrent'     # Shared pool: presses run in parallel with each other and other hotkeys
+DROP_IF_RUNNING = 'drop'           # Own single worker: a press while the previous one is pending is dropped
+LANES           = (EXCLUSIVE, CONCURRENT, DROP_IF_RUNNING)
 
 
 # logging.basicConfig(
@@ -27,25 +34,138 @@ class HotkeyError(Exception):
     pass
 
 
+class KeyEventSource:
+    """
+    Delivers key events to the Listener and resolves key names to scan codes.
+
+    The default implementation hooks the OS keyboard through `keyboard.hook`, so
+    events arrive on the keyboard library's own thread with no polling.
+    """
+    def start(self, handler: EventHandler) -> None:
+        """Begin calling handler(name, event_type) for every key event."""
+        def on_event(event) -> None:
+            if not event.name or event.event_type not in ('down', 'up'):
+                return
+            try:
+                handler(event.name, event.event_type)
+            except Exception as e:
+                logging.error(f"Listener event error: {e}")
+        self._hook = keyboard.hook(on_event, suppress=False)
+
+    def stop(self) -> None:
+        """Stop delivering events; safe to call more than once."""
+        hook, self._hook = getattr(self, '_hook', None), None
+        if hook is not None:
+            keyboard.unhook(hook)
+
+    def scan_codes(self, key_name: str) -> Sequence[ScanCode]:
+        """Scan codes of a key name; raises ValueError for unknown names."""
+        return keyboard.key_to_scan_codes(key_name)
+
+
+class ManualEventSource(KeyEventSource):
+    """
+    Event source driven by code rather than the OS, e.g. to test hotkeys on a
+    machine without keyboard access.
+
+    Example:
+        source   = ManualEventSource({'alt': 56, 'p': 25})
+        listener = Listener(event_source=source)
+        listener.add_hotkey('alt+p', callback)
+        source.tap('alt', 'p')
+    """
+    def __init__(self, keymap: Dict[str, ScanCode]):
+        """
+        Args:
+            keymap: Key name -> scan code; names not in it are invalid.
+        """
+        self.keymap   = keymap
+        self._handler : Optional[EventHandler] = None
+
+    def start(self, handler: EventHandler) -> None:
+        self._handler = handler
+
+    def stop(self) -> None:
+        self._handler = None
+
+    def scan_codes(self, key_name: str) -> Sequence[ScanCode]:
+        if key_name not in self.keymap:
+            raise ValueError(f"Key {key_name!r} is not mapped to any known key")
+        return (self.keymap[key_name],)
+
+    def emit(self, name: str, event_type: str) -> None:
+        """Deliver one event; ignored once the source is stopped."""
+        if self._handler is not None:
+            self._handler(name, event_type)
+
+    def tap(self, *names: str) -> None:
+        """Press the keys in order, then release them in reverse order."""
+        for name in names:
+            self.emit(name, 'down')
+        for name in reversed(names):
+            self.emit(name, 'up')
+
+
+class HotkeyStats(NamedTuple):
+    """Counters of one hotkey; delays are from key press to callback start."""
+    lane          : str
+    triggered     : int                # Presses that were submitted
+    debounced     : int                # Presses inside the debounce window
+    dropped       : int                # Presses dropped because the previous one was pending
+    completed     : int
+    mean_delay_ms : float
+    max_delay_ms  : float
+
+
+class _Hotkey:
+    """A registered hotkey: its callback, policy, lane and counters."""
+    def __init__(self, name: str, callback: CallbackFunc, debounce_ms: int, lane: str):
+        self.name        = name
+        self.callback    = callback
+        self.debounce_ms = debounce_ms
+        self.lane        = lane
+        self.executor    = None if lane == CONCURRENT else ThreadPoolExecutor(
+            max_workers        = 1,
+            thread_name_prefix = f'Hotkey[{name}]'
+        )
+        self.last_time   = float('-inf')   # Last accepted press, ms
+        self.pending     = 0               # Submitted but not finished
+        self.triggered   = 0
+        self.debounced   = 0
+        self.dropped     = 0
+        self.started     = 0
+        self.completed   = 0
+        self.delay_total = 0.0
+        self.delay_max   = 0.0
+
+    def stats(self) -> HotkeyStats:
+        mean = self.delay_total / self.started if self.started else 0.0
+        return HotkeyStats(self.lane, self.triggered, self.debounced, self.dropped, self.completed, mean, self.delay_max)
+
+
 class Listener:
     """
     Listens for keyboard hotkey combinations and executes callbacks in a thread-safe manner.
 
     Features:
-        - Background thread for non-blocking key event monitoring.
+        - Event-hook key monitoring: no thread of its own, no polling.
         - Thread-safe hotkey registration and removal.
-        - Non-blocking callback execution via a thread pool.
+        - Non-blocking callback execution in per-hotkey lanes, so a long-running
+          callback never delays the others, with per-hotkey debounce windows.
+        - Queueing-delay metrics per hotkey, see stats().
         - Graceful shutdown and resource cleanup.
         - Context manager support for RAII-style usage.
     """
 
-    def __init__(self, max_callback_workers: int = 1, debounce_ms: int = 500):
+    def __init__(self, max_callback_workers: int = 1, debounce_ms: int = 500,
+                 event_source: Optional[KeyEventSource] = None):
         """
         Initialize the hotkey listener.
 
         Args:
-            max_callback_workers: Maximum number of threads for callback execution.
-            debounce_ms: Minimum time (ms) between consecutive callback triggers.
+            max_callback_workers: Maximum number of threads shared by CONCURRENT hotkeys.
+            debounce_ms: Default minimum time (ms) between two triggers of the same hotkey.
+            event_source: Where key events come from; defaults to the OS keyboard hook.
 
         Raises:
             ValueError: If max_callback_workers or debounce_ms is invalid.
@@ -55,22 +175,23 @@ class Listener:
         if debounce_ms < 0:
             raise ValueError("debounce_ms must be non-negative")
 
-        self._pressed_keys          = set()
-        self._hotkey_map            = {}
-        self._key_to_bit_index      = {}
+        self._pressed_mask          = 0                   # Bit per pressed key that some hotkey uses
+        self._hotkey_map            : Dict[HashKey, _Hotkey]      = {}
+        self._key_to_bit_index      : Dict[ScanCode, BitIndex]    = {}
+        self._scan_codes            : Dict[str, Optional[ScanCode]] = {}   # Key name -> primary scan code
+        self._name_to_bit           : Dict[str, int]  = {}  # Event key name -> mask bit, 0 if unused
         self._available_bit_indices = set(range(64))
         self._lock                  = Lock()
         self._stop_event            = Event()
-        self._last_callback_time    = 0
         self._debounce_ms           = debounce_ms
 
         self._callback_executor     = ThreadPoolExecutor(
             max_workers             = max_callback_workers,
             thread_name_prefix      = 'HotkeyCallback'
         )
-        self._listener_thread       = Thread(target=self._listen_loop, daemon=True)
-        self._listener_thread.start()
-        logging.debug("Hotkey listener thread started")
+        self._event_source          = event_source if event_source is not None else KeyEventSource()
+        self._event_source.start(self._handle_event)
+        logging.debug("Hotkey listener started")
 
     def __enter__(self):
         """Enable context manager usage."""
@@ -82,7 +203,7 @@ class Listener:
 
     def _get_scan_code(self, key_name: str) -> ScanCode:
         """
-        Convert a key name to its primary scan code.
+        Convert a key name to its primary scan code, resolving each name only once.
 
         Args:
             key_name: The key name (e.g., 'ctrl', 'left ctrl').
@@ -93,85 +214,146 @@ class Listener:
         Raises:
             HotkeyError: If the key name is invalid or has no scan code.
         """
+        if key_name in self._scan_codes:
+            scan_code = self._scan_codes[key_name]
+            if scan_code is None:
+                raise HotkeyError(f"Invalid key name '{key_name}'")
+            return scan_code
         try:
-            scan_codes = keyboard.key_to_scan_codes(key_name)
+            scan_codes = self._event_source.scan_codes(key_name)
             if len(scan_codes) > 1:
-                logging.debug(f"Multiple scan codes for '{key_name}': {scan_codes}, using {scan_codes[0]}")
+                logging.debug("Multiple scan codes for '%s': %s, using %s", key_name, scan_codes, scan_codes[0])
+            self._scan_codes[key_name] = scan_codes[0]
             return scan_codes[0]
         except ValueError as e:
+            self._scan_codes[key_name] = None
             raise HotkeyError(f"Invalid key name '{key_name}': {e}")
         except Exception as e:
             raise HotkeyError(f"Error resolving scan code for '{key_name}': {e}")
 
     def _calculate_hash(self, scan_codes: Set[ScanCode]) -> HashKey:
         """
-        Calculate a hash for a set of scan codes.
+        Calculate the bitmask of a set of scan codes.
 
         Args:
             scan_codes: Set of scan codes to hash.
 
         Returns:
-            A hexadecimal string representing the hash.
+            An integer with one bit set per registered scan code.
         """
         current_hash = 0
         for code in scan_codes:
             if code in self._key_to_bit_index:
                 current_hash |= (1 << self._key_to_bit_index[code])
-        return hex(current_hash)
+        return current_hash
 
-    def _listen_loop(self):
+    def _key_bit(self, name: str) -> int:
         """
-        Monitor keyboard events and trigger callbacks for hotkey matches.
-        Uses ThreadPoolExecutor to run callbacks non-blocking.
-        """
-        logging.debug("Listener loop started")
+        Mask bit of an event's key name, 0 for keys no hotkey uses.
 
-        while not self._stop_event.is_set():
-            try:
-                event = keyboard.read_event(suppress=False)
-                if not event.name or event.event_type not in ('down', 'up'):
-                    continue
-                scan_code = self._get_scan_code(event.name.lower())
-                with self._lock:
-                    is_relevant_key = scan_code in self._key_to_bit_index
-                    if event.event_type == 'down' and is_relevant_key and scan_code not in self._pressed_keys:
-                        self._pressed_keys.add(scan_code)
-                        logging.debug(f"Key down: {event.name}, pressed_keys={self._pressed_keys}")
-                        current_hash  = self._calculate_hash(self._pressed_keys)
-                        current_time  = time.time() * 1000
-                        if current_hash in self._hotkey_map and (current_time - self._last_callback_time) >= self._debounce_ms:
-                            callback_to_run = self._hotkey_map[current_hash]
-                            logging.info(f"Hotkey triggered: hash={current_hash}")
-                            try:
-                                self._callback_executor.submit(callback_to_run)
-                                logging.debug(f"Submitted callback for hash={current_hash}")
-                                self._last_callback_time = current_time
-                            except RuntimeError:
-                                logging.warning(f"Callback queue full, skipping hotkey: hash={current_hash}")
-                    elif event.event_type == 'up' and scan_code in self._pressed_keys:
-                        self._pressed_keys.discard(scan_code)
-                        logging.debug(f"Key up: {event.name}, pressed_keys={self._pressed_keys}")
-            except HotkeyError:
-                continue
-            except Exception as e:
-                if not self._stop_event.is_set():
-                    logging.error(f"Listener loop error: {e}")
-                    time.sleep(0.05)
+        The first event of every name resolves it under the lock, so it cannot cache a
+        bit from before an add_hotkey that clears the cache; later ones are a single
+        dict lookup.
+        """
+        bit = self._name_to_bit.get(name)
+        if bit is None:
+            with self._lock:
+                bit = self._name_to_bit.get(name)
+                if bit is None:
+                    try:
+                        index = self._key_to_bit_index.get(self._get_scan_code(name.lower()))
+                    except HotkeyError:
+                        index = None
+                    bit = 0 if index is None else 1 << index
+                    self._name_to_bit[name] = bit
+        return bit
+
+    def _handle_event(self, name: str, event_type: str) -> None:
+        """
+        Update the pressed-key mask and trigger the hotkey it matches, if any.
 
-        logging.debug("Listener loop stopped")
-        self._callback_executor.shutdown(wait=False, cancel_futures=True)
+        Called by the event source, on its thread, for every key event, so it
+        only logs on a match: even a disabled logging.debug call costs more than
+        the rest of the handler.
 
-    def add_hotkey(self, hotkey_str: str, callback: CallbackFunc) -> None:
+        Args:
+            name: Key name as reported by the event.
+            event_type: 'down' or 'up'.
+        """
+        bit = self._key_bit(name)
+        if not bit:
+            return
+        with self._lock:
+            if event_type == 'down':
+                if self._pressed_mask & bit:
+                    return                                # Auto-repeat
+                self._pressed_mask |= bit
+                hotkey = self._hotkey_map.get(self._pressed_mask)
+                if hotkey is not None:
+                    self._dispatch(hotkey)
+            elif event_type == 'up':
+                self._pressed_mask &= ~bit
+
+    def _dispatch(self, hotkey: _Hotkey) -> None:
+        """
+        Apply a hotkey's debounce and lane policy to a press and submit its callback.
+        Must be called with the lock held.
+        """
+        now = time.perf_counter() * 1000
+        if now - hotkey.last_time < hotkey.debounce_ms:
+            hotkey.debounced += 1
+            return
+        if hotkey.lane == DROP_IF_RUNNING and hotkey.pending:
+            hotkey.dropped   += 1
+            logging.info("Hotkey '%s' dropped: previous run still pending", hotkey.name)
+            return
+        executor = hotkey.executor or self._callback_executor
+        try:
+            executor.submit(self._run, hotkey, now)
+        except RuntimeError:
+            logging.warning("Callback executor shut down, skipping hotkey '%s'", hotkey.name)
+            return
+        hotkey.last_time  = now
+        hotkey.pending   += 1
+        hotkey.triggered += 1
+        logging.info("Hotkey triggered: '%s'", hotkey.name)
+
+    def _run(self, hotkey: _Hotkey, queued_at: float) -> None:
+        """Run a hotkey's callback in its lane, recording the queueing delay."""
+        delay = time.perf_counter() * 1000 - queued_at
+        with self._lock:
+            hotkey.started     += 1
+            hotkey.delay_total += delay
+            hotkey.delay_max    = max(hotkey.delay_max, delay)
+        try:
+            hotkey.callback()
+        except Exception as e:
+            logging.error(f"Hotkey '{hotkey.name}' callback error: {e}")
+        finally:
+            with self._lock:
+                hotkey.pending   -= 1
+                hotkey.completed += 1
+
+    def add_hotkey(self, hotkey_str: str, callback: CallbackFunc, debounce_ms: Optional[int] = None,
+                   lane: str = EXCLUSIVE) -> None:
         """
         Register a hotkey combination and its callback.
 
         Args:
             hotkey_str: Hotkey string (e.g., "ctrl+shift+a").
             callback: Function to call when the hotkey is pressed.
+            debounce_ms: Minimum time (ms) between two triggers of this hotkey;
+                defaults to the listener's debounce_ms.
+            lane: EXCLUSIVE, CONCURRENT or DROP_IF_RUNNING, see LANES.
 
         Raises:
             HotkeyError: If the hotkey string is invalid or contains invalid keys.
+            ValueError: If lane or debounce_ms is invalid.
         """
+        if lane not in LANES:
+            raise ValueError(f"lane must be one of {LANES}")
+        if debounce_ms is not None and debounce_ms < 0:
+            raise ValueError("debounce_ms must be non-negative")
         key_names = [key.strip().lower() for key in hotkey_str.split('+') if key.strip()]
         if not key_names:
             raise HotkeyError("Hotkey string cannot be empty")
@@ -186,11 +368,14 @@ class Listener:
                     bit_index = min(self._available_bit_indices)
                     self._available_bit_indices.remove(bit_index)
                     self._key_to_bit_index[scan_code] = bit_index
+                    self._name_to_bit.clear()            # Names resolved as unused may now have a bit
             target_hash = self._calculate_hash(scan_codes)
             if target_hash in self._hotkey_map:
-                logging.warning(f"Overwriting callback for hotkey '{hotkey_str}' (hash={target_hash})")
-            self._hotkey_map[target_hash] = callback
-            logging.info(f"Registered hotkey '{hotkey_str}' (hash={target_hash})")
+                logging.warning(f"Overwriting callback for hotkey '{hotkey_str}' (hash={target_hash:#x})")
+                self._shutdown_lane(self._hotkey_map[target_hash])
+            self._hotkey_map[target_hash] = _Hotkey(hotkey_str, callback,
+                                                    self._debounce_ms if debounce_ms is None else debounce_ms, lane)
+            logging.info(f"Registered hotkey '{hotkey_str}' (hash={target_hash:#x})")
 
     def remove_hotkey(self, hotkey_str: str) -> None:
         """
@@ -211,9 +396,25 @@ class Listener:
                 scan_codes.add(self._get_scan_code(name))
             target_hash = self._calculate_hash(scan_codes)
             if target_hash not in self._hotkey_map:
-                raise HotkeyError(f"Hotkey '{hotkey_str}' (hash={target_hash}) not found")
-            del self._hotkey_map[target_hash]
-            logging.info(f"Removed hotkey '{hotkey_str}' (hash={target_hash})")
+                raise HotkeyError(f"Hotkey '{hotkey_str}' (hash={target_hash:#x}) not found")
+            self._shutdown_lane(self._hotkey_map.pop(target_hash))
+            logging.info(f"Removed hotkey '{hotkey_str}' (hash={target_hash:#x})")
+
+    def stats(self) -> Dict[str, HotkeyStats]:
+        """
+        Counters and queueing delays of every registered hotkey.
+
+        Returns:
+            Hotkey string as registered -> its HotkeyStats.
+        """
+        with self._lock:
+            return {hotkey.name: hotkey.stats() for hotkey in self._hotkey_map.values()}
+
+    @staticmethod
+    def _shutdown_lane(hotkey: _Hotkey, cancel: bool = False) -> None:
+        """Let a hotkey's own worker finish its current run, then exit."""
+        if hotkey.executor is not None:
+            hotkey.executor.shutdown(wait=False, cancel_futures=cancel)
 
     def signal_stop(self) -> None:
         """
@@ -221,21 +422,37 @@ class Listener:
         Safe to call from callbacks.
         """
         with self._lock:
-            if not self._stop_event.is_set():
-                logging.debug("Stop signal received")
-                self._stop_event.set()
+            if self._stop_event.is_set():
+                return
+            logging.debug("Stop signal received")
+            self._stop_event.set()
+        try:
+            self._event_source.stop()
+        except Exception as e:
+            logging.warning(f"Error stopping key event source: {e}")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the listener is signalled to stop.
+
+        Args:
+            timeout: Seconds to wait at most; None waits indefinitely.
+
+        Returns:
+            True if the listener was stopped, False on timeout.
+        """
+        return self._stop_event.wait(timeout)
 
     def stop(self) -> None:
         """
         Stop the listener and clean up resources.
         """
         self.signal_stop()
-        if self._listener_thread.is_alive():
-            logging.debug("Waiting for listener thread to stop")
-            self._listener_thread.join(timeout=1.0)
-            if self._listener_thread.is_alive():
-                logging.warning("Listener thread did not stop within timeout")
         self._callback_executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            hotkeys = list(self._hotkey_map.values())
+        for hotkey in hotkeys:
+            self._shutdown_lane(hotkey, cancel=True)
         logging.debug("Listener stopped")
 
     def __del__(self):
@@ -0,0 +1,154 @@
+import zlib
+import cv2
+import numpy as np
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+from utils  import CaptureBackend, ScreenBackend, FrameBackend, auto_detect_board
+from utils.grid import BOARD_SIZES, GridGeometry, refine_board
+
+Fingerprint = Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int], int]
+
+
+def grid_rect(grid: GridGeometry) -> Tuple[int, int, int, int]:
+    """Integer (x, y, w, h) spanned by the outer intersections of a grid."""
+    x, y = int(round(grid.x)), int(round(grid.y))
+    return x, y, int(round(grid.pitch_x * (grid.size_x - 1))), int(round(grid.pitch_y * (grid.size_y - 1)))
+
+
+def fingerprint(frame: np.ndarray, origin: Tuple[int, int], rect: Tuple[int, int, int, int],
+                screen: Tuple[int, int, int, int], side: int = 16) -> Optional[Fingerprint]:
+    """
+    Cheap identity of a screen region: the screen geometry, the region, and a hash
+    of the region downsampled to side x side and quantised to 4 bits per channel.
+
+    Returns:
+        The fingerprint, or None if the region is not inside the frame.
+    """
+    x1, y1 = rect[0] - origin[0], rect[1] - origin[1]
+    if x1 < 0 or y1 < 0 or x1 + rect[2] >= frame.shape[1] or y1 + rect[3] >= frame.shape[0]:
+        return None
+    crop  = frame[y1:y1 + rect[3] + 1, x1:x1 + rect[2] + 1]
+    small = cv2.resize(crop, (side, side), interpolation=cv2.INTER_AREA) >> 4
+    return screen, rect, zlib.crc32(np.ascontiguousarray(small))
+
+
+def border_check(frame: np.ndarray, origin: Tuple[int, int], grid: GridGeometry, backend: CaptureBackend,
+                 contrast: int = 30, quorum: float = 0.8) -> bool:
+    """
+    Check that the outer grid lines are still where a cached geometry says.
+
+    Between every pair of neighbouring border intersections the line pixel must be
+    darker than the centre of the adjacent cell, which stones never cover.
+
+    Args:
+        frame: Screen grab containing the board.
+        origin: Screen coordinates of the frame's top-left pixel.
+        grid: Geometry to verify.
+        backend: Backend the frame was grabbed with, for its channel order.
+        contrast: Smallest brightness difference between line and cell.
+        quorum: Fraction of border points that must pass.
+
+    Returns:
+        True if the board is still there.
+    """
+    half_x, half_y = grid.pitch_x / 2, grid.pitch_y / 2
+    mid_x          = grid.x + half_x + np.arange(grid.size_x - 1) * grid.pitch_x
+    mid_y          = grid.y + half_y + np.arange(grid.size_y - 1) * grid.pitch_y
+    top, bottom    = grid.y, grid.y + (grid.size_y - 1) * grid.pitch_y
+    left, right    = grid.x, grid.x + (grid.size_x - 1) * grid.pitch_x
+
+    # (line x, line y, cell x, cell y) for the top, bottom, left and right borders
+    line_x = np.concatenate([mid_x, mid_x, np.full_like(mid_y, left), np.full_like(mid_y, right)])
+    line_y = np.concatenate([np.full_like(mid_x, top), np.full_like(mid_x, bottom), mid_y, mid_y])
+    cell_x = np.concatenate([mid_x, mid_x, np.full_like(mid_y, left + half_x), np.full_like(mid_y, right - half_x)])
+    cell_y = np.concatenate([np.full_like(mid_x, top + half_y), np.full_like(mid_x, bottom - half_y), mid_y, mid_y])
+
+    xs = np.rint(np.concatenate([line_x, cell_x])).astype(np.intp) - origin[0]
+    ys = np.rint(np.concatenate([line_y, cell_y])).astype(np.intp) - origin[1]
+    if xs.min() < 0 or ys.min() < 0 or xs.max() >= frame.shape[1] or ys.max() >= frame.shape[0]:
+        return False
+    luma       = backend.to_bgr(frame[ys, xs]).astype(np.int16).mean(axis=-1)
+    line, cell = np.split(luma, 2)
+    return bool(np.mean(cell - line >= contrast) >= quorum)
+
+
+class DetectionCache:
+    """
+    Remembers where boards were found so re-selecting one costs milliseconds.
+
+    A cached board whose region fingerprint is unchanged is returned immediately;
+    otherwise a fast border check decides whether it is still on screen, e.g.
+    after stones were played. Only when every cached board fails does the full
+    detection pipeline run.
+    """
+    def __init__(self, backend: Optional[CaptureBackend] = None, sizes: Optional[Sequence[int]] = BOARD_SIZES,
+                 capacity: int = 8):
+        """
+        Args:
+            backend: Source of screen pixels; defaults to the primary monitor.
+            sizes: Accepted board sizes, see fit_grid.
+            capacity: Number of boards remembered.
+        """
+        self.backend  = backend if backend is not None else ScreenBackend()
+        self.sizes    = sizes
+        self.capacity = capacity
+        self._entries : 'OrderedDict[Fingerprint, GridGeometry]' = OrderedDict()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def locate(self, regions: Optional[Sequence[Tuple[int, int, int, int]]] = None) -> Optional[GridGeometry]:
+        """
+        Find the board, preferring the most recently found one.
+
+        Cached boards are validated on a grab of their own rectangle only; the whole
+        screen is grabbed just for a full detection.
+
+        Args:
+            regions: Candidate windows for a full detection, see auto_detect_board.
+
+        Returns:
+            The board's grid, or None if no board is found.
+        """
+        screen = self.backend.screen_rect()
+        for key, grid in reversed(list(self._entries.items())):
+            x, y, w, h = key[1]
+            if key[0] != screen or x < screen[0] or y < screen[1] \
+                    or x + w >= screen[0] + screen[2] or y + h >= screen[1] + screen[3]:
+                continue
+            frame   = self.backend.grab(x, y, w + 1, h + 1)
+            current = fingerprint(frame, (x, y), key[1], screen)
+            if current == key or border_check(frame, (x, y), grid, self.backend):
+                self._remember(current, grid, replace=key)
+                return grid
+
+        frame  = self.backend.grab(*screen)
+        origin = (screen[0], screen[1])
+        grid   = self.detect(frame, origin, regions)
+        if grid is not None:
+            self._remember(fingerprint(frame, origin, grid_rect(grid), screen), grid)
+        return grid
+
+    def detect(self, frame: np.ndarray, origin: Tuple[int, int],
+               regions: Optional[Sequence[Tuple[int, int, int, int]]] = None) -> Optional[GridGeometry]:
+        """Full pipeline on an already grabbed frame: candidate search, then grid fitting."""
+        backend    = FrameBackend(frame, origin, self.backend.order)
+        candidates = auto_detect_board(regions, backend) or (auto_detect_board(None, backend) if regions else [])
+        for candidate in candidates:
+            if candidate.grid <= 0:
+                continue
+            try:
+                return refine_board(candidate[:4], backend, self.sizes)
+            except ValueError:
+                continue
+        return None
+
+    def _remember(self, key: Optional[Fingerprint], grid: GridGeometry, replace: Optional[Fingerprint] = None) -> None:
+        if replace is not None:
+            self._entries.pop(replace, None)
+        if key is None:
+            return
+        self._entries[key] = grid
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
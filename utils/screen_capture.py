@@ -1,10 +1,13 @@
 import cv2
-import mss
 import numpy as np
 import tkinter as tk
-from ctypes import windll
+try:
+    from ctypes import windll
+except ImportError:                       # Non-Windows: fall back to the primary monitor size reported by the capture session
+    windll = None
 from PIL    import Image, ImageTk
 from typing import Tuple, Optional
+from utils  import get_capture_session
 
 
 def dark_image(image: np.ndarray, alpha: float = 1.0) -> np.ndarray:
@@ -34,6 +37,9 @@ def dark_image(image: np.ndarray, alpha: float = 1.0) -> np.ndarray:
 
 
 def get_screen_size():
+    if windll is None:
+        monitor = get_capture_session().monitor(1)
+        return monitor['width'], monitor['height']
     user32 = windll.user32
     return user32.GetSystemMetrics(78), user32.GetSystemMetrics(79)
 
@@ -51,7 +57,7 @@ class ScreenCapture(tk.Toplevel):
         self.root.withdraw()  # Hide the root window
         super().__init__(self.root)  # Initialize Toplevel with root as parent
         
-        self.sct        = mss.mss()
+        self.session    = get_capture_session()
         self.__w        = 0
         self.__h        = 0
         self.__start_x  = None
@@ -72,9 +78,7 @@ class ScreenCapture(tk.Toplevel):
         )
         self.canvas.pack(fill=tk.BOTH, expand=True)
 
-        monitor     = self.sct.monitors[1]  # Primary monitor
-        screenshot  = np.array(self.sct.grab(monitor))
-        self.__img  = cv2.cvtColor(screenshot, cv2.COLOR_BGR2RGB)
+        self.__img  = self.session.grab_monitor(1, rgb=True)  # Primary monitor
         darkened    = dark_image(self.__img, 0.6)
         self.__img_tk = ImageTk.PhotoImage(Image.fromarray(darkened))
         self.canvas.create_image(0, 0, image=self.__img_tk, anchor='nw')
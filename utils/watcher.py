@@ -0,0 +1,144 @@
+import zlib
+import numpy as np
+from typing import Callable, List, NamedTuple, Optional, Tuple
+from utils  import Board
+from utils.board import LAST_MOVE_COLOR
+
+# Intersection states reported by a classifier
+EMPTY  = 0
+BLACK  = 1
+WHITE  = 2
+MARKER = 3   # Occupied by the last move; the marker hides the stone colour
+
+Classifier = Callable[[np.ndarray], np.ndarray]
+
+
+def default_classifier(pixels: np.ndarray) -> np.ndarray:
+    """
+    Classify intersection pixels by brightness.
+
+    Args:
+        pixels: Array of shape (N, 3) with BGR values, see BoardWatcher for where they come from.
+
+    Returns:
+        Array of N intersection states.
+    """
+    pixels = pixels.astype(np.int16)
+    luma   = pixels.mean(axis=-1)
+    states = np.full(len(pixels), EMPTY, dtype=np.uint8)
+    states[luma < 80]                                   = BLACK
+    states[luma > 180]                                  = WHITE
+    states[np.all(pixels == LAST_MOVE_COLOR, axis=-1)]  = MARKER
+    return states
+
+
+class BoardDelta(NamedTuple):
+    added    : List[Tuple[int, int]]         # (x, y) that became occupied
+    removed  : List[Tuple[int, int]]         # (x, y) that became empty
+    last_move: Optional[Tuple[int, int]]     # Marker position, if it moved
+
+
+class BoardWatcher:
+    """
+    Incremental board reader.
+
+    Each poll grabs the board once and checksums it; an unchanged frame costs no
+    analysis at all. Otherwise only intersections whose surrounding patch changed
+    are re-classified, and the differences against the previous poll are reported.
+
+    An intersection's stone is read from the median of points along its diagonals,
+    which stay clear of the grid lines crossing at its centre; only the last-move
+    marker is read from the centre pixel itself.
+    """
+    def __init__(self, board: Board, classifier: Classifier = default_classifier, patch_ratio: float = 0.25):
+        """
+        Args:
+            board: Board whose geometry and capture backend are used.
+            classifier: Maps (N, 3) BGR pixels to intersection states. It is called on
+                the diagonal medians for the stones and on the centre pixels for MARKER.
+            patch_ratio: Patch radius around each intersection, as a fraction of the grid spacing.
+        """
+        self.board       = board
+        self.classifier  = classifier
+
+        xs, ys           = board.intersections
+        radius           = max(1, int(min(board.spacing) * patch_ratio))
+        left, top        = int(xs.min()) - radius, int(ys.min()) - radius
+        self.__region    = (left, top, int(xs.max()) + radius - left + 1, int(ys.max()) + radius - top + 1)
+
+        # Patch sample points per intersection: a 3x3 lattice of the given radius, shape (rows, cols, 9)
+        offsets          = np.array([-radius, 0, radius])
+        dy, dx           = np.meshgrid(offsets, offsets, indexing='ij')
+        self.__patch_x   = (xs - left)[..., np.newaxis] + dx.ravel()
+        self.__patch_y   = (ys - top)[..., np.newaxis] + dy.ravel()
+        self.__center_x  = xs - left
+        self.__center_y  = ys - top
+
+        # Diagonal sample points per intersection, shape (rows, cols, 4 * radius)
+        steps            = np.arange(1, radius + 1)
+        diag_x           = np.concatenate([steps, steps, -steps, -steps])
+        diag_y           = np.concatenate([steps, -steps, steps, -steps])
+        self.__diag_x    = self.__center_x[..., np.newaxis] + diag_x
+        self.__diag_y    = self.__center_y[..., np.newaxis] + diag_y
+
+        self.__checksum  : Optional[int]        = None
+        self.__patches   : Optional[np.ndarray] = None
+        self.__states    = np.full(xs.shape, EMPTY, dtype=np.uint8)
+        self.__last_move : Optional[Tuple[int, int]] = None
+
+    @property
+    def states(self) -> np.ndarray:
+        """Current state of every intersection, indexed [y, x]."""
+        return self.__states
+
+    def reset(self) -> None:
+        """Forget the previous frame so the next poll analyses the whole board."""
+        self.__checksum  = None
+        self.__patches   = None
+        self.__states[:] = EMPTY
+        self.__last_move = None
+
+    def poll(self) -> Optional[BoardDelta]:
+        """
+        Grab the board and report what changed since the previous poll.
+
+        Returns:
+            None if nothing changed, else a BoardDelta.
+        """
+        frame    = np.ascontiguousarray(self.board.backend.grab(*self.__region))
+        checksum = zlib.crc32(frame)
+        if checksum == self.__checksum:
+            return None
+        self.__checksum = checksum
+
+        patches  = frame[self.__patch_y, self.__patch_x]
+        if self.__patches is None:
+            changed = np.ones(self.__states.shape, dtype=bool)
+        else:
+            changed = np.any(patches != self.__patches, axis=(-1, -2))
+        self.__patches = patches
+        if not changed.any():
+            return None
+
+        ys, xs     = np.nonzero(changed)
+        old_states = self.__states[ys, xs]
+        backend    = self.board.backend
+        diagonals  = backend.to_bgr(frame[self.__diag_y[ys, xs], self.__diag_x[ys, xs]])
+        centers    = backend.to_bgr(frame[self.__center_y[ys, xs], self.__center_x[ys, xs]])
+        new_states = self.classifier(np.median(diagonals, axis=1).astype(np.uint8))
+        new_states[self.classifier(centers) == MARKER] = MARKER
+        self.__states[ys, xs] = new_states
+
+        became_occupied = (old_states == EMPTY) & (new_states != EMPTY)
+        became_empty    = (old_states != EMPTY) & (new_states == EMPTY)
+        added           = [(int(x), int(y)) for x, y in zip(xs[became_occupied], ys[became_occupied])]
+        removed         = [(int(x), int(y)) for x, y in zip(xs[became_empty], ys[became_empty])]
+
+        markers         = np.argwhere(self.__states == MARKER)
+        last_move       = (int(markers[0][1]), int(markers[0][0])) if len(markers) else None
+        moved           = last_move != self.__last_move
+        self.__last_move = last_move
+
+        if not added and not removed and not moved:
+            return None
+        return BoardDelta(added, removed, last_move if moved else None)